@@ -0,0 +1,197 @@
+# This program builds MANY seasons at once (e.g. 10+ seasons of history to
+#  train the bet models). A backfill runs in 2 phases:
+#
+#    1. Structure - every season's schedule, team folders & player folders
+#                   (Update_Database.createSeasonFolder(), 31 requests per
+#                   season).
+#    2. Players   - player stats. A player's website holds their WHOLE career
+#                   (totals, 36-min & advanced stats of every season), so each
+#                   player is fetched ONCE & written to every season folder
+#                   they appear in. Only a folder of the current season
+#                   gets their "last 5 games". Optionally, 1 game log per
+#                   player season.
+#
+#  Before each phase, the number of requests (pages already fresh in the page
+#  cache are free) & the time it takes at the rate limit are printed & the
+#  user is asked to confirm. Both phases resume from the season checkpoints
+#  (see Build_Checkpoint.py) if the backfill is stopped.
+import os
+import sys
+import Global
+import Build_Checkpoint
+import Page_Cache
+import Parse_Pipeline
+import Player
+import Request_Ticker
+import Team_Registry
+import Update_Database
+import Update_Journal
+import Metrics
+
+ESTIMATED_ROSTER_SIZE = 17           # Players per team season (incl. 2-way & traded players)
+ESTIMATED_NEW_PLAYERS_PER_SEASON = 110  # Players not seen in the previous seasons
+
+
+# Backfills every season ending between firstEndYr & lastEndYr (e.g. 2015 to
+#  2024 -> "2014-2015 Season" to "2023-2024 Season"). Set confirm=False to
+#  skip the y/n questions.
+def runBackfill(firstEndYr, lastEndYr, gameLogs=False, confirm=True):
+    seasonEndYrs = list(range(firstEndYr, lastEndYr + 1))
+
+    # Phase 1: schedules, rosters & folders
+    plan = planStructure(seasonEndYrs)
+    printStructurePlan(plan, gameLogs)
+    if confirm and not askUser("Start building the season folders?"):
+        return None
+    for seasonEndYr in seasonEndYrs:
+        Update_Database.createSeasonFolder(seasonEndYr - 1, seasonEndYr)
+
+    # Phase 2: player stats (deduplicated across seasons)
+    players = planPlayers(seasonEndYrs, gameLogs)
+    printPlayerPlan(players)
+    if confirm and not askUser("Start downloading player stats?"):
+        return None
+    failed = updatePlayers(players["websites"])
+    if gameLogs:  # Each game log is checkpointed as it's written, so failed ones are retried
+        failed += Parse_Pipeline.updateGameLogs(
+            players["gameLogs"], onWritten=lambda folderPath: Build_Checkpoint.markFinished(
+                getSeasonPath(folderPath), getGameLogUnit(folderPath)))
+
+    Update_Journal.flush()
+    Metrics.printSummary()
+    if failed:
+        print(f"\n>> {len(failed)} player websites/game logs failed. Run the backfill again to resume. <<")
+    return None
+
+
+# Counts the requests of phase 1. Returns {seasonEndYr: {"schedule": bool,
+#  "teams": [teams not built yet]}} plus the "requests" & "cached" totals.
+def planStructure(seasonEndYrs):
+    plan = {"seasons": {}, "requests": 0, "cached": 0}
+    for seasonEndYr in seasonEndYrs:
+        finished = Build_Checkpoint.loadCheckpoint(getSeasonFolder(seasonEndYr))
+        season = {"schedule": "schedule" not in finished,
+                  "teams": [team for team in Team_Registry.getTeamNames()
+                            if Build_Checkpoint.getTeamUnit(team) not in finished]}
+        plan["seasons"][seasonEndYr] = season
+
+        urls = [Team_Registry.getTeamWebsite(team, seasonEndYr) for team in season["teams"]]
+        if season["schedule"]:
+            urls.append(f"{Global.SITE_URL}/leagues/NBA_{seasonEndYr}_games.html")
+        countRequests(plan, urls)
+    return plan
+
+
+# Finds every player folder of the seasons that still needs stats & groups
+#  them by player website. Returns {"websites": {url: [folder paths]},
+#  "gameLogs": [folder paths], "folders", "requests", "cached"}.
+def planPlayers(seasonEndYrs, gameLogs):
+    players = {"websites": {}, "gameLogs": [], "folders": 0, "requests": 0, "cached": 0}
+    for seasonEndYr in seasonEndYrs:
+        seasonPath = getSeasonFolder(seasonEndYr)
+        if not os.path.isdir(seasonPath):
+            continue
+        finished = Build_Checkpoint.loadCheckpoint(seasonPath)
+        for teamPath in Update_Database.getFolderPaths(seasonPath):
+            for playerPath in Update_Database.getFolderPaths(teamPath):
+                if Update_Database.getPlayerUnit(playerPath) not in finished:
+                    url = Player.getPlayerUrl(f"{playerPath}/log information.csv")
+                    players["websites"].setdefault(url, []).append(playerPath)
+                    players["folders"] += 1
+                if gameLogs and getGameLogUnit(playerPath) not in finished:
+                    players["gameLogs"].append(playerPath)
+
+    countRequests(players, list(players["websites"]) +
+                  [Player.getGameLogUrl(f"{folderPath}/log information.csv") for folderPath in players["gameLogs"]])
+    return players
+
+
+# Adds the URLs that aren't fresh in the page cache to plan["requests"].
+def countRequests(plan, urls):
+    for url in urls:
+        if Global.PAGE_CACHE_ENABLED and Page_Cache.hasFreshPage(url):
+            plan["cached"] += 1
+        else:
+            plan["requests"] += 1
+    return None
+
+
+def printStructurePlan(plan, gameLogs):
+    seasons = plan["seasons"]
+    teamSeasons = sum(len(season["teams"]) for season in seasons.values())
+    estimatedPlayers = 0
+    if teamSeasons:  # A player's website covers every season -> only new players cost a request
+        estimatedPlayers = min(teamSeasons * ESTIMATED_ROSTER_SIZE,
+                               len(Team_Registry.getTeamNames()) * ESTIMATED_ROSTER_SIZE +
+                               (len(seasons) - 1) * ESTIMATED_NEW_PLAYERS_PER_SEASON)
+    estimatedGameLogs = teamSeasons * ESTIMATED_ROSTER_SIZE if gameLogs else 0
+
+    print(f"\nBackfill of {len(seasons)} seasons "
+          f"({min(seasons) - 1}-{min(seasons)} to {max(seasons) - 1}-{max(seasons)}):")
+    print(f"  Phase 1 (schedules & rosters): {plan['requests']} requests "
+          f"({plan['cached']} pages cached) ~ {formatTime(Request_Ticker.getProjectedSeconds(plan['requests']))}")
+    print(f"  Phase 2 (player stats):        ~{estimatedPlayers + estimatedGameLogs} requests (estimate) "
+          f"~ {formatTime(Request_Ticker.getProjectedSeconds(estimatedPlayers + estimatedGameLogs))}")
+    return None
+
+
+def printPlayerPlan(players):
+    print(f"\nPlayer stats: {players['folders']} player folders share {len(players['websites'])} player websites "
+          f"({players['folders'] - len(players['websites'])} requests saved)")
+    if players["gameLogs"]:
+        print(f"  + {len(players['gameLogs'])} season game logs")
+    print(f"  {players['requests']} requests ({players['cached']} pages cached) "
+          f"~ {formatTime(Request_Ticker.getProjectedSeconds(players['requests']))}")
+    return None
+
+
+# Downloads each player website once & writes it to all of the player's
+#  folders. Returns the websites that failed.
+def updatePlayers(websites):
+    jobs = [(url, url, list(Player.PLAYER_TABLES), Parse_Pipeline.parsePlayerPage, ()) for url in websites]
+    Metrics.startProgress(len(jobs), "Player websites")
+
+    def writePlayer(url, tables):
+        folderPaths = sorted(websites[url], key=getSeasonPath)
+        for folderPath in folderPaths:
+            for fileName, data in tables.items():
+                if fileName == "player last 5 games.csv" and not Player.isCurrentSeason(folderPath):
+                    continue  # Only true for the current season
+                Player.writeData(filepath=f"{folderPath}/{fileName}", data=data)
+            Build_Checkpoint.markFinished(getSeasonPath(folderPath), Update_Database.getPlayerUnit(folderPath))
+        print(f"    [X] {os.path.basename(folderPaths[-1])} ({len(folderPaths)} season folders)")
+        Metrics.advanceProgress()
+
+    return Parse_Pipeline.runPipeline(jobs, writePlayer)
+
+
+def getSeasonFolder(seasonEndYr):
+    return f"{Global.BASE_PATH}/{seasonEndYr - 1}-{seasonEndYr} Season"
+
+
+def getSeasonPath(playerPath):
+    return os.path.dirname(os.path.dirname(playerPath))
+
+
+def getGameLogUnit(playerPath):
+    return "game log:" + Update_Database.getPlayerUnit(playerPath).split(":", 1)[1]
+
+
+def formatTime(seconds):
+    hours, seconds = divmod(int(seconds), 3600)
+    return f"{hours}h {seconds // 60}m" if hours else f"{seconds // 60}m {seconds % 60}s"
+
+
+def askUser(question):
+    selection = input(f"{question}  (y/n)").lower()
+    while selection not in ["y", "n", "yes", "no"]:
+        print("Input not valid. Please type 'y' or 'n'.")
+        selection = input(f"{question}  (y/n)").lower()
+    return selection in ["y", "yes"]
+
+
+if __name__ == "__main__":
+    # Usage: python Backfill.py <first season end yr> <last season end yr> [game logs]
+    if len(sys.argv) not in (3, 4):
+        sys.exit("Usage: python Backfill.py 2015 2024 [game logs]")
+    runBackfill(int(sys.argv[1]), int(sys.argv[2]), gameLogs=len(sys.argv) == 4)
@@ -0,0 +1,98 @@
+# Benchmarks how long it takes (& how much memory) to read the stat tables
+#  out of ONE player website. Compares the old approach (full "html.parser"
+#  soup + one row.find() per column), Table_Extractor (only the needed tables
+#  are built & each row is walked once) & the streaming table scanner (the
+#  website is fed in chunks & only our tables' HTML is ever parsed).
+#
+#  Usage: python Benchmark_Parse.py <saved player website .html | player URL>
+#  A URL is read from the page cache, so it must have been fetched before.
+import sys
+import time
+import tracemalloc
+from bs4 import BeautifulSoup
+import Global
+import Fetcher
+import Page_Cache
+import Player
+import Table_Extractor
+
+REPEATS = 5
+
+
+# Old approach: row.find('td', {"data-stat": ...}) for every column.
+def legacyParse(html):
+    soup = BeautifulSoup(html, "html.parser")
+    tables = {}
+    for tableId, (schema, fileName) in Player.PLAYER_TABLES.items():
+        table = soup.find("table", id=tableId)
+        body = table.find("tbody") if table is not None else None
+        data = []
+        if body is not None:
+            for row in body.find_all("tr"):
+                try:
+                    data.append([row.find(["th", "td"], {"data-stat": stat}).text for _, stat, _ in schema])
+                except AttributeError:
+                    continue
+        tables[fileName] = data
+    return tables
+
+
+# New approach: parse only our tables & walk each row once.
+def extractorParse(html):
+    soup = Table_Extractor.parseTables(html, Player.PLAYER_TABLES.keys())
+    return Player.parsePlayerWebsite(soup)
+
+
+# Streaming approach: the page arrives in chunks like Fetcher.getTables().
+def streamParse(html):
+    scanner = Table_Extractor.newTableScanner(Player.PLAYER_TABLES.keys())
+    for start in range(0, len(html), Fetcher.STREAM_CHUNK_SIZE):
+        if Table_Extractor.feedScanner(scanner, html[start:start + Fetcher.STREAM_CHUNK_SIZE]):
+            break
+    return Player.parsePlayerWebsite(Table_Extractor.getScannedTables(scanner))
+
+
+# Runs a parse function REPEATS times. Returns the average time in ms.
+def timeParse(parseFunction, html):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        parseFunction(html)
+    return (time.perf_counter() - start) / REPEATS * 1000
+
+
+# Runs a parse function once. Returns the peak memory it allocated in MB.
+def peakMemory(parseFunction, html):
+    tracemalloc.start()
+    parseFunction(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / (1024 * 1024)
+
+
+def loadPage(source):
+    if source.startswith("http"):
+        entry = Page_Cache.lookup(source)
+        if entry is None:
+            sys.exit(f"'{source}' is not in the page cache ({Global.CACHE_PATH}).")
+        return entry["content"]
+    with open(source, "rb") as htmlFile:
+        return htmlFile.read()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python Benchmark_Parse.py <player website .html | player URL>")
+    page = loadPage(sys.argv[1])
+
+    print(f"Page size: {len(page) / 1024:.0f} KB  (parser: {Table_Extractor.getParser()})")
+    results = [("html.parser + row.find", legacyParse),
+               ("Table_Extractor", extractorParse),
+               ("Streaming table scanner", streamParse)]
+    baseline = None
+    for name, parseFunction in results:
+        parseTime = timeParse(parseFunction, page)
+        baseline = baseline or parseTime
+        print(f"{name:<25} {parseTime:8.1f} ms/page  {peakMemory(parseFunction, page):6.1f} MB peak  "
+              f"({baseline / parseTime:.1f}x)")
+    if streamParse(page) != extractorParse(page):
+        print("Note: the streaming scanner also reads tables hidden in HTML comments, so its output can differ.")
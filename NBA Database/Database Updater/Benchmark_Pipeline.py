@@ -0,0 +1,289 @@
+# Benchmarks the whole scrape -> parse -> write pipeline without touching
+#  Basketball-Reference. Fixture pages (team roster, player & schedule
+#  websites) are served by a local HTTP server & Global.SITE_MIRROR_URL sends
+#  every request there. The database is written to a temporary folder.
+#
+#  Fixtures live in "Benchmark Fixtures", laid out like the site's URLs
+#  (e.g. "Benchmark Fixtures/teams/ATL/2025.html"), & are committed with the
+#  repository. They can be RECORDED from the page cache after a real run
+#  ("record" below). Any page without a recorded fixture is synthesized into
+#  "Benchmark Fixtures/Synthesized" (not committed).
+#
+#  Each run reports these stages separately (summed over every worker thread,
+#  as recorded by Metrics.py):
+#    fetch      - downloading websites
+#    parse      - building Soup objs & reading tables out of them
+#    write      - writing tables (Storage.writeTable)
+#    log update - flushing file updates (Update_Journal)
+#  & prints the results as JSON, so runs can be compared over time.
+#
+#  Usage: python Benchmark_Pipeline.py team|season [output .json]
+#         python Benchmark_Pipeline.py record <team> <seasonEndYr>
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+import Global
+import Fetcher
+import Http_Client
+import Metrics
+import Page_Cache
+import Player
+import Request_Ticker
+import Schedule
+import Team
+import Team_Registry
+import Update_Database
+import Update_Journal
+
+FIXTURE_PATH = Global.BASE_PATH + "/Database Updater/Benchmark Fixtures"
+SYNTHESIZED_PATH = FIXTURE_PATH + "/Synthesized"
+SEASON_END_YR = 2025
+BENCHMARK_TEAM = "Atlanta Hawks"
+PLAYERS_PER_TEAM = 15
+SEASON_MONTHS = ["october", "november", "december", "january", "february", "march", "april", "may", "june"]
+STAGES = {"fetch": "request", "parse": "parse", "write": "write", "log update": "log update"}  # -> Metrics name
+
+
+# Runs a pipeline against the local server. Returns the results (dictionary).
+def runBenchmark(name, pipeline, players):
+    Metrics.resetMetrics()
+    Request_Ticker.resetTicker()
+    start = time.perf_counter()
+    pipeline()
+    Update_Journal.flush()
+    elapsed = time.perf_counter() - start
+
+    downloaded = Metrics.getMetric("bytes downloaded")
+    return {"run": name, "players": players, "requests": Request_Ticker.totalRequests,
+            "connections opened": Http_Client.getConnectionStats()["connections"],
+            "megabytes downloaded": round(downloaded["total"] / (1024 * 1024), 1) if downloaded else 0,
+            "wall seconds": round(elapsed, 3),
+            "players per minute": round(players / elapsed * 60, 1) if elapsed > 0 else None,
+            "stages": {stage: summarize(Metrics.getMetric(metricName)) for stage, metricName in STAGES.items()}}
+
+
+def summarize(metric):
+    if metric is None:
+        return {"calls": 0, "total seconds": 0, "mean ms": None, "p95 ms": None}
+    return {"calls": metric["count"], "total seconds": round(metric["total"], 3),
+            "mean ms": round(metric["mean"] * 1000, 2), "p95 ms": round(metric["p95"] * 1000, 2)}
+
+
+# Full-team run: roster -> team & player folders -> every player's stats
+def runTeam(seasonPath):
+    Update_Database.buildTeamFolder(seasonPath, BENCHMARK_TEAM, SEASON_END_YR)
+    Player.updatePlayerFolders(Update_Database.getFolderPaths(f"{seasonPath}/{BENCHMARK_TEAM}"))
+    return None
+
+
+# Full-season run: schedule, every team & every player's stats
+def runSeason():
+    Update_Database.createSeasonFolder(SEASON_END_YR - 1, SEASON_END_YR, playerStats=True)
+    return None
+
+
+# Serves the fixtures. Pages without a recorded fixture are served from the
+#  synthesized ones & player websites without either get the synthesized
+#  "players/template.html".
+class FixtureHandler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real site
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=FIXTURE_PATH, **kwargs)
+
+    def translate_path(self, path):
+        filePath = super().translate_path(path)
+        if not os.path.isfile(filePath):
+            filePath = SYNTHESIZED_PATH + filePath[len(FIXTURE_PATH):]
+        if not os.path.isfile(filePath) and path.startswith("/players/"):
+            filePath = SYNTHESIZED_PATH + "/players/template.html"
+        return filePath
+
+    def handle(self):
+        try:
+            super().handle()
+        except ConnectionResetError:  # Client stopped reading early (see Fetcher.getTables())
+            pass
+
+    def log_message(self, format, *args):  # Keep the benchmark output clean
+        pass
+
+
+# Starts the local server on a free port. Returns the server.
+def startServer():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    Global.SITE_MIRROR_URL = f"http://127.0.0.1:{server.server_address[1]}"
+    return server
+
+
+# Points the database at a temporary folder & turns off everything that
+#  would hide the pipeline's real cost (page cache, rate limit).
+def useTemporaryDatabase():
+    Team_Registry.loadRegistry()  # Read from the real database before BASE_PATH moves
+    Global.BASE_PATH = tempfile.mkdtemp(prefix="NBA Benchmark ")
+    Global.JOURNAL_PATH = Global.BASE_PATH + "/update journal.csv"
+    Global.SQLITE_PATH = Global.BASE_PATH + "/NBA Database.sqlite"
+    Global.SCHEDULE_INDEX_PATH = Global.BASE_PATH + "/Schedule Index"
+    Global.PAGE_CACHE_ENABLED = False
+    Request_Ticker.REQUEST_LIMIT = 10 ** 9
+    Request_Ticker.BURST_LIMIT = 10 ** 9
+    return Global.BASE_PATH
+
+
+# Writes a fixture page at the path of its URL (within the recorded fixtures,
+#  or another folder like SYNTHESIZED_PATH).
+def writeFixture(url, content, folderPath=FIXTURE_PATH):
+    filePath = folderPath + url[len(Global.SITE_URL):]
+    os.makedirs(os.path.dirname(filePath), exist_ok=True)
+    with open(filePath, "wb") as fixtureFile:
+        fixtureFile.write(content if isinstance(content, bytes) else content.encode("utf-8"))
+    return None
+
+
+def hasFixture(url):
+    return os.path.isfile(FIXTURE_PATH + url[len(Global.SITE_URL):])
+
+
+# Copies a team's roster, player & schedule (every month) websites from the
+#  page cache into the fixtures. Returns the number of pages recorded.
+def recordFixtures(team, seasonEndYr):
+    rosterUrl = Team_Registry.getTeamWebsite(team, seasonEndYr)
+    scheduleUrl = f"{Global.SITE_URL}/leagues/NBA_{seasonEndYr}_games.html"
+    urls = [rosterUrl, scheduleUrl]
+    rosterEntry = Page_Cache.lookup(rosterUrl)
+    if rosterEntry is not None:
+        roster = Team.parseRoster(Fetcher.parsePage(rosterEntry["content"]), team)
+        urls += [player[8] for player in roster[1:]]
+    scheduleEntry = Page_Cache.lookup(scheduleUrl)
+    if scheduleEntry is not None:
+        urls += Schedule.getMonthWebsites(Fetcher.parsePage(scheduleEntry["content"]), seasonEndYr).values()
+
+    recorded = 0
+    for url in urls:
+        entry = Page_Cache.lookup(url)
+        if entry is None:
+            print(f"[ ] {url} is not in the page cache")
+            continue
+        writeFixture(url, entry["content"])
+        recorded += 1
+    return recorded
+
+
+# Synthesizes every fixture that wasn't recorded: the schedule (the season
+#  website is the first month, with links to every month), a roster per team
+#  & one shared player website (~1 MB, like the real ones).
+def synthesizeFixtures():
+    rng = random.Random(0)
+    teams = Team_Registry.getTeamNames()
+    scheduleUrl = f"{Global.SITE_URL}/leagues/NBA_{SEASON_END_YR}_games.html"
+    if not hasFixture(scheduleUrl):
+        writeFixture(scheduleUrl, synthesizeSchedule(teams, SEASON_MONTHS[0], rng), SYNTHESIZED_PATH)
+    for month in SEASON_MONTHS:
+        monthUrl = f"{Global.SITE_URL}/leagues/NBA_{SEASON_END_YR}_games-{month}.html"
+        if not hasFixture(monthUrl):
+            writeFixture(monthUrl, synthesizeSchedule(teams, month, rng), SYNTHESIZED_PATH)
+    for team in teams:
+        rosterUrl = Team_Registry.getTeamWebsite(team, SEASON_END_YR)
+        if not hasFixture(rosterUrl):
+            writeFixture(rosterUrl, synthesizeRoster(team, rng), SYNTHESIZED_PATH)
+    writeFixture(f"{Global.SITE_URL}/players/template.html", synthesizePlayer(rng), SYNTHESIZED_PATH)
+    return None
+
+
+# 1 month of games (a season's games spread over SEASON_MONTHS), with the
+#  month links every schedule website has.
+def synthesizeSchedule(teams, month, rng):
+    monthNumber = datetime.strptime(month, "%B").month
+    year = SEASON_END_YR - 1 if monthNumber >= 8 else SEASON_END_YR
+    links = [f'<div><a href="/leagues/NBA_{SEASON_END_YR}_games-{name}.html">{name.capitalize()}</a></div>'
+             for name in SEASON_MONTHS]
+    rows = []
+    for game in range(len(teams) * 41 // len(SEASON_MONTHS)):
+        home, visitor = rng.sample(teams, 2)
+        gameDate = date(year, monthNumber, 1 + game % 28)
+        rows.append(f'<tr><th data-stat="date_game"><a href="#">{gameDate:%a, %b} {gameDate.day}, {year}</a></th>'
+                    f'<td data-stat="game_start_time">7:30p</td>'
+                    f'<td data-stat="visitor_team_name"><a href="#">{visitor}</a></td>'
+                    f'<td data-stat="visitor_pts">{rng.randint(90, 130)}</td>'
+                    f'<td data-stat="home_team_name"><a href="#">{home}</a></td>'
+                    f'<td data-stat="home_pts">{rng.randint(90, 130)}</td>'
+                    f'<td data-stat="arena_name">Arena</td></tr>')
+    return (f'<html><body><div class="filter">{"".join(links)}</div>'
+            f'<table id="schedule"><tbody>{"".join(rows)}</tbody></table></body></html>')
+
+
+def synthesizeRoster(team, rng):
+    abbreviation = Team_Registry.getAbbreviation(team)
+    rows = ['<tr><th>Player</th></tr>']
+    for i in range(PLAYERS_PER_TEAM):
+        rows.append(f'<tr><td data-stat="player"><a href="/players/x/{abbreviation.lower()}{i:02d}.html">'
+                    f'{abbreviation} Player {i}</a></td><td data-stat="pos">G</td>'
+                    f'<td data-stat="height">6-{rng.randint(0, 11)}</td><td data-stat="weight">{rng.randint(180, 260)}</td>'
+                    f'<td data-stat="birth_date">June 1, 2000</td><td data-stat="flag"><span></span> us</td>'
+                    f'<td data-stat="years_experience">{rng.randint(0, 15)}</td></tr>')
+    return f'<html><body><div id="div_roster"><table>{"".join(rows)}</table></div></body></html>'
+
+
+def synthesizePlayer(rng):
+    def table(tableId, schema, rows):
+        body = []
+        for i in range(rows):
+            cells = []
+            for _, stat, transform in schema:
+                if stat == "year_id":
+                    text = f"{2010 + i}-{(11 + i) % 100:02d}"
+                elif stat == "date":
+                    text = f"{SEASON_END_YR - 1}-11-{i + 1:02d}"
+                elif stat == "game_result":
+                    text = f"{rng.choice('WL')} 110-10{i}"
+                else:
+                    text = str(rng.randint(0, 40))
+                cells.append(f'<td data-stat="{stat}">{text}</td>')
+            body.append(f'<tr>{"".join(cells)}</tr>')
+        return f'<table id="{tableId}"><tbody>{"".join(body)}</tbody></table>'
+
+    parts = ['<html><head><title>Player</title></head><body>',
+             '<div>' + '<p class="filler">Lorem ipsum <a href="#">link</a></p>' * 8000 + '</div>']
+    for tableId, (schema, _) in Player.PLAYER_TABLES.items():
+        html = table(tableId, schema, 5 if tableId == "last5" else 15)
+        parts.append(f'<div><!--\n{html}\n--></div>' if tableId == "advanced" else html)  # Like the site
+    parts.append('<div>' + '<span>footer</span>' * 8000 + '</div></body></html>')
+    return "".join(parts)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "record":
+        if len(sys.argv) != 4:
+            sys.exit("Usage: python Benchmark_Pipeline.py record <team> <seasonEndYr>")
+        print(f"Recorded {recordFixtures(sys.argv[2], int(sys.argv[3]))} fixture pages.")
+        sys.exit()
+    if len(sys.argv) not in (2, 3) or sys.argv[1] not in ("team", "season"):
+        sys.exit("Usage: python Benchmark_Pipeline.py team|season [output .json]")
+
+    synthesizeFixtures()
+    databasePath = useTemporaryDatabase()
+    localServer = startServer()
+    try:
+        if sys.argv[1] == "team":
+            seasonFolder = f"{databasePath}/{SEASON_END_YR - 1}-{SEASON_END_YR} Season"
+            os.makedirs(seasonFolder)
+            results = runBenchmark("team", lambda: runTeam(seasonFolder), PLAYERS_PER_TEAM)
+        else:
+            results = runBenchmark("season", runSeason, PLAYERS_PER_TEAM * len(Team_Registry.getTeamNames()))
+    finally:
+        localServer.shutdown()
+        shutil.rmtree(databasePath, ignore_errors=True)
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if len(sys.argv) == 3:
+        with open(sys.argv[2], "w", encoding='utf-8') as resultsFile:
+            resultsFile.write(output)
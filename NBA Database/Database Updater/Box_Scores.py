@@ -0,0 +1,256 @@
+# This program fills every player's "player game log.csv" from box scores.
+#  One box score website covers BOTH teams of a game (~26 players), so a
+#  night of games costs ~1 request per game instead of 1 request per player:
+#
+#    https://www.basketball-reference.com/boxscores/202410220BOS.html
+#      * box-BOS-game-basic  - home team's players
+#      * box-NYK-game-basic  - visiting team's players
+#
+#  The games come from the season's game schedule (see Schedule_Index.py).
+#  Every finished game is fetched once. Its player lines are matched to the
+#  player folders by player website & merged into their game logs (same
+#  columns as Player.GAME_LOG_SCHEMA). Ingested games are kept in
+#  "box scores ingested.csv" inside the season folder, so nightly runs only
+#  fetch the new games:
+#
+#    Game,Date,Home Team,Visitor Team
+#    202410220BOS,2024-10-22,Boston Celtics,New York Knicks
+#
+#  Each updated game log also rewrites "player last 5 games.csv" (its last 5
+#  games), so nightly updates don't need the player websites at all. Lines of
+#  players without a player folder yet (e.g. just signed) are kept in
+#  "box scores unmatched.csv" & merged once their folder exists.
+import os
+from datetime import datetime
+import Global
+import Fetcher
+import Parse_Pipeline
+import Player
+import Schedule_Index
+import Storage
+import Team_Registry
+import Update_Database
+import Update_Journal
+
+INGESTED_FILE = "box scores ingested.csv"
+UNMATCHED_FILE = "box scores unmatched.csv"
+GAME_LOG_FILE = "player game log.csv"
+LAST_5_GAMES_FILE = "player last 5 games.csv"
+FIRST_BOX_SCORE_STAT = 6  # Player.GAME_LOG_SCHEMA index of "minutes played"
+
+
+# Fetches every finished game of the season that wasn't ingested yet & adds
+#  its player lines to the players' game logs. Games on/after "today" (or
+#  without a score, e.g. postponed) aren't finished. Returns the number of
+#  games ingested.
+def ingestBoxScores(seasonPath, today=None):
+    today = (today or datetime.now()).date()
+    seasonEndYr = getSeasonEndYr(seasonPath)
+    ingested = loadIngested(seasonPath)
+    games = [game for game in Schedule_Index.loadScheduleIndex(seasonPath)["games"]
+             if isFinished(game, today) and getGameId(game, seasonEndYr) not in ingested]
+    waiting = loadUnmatched(seasonPath)
+    if not games and not waiting:
+        print("[X] Box scores are up to date.")
+        return 0
+
+    folders = getPlayerFolderIndex(seasonPath, seasonEndYr)
+    newRows = {}      # folderPath -> {date: game log row}
+    unmatched = []    # Lines still without a player folder
+    finished = []
+
+    def addLine(line):
+        website, _, team, row = line
+        folderPath = findPlayerFolder(folders, website, team)
+        if folderPath is None:
+            unmatched.append(line)
+        else:
+            newRows.setdefault(folderPath, {})[row[0]] = row
+
+    def collectGame(gameId, lines):
+        for line in lines:
+            addLine(line)
+        finished.append(gamesById[gameId])
+
+    for line in waiting:
+        addLine(line)
+    jobs = []
+    gamesById = {getGameId(game, seasonEndYr): game for game in games}
+    for gameId, game in gamesById.items():
+        home = Team_Registry.getAbbreviation(game["home"], seasonEndYr)
+        visitor = Team_Registry.getAbbreviation(game["visitor"], seasonEndYr)
+        jobs.append((gameId, getBoxScoreUrl(game, seasonEndYr), [getTableId(home), getTableId(visitor)],
+                     parseBoxScorePage, (game["date"].isoformat(), home, visitor)))
+    if jobs:
+        print(f"[X] Fetching {len(games)} box scores:")
+    failed = Parse_Pipeline.runPipeline(jobs, collectGame)
+
+    for folderPath, rows in newRows.items():
+        mergeGameLog(folderPath, rows)
+    saveUnmatched(seasonPath, unmatched)
+    markIngested(seasonPath, finished, seasonEndYr)
+    Update_Journal.flush()
+
+    print(f"[X] {len(finished)} box scores -> {len(newRows)} player game logs updated.")
+    if unmatched:
+        players = sorted({f"{name} ({team})" for _, name, team, _ in unmatched})
+        print(f">> {len(players)} players have no player folder yet (signed after the season was built): "
+              f"{', '.join(players)}. Their games are added once the folder exists. <<")
+    if failed:
+        print(f">> {len(failed)} box scores failed. They'll be fetched again next run. <<")
+    return len(finished)
+
+
+# Parse stage (runs in a parse process, see Parse_Pipeline.py). Returns the
+#  game's player lines: [(player website, player name, team, game log row)].
+#  Raises ValueError if either team's table or total is missing.
+def parseBoxScorePage(html, gameDate, home, visitor):
+    soup = Fetcher.parsePage(html)
+    points = {team: getTeamPoints(soup, team) for team in (home, visitor)}
+    lines = []
+    for team, opponent in ((home, visitor), (visitor, home)):
+        won = points[team] > points[opponent]
+        result = [gameDate, team, opponent, "home" if team == home else "away",
+                  "W" if won else "L", f"{points[team]}-{points[opponent]}"]
+        for website, name, stats in readPlayerLines(soup, getTableId(team)):
+            lines.append((website, name, team, result + stats))
+    return lines
+
+
+# Reads the player rows of a box score table. Rows without stats (e.g. "Did
+#  Not Play") & the "Reserves" header row are skipped.
+def readPlayerLines(soup, tableId):
+    table = soup.find("table", id=tableId)
+    if table is None:
+        return []
+    lines = []
+    for row in (table.find("tbody") or table).find_all("tr"):
+        cells = {cell.get("data-stat"): cell for cell in row.find_all(["th", "td"], recursive=False)}
+        link = cells["player"].find("a") if "player" in cells else None
+        if link is None:
+            continue
+        try:
+            stats = [transform(cells[stat].text) if transform else cells[stat].text
+                     for _, stat, transform in Player.GAME_LOG_SCHEMA[FIRST_BOX_SCORE_STAT:]]
+        except (KeyError, IndexError, ValueError):
+            continue
+        lines.append((Global.SITE_URL + link["href"], link.text, stats))
+    return lines
+
+
+# Team total points, from the box score table's footer. Raises ValueError if
+#  the table or its total is missing, so the game fails & isn't marked
+#  ingested (it's fetched again next run).
+def getTeamPoints(soup, team):
+    table = soup.find("table", id=getTableId(team))
+    footer = table.find("tfoot") if table is not None else None
+    cell = footer.find("td", {"data-stat": "pts"}) if footer is not None else None
+    if cell is None or not cell.text.strip().isdigit():
+        raise ValueError(f"box score has no '{getTableId(team)}' table or team total")
+    return int(cell.text)
+
+
+# Adds rows (1 per game date) to a player's game log & rewrites their last
+#  5 games from it. A game already in the log is replaced. Rows are kept in
+#  date order.
+def mergeGameLog(folderPath, rows):
+    header = [header for header, _, _ in Player.GAME_LOG_SCHEMA]
+    table = Storage.readTable(f"{folderPath}/{GAME_LOG_FILE}")
+    games = {row[0]: row for row in table[1:] if row} if table and table[0] == header else {}
+    games.update(rows)
+    gameLog = [header] + [games[gameDate] for gameDate in sorted(games)]
+    Player.writeData(filepath=f"{folderPath}/{GAME_LOG_FILE}", data=gameLog)
+    Player.writeData(filepath=f"{folderPath}/{LAST_5_GAMES_FILE}", data=getLast5Games(gameLog))
+    return None
+
+
+# The last 5 rows of a game log, without the "location" column (same
+#  columns as Player.LAST_5_GAMES_SCHEMA).
+def getLast5Games(gameLog):
+    location = gameLog[0].index("location")
+    return [row[:location] + row[location + 1:] for row in gameLog[:1] + gameLog[1:][-5:]]
+
+
+# Maps every player website to its player folder(s) in the season:
+#  {website: {team abbreviation (that season's): folderPath}}. A traded
+#  player has a folder in each team.
+def getPlayerFolderIndex(seasonPath, seasonEndYr):
+    folders = {}
+    for teamPath in Update_Database.getFolderPaths(seasonPath):
+        team = os.path.basename(teamPath)
+        abbreviation = Team_Registry.getAbbreviation(team, seasonEndYr) if Team_Registry.getTeam(team) else ""
+        for playerPath in Update_Database.getFolderPaths(teamPath):
+            try:
+                website = Player.getPlayerUrl(f"{playerPath}/log information.csv")
+            except IndexError:  # No "player characteristics.csv"
+                continue
+            folders.setdefault(website, {})[abbreviation] = playerPath
+    return folders
+
+
+# Returns the player's folder for the team they played for, or any of their
+#  folders (e.g. traded mid-season & the new team's folder DNE yet).
+def findPlayerFolder(folders, website, team):
+    playerFolders = folders.get(website)
+    if not playerFolders:
+        return None
+    return playerFolders.get(team) or next(iter(playerFolders.values()))
+
+
+# Returns the set of game ids already ingested in a season folder.
+def loadIngested(seasonPath):
+    table = Storage.readTable(f"{seasonPath}/{INGESTED_FILE}")
+    return {row[0] for row in table[1:] if row}
+
+
+def markIngested(seasonPath, games, seasonEndYr):
+    table = Storage.readTable(f"{seasonPath}/{INGESTED_FILE}") or [["Game", "Date", "Home Team", "Visitor Team"]]
+    table += [[getGameId(game, seasonEndYr), game["date"].isoformat(), game["home"], game["visitor"]]
+              for game in games]
+    Storage.writeTable(f"{seasonPath}/{INGESTED_FILE}", table)
+    return None
+
+
+# Returns the saved lines of players that had no player folder:
+#  [(player website, player name, team, game log row)].
+def loadUnmatched(seasonPath):
+    table = Storage.readTable(f"{seasonPath}/{UNMATCHED_FILE}")
+    return [(row[0], row[1], row[2], row[3:]) for row in table[1:] if row]
+
+
+# Replaces the saved unmatched lines (see loadUnmatched()).
+def saveUnmatched(seasonPath, lines):
+    if not lines and not loadUnmatched(seasonPath):
+        return None
+    header = ["Player Website", "Player", "Team"] + [header for header, _, _ in Player.GAME_LOG_SCHEMA]
+    Storage.writeTable(f"{seasonPath}/{UNMATCHED_FILE}",
+                       [header] + [[website, name, team] + row for website, name, team, row in lines])
+    return None
+
+
+# A game is finished once it has a score. Schedules saved before scores were
+#  kept only have the date to go by.
+def isFinished(game, today):
+    return game["date"] < today and ("Home Points" not in game or game["Home Points"] != "")
+
+
+# "202410220BOS" (date + 0 + home team's abbreviation that season)
+def getGameId(game, seasonEndYr):
+    return f"{game['date']:%Y%m%d}0{Team_Registry.getAbbreviation(game['home'], seasonEndYr)}"
+
+
+def getBoxScoreUrl(game, seasonEndYr):
+    return f"{Global.SITE_URL}/boxscores/{getGameId(game, seasonEndYr)}.html"
+
+
+# ".../2013-2014 Season" -> 2014
+def getSeasonEndYr(seasonPath):
+    return int(os.path.basename(seasonPath).replace(" Season", "").split("-")[1])
+
+
+def getTableId(team):
+    return f"box-{team}-game-basic"
+
+
+if __name__ == "__main__":
+    ingestBoxScores(Global.BASE_PATH + "/2024-2025 Season")
@@ -0,0 +1,55 @@
+# This program keeps track of which parts ("work units") of a season build
+#  are already finished, so a build that crashed or got rate-limited midway
+#  can resume where it stopped instead of starting over. Finished units are
+#  appended to "build checkpoint.csv" inside the season folder:
+#
+#    Unit,Date Finished,Time Finished
+#    schedule,2024-11-07,11:18:53
+#    team:Atlanta Hawks,2024-11-07,11:19:02
+#    player:Atlanta Hawks/Trae Young,2024-11-07,11:25:40
+import csv
+import os
+import threading
+from datetime import datetime
+
+CHECKPOINT_FILE = "build checkpoint.csv"
+lock = threading.Lock()
+
+
+# Returns the set of finished units of a season folder.
+def loadCheckpoint(seasonPath):
+    finished = set()
+    try:
+        with open(f"{seasonPath}/{CHECKPOINT_FILE}", "r", encoding="utf-8") as csvFile:
+            csvReader = csv.reader(csvFile)
+            next(csvReader, None)  # Skip Headers
+            for line in csvReader:
+                if line:
+                    finished.add(line[0])
+    except FileNotFoundError:
+        pass
+    return finished
+
+
+# Marks a unit as finished. Written to disk right away, so the checkpoint
+#  survives a crash. Safe to call from many threads.
+def markFinished(seasonPath, unit, finished=None):
+    now = datetime.now()
+    with lock:
+        newFile = not os.path.exists(f"{seasonPath}/{CHECKPOINT_FILE}")
+        with open(f"{seasonPath}/{CHECKPOINT_FILE}", "a", encoding="utf-8", newline='') as csvFile:
+            csvWriter = csv.writer(csvFile)
+            if newFile:
+                csvWriter.writerow(["Unit", "Date Finished", "Time Finished"])
+            csvWriter.writerow([unit, now.strftime("%Y-%m-%d"), now.strftime("%H:%M:%S")])
+        if finished is not None:
+            finished.add(unit)
+    return None
+
+
+def getTeamUnit(team):
+    return f"team:{team}"
+
+
+def getPlayerUnit(team, player):
+    return f"player:{team}/{player}"
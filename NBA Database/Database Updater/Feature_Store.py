@@ -0,0 +1,370 @@
+# This program turns our database into the inputs of the bet models in the
+#  main README (points regression, team win, 3-pointers & rebounds). Instead of
+#  opening every "player totals.csv"/"player advanced stats.csv" each time a
+#  model needs data, buildFeatureStore() reads the database ONCE into typed
+#  NumPy columns & saves them to Global.FEATURE_STORE_PATH:
+#
+#    > Feature Store
+#        * meta.json           - player keys, team names & column names
+#        * season stats.npy    - float32 [player, season stat]
+#        * player team.npy     - int16   [player] (index in Team_Registry order)
+#        * game player.npy     - int32   [game row] (index of the player)
+#        * game date.npy       - int64   [game row] (days since 1970-01-01)
+#        * game stats.npy      - float32 [game row, game stat]
+#
+#  A "player" here is one player folder, i.e. (season folder, team, player).
+#  The .npy files are memory-mapped when loaded, so getFeatureMatrix() can
+#  serve a full feature matrix for any bet type in milliseconds.
+import json
+import os
+from datetime import date
+import numpy as np
+import Global
+import Rolling_Stats
+import Schedule_Index
+import Storage
+import Team_Registry
+
+# Feature column -> (file, CSV header). Values come from the player's row
+#  for the same season as the season folder.
+SEASON_STATS = {
+    "games": ("player totals.csv", "games"),
+    "minutes": ("player totals.csv", "minutes played"),
+    "fg": ("player totals.csv", "field goals"),
+    "fga": ("player totals.csv", "field goal att"),
+    "fg3": ("player totals.csv", "3-Pts"),
+    "fg3a": ("player totals.csv", "3-Pts Att"),
+    "ft": ("player totals.csv", "free throws"),
+    "fta": ("player totals.csv", "free throw att"),
+    "orb": ("player totals.csv", "offensive rebounds"),
+    "drb": ("player totals.csv", "defensive rebounds"),
+    "trb": ("player totals.csv", "total rebounds"),
+    "ast": ("player totals.csv", "assists"),
+    "tov": ("player totals.csv", "turnovers"),
+    "pts": ("player totals.csv", "total pts"),
+    "ts_pct": ("player advanced stats.csv", "true shooting pct"),
+    "fg3a_rate": ("player advanced stats.csv", "3-Pts att rate"),
+    "orb_pct": ("player advanced stats.csv", "offensive rebound rate"),
+    "drb_pct": ("player advanced stats.csv", "defensive rebound rate"),
+    "trb_pct": ("player advanced stats.csv", "total rebound rate"),
+    "usg_pct": ("player advanced stats.csv", "player usage pct"),
+}
+
+# Feature column -> CSV header of the per-game files in GAME_FILES
+GAME_STATS = {
+    "minutes": "minutes played",
+    "fg": "field goals", "fga": "field goal att",
+    "fg3": "3-Pts", "fg3a": "3-Pts Att",
+    "ft": "free throws", "fta": "free throw att",
+    "trb": "total rebounds", "ast": "assists", "tov": "turnovers",
+    "pts": "pts", "win": "win/loss",
+}
+GAME_FILES = ["player game log.csv", "player last 5 games.csv"]
+
+# Team game features from the schedule index & the team's rolling ratings
+#  (from the scores in the game schedule)
+TEAM_CONTEXT = ["home", "rest days", "back to back", "opponent rest days", "game number"]
+TEAM_RATINGS = ["points", "points allowed", "margin", "win pct"]
+TEAM_WINDOW = 10  # Games used for a team's rolling ratings
+EPOCH = date(1970, 1, 1).toordinal()  # Game dates are stored as days since EPOCH
+
+store = None  # Loaded feature store, see loadFeatureStore()
+
+
+# Reads the whole database (or only some season folders) into NumPy columns
+#  & saves them to Global.FEATURE_STORE_PATH. Returns the number of players.
+def buildFeatureStore(seasonFolders=None):
+    teamNames = Team_Registry.getTeamNames()
+    keys = []
+    seasonStats = []
+    playerTeams = []
+    gamePlayers, gameDates, gameStats = [], [], []
+
+    for seasonFolder, team, player, folderPath in getPlayerFolders(seasonFolders):
+        playerIndex = len(keys)
+        keys.append([seasonFolder, team, player])
+        playerTeams.append(teamNames.index(team) if team in teamNames else -1)
+
+        tables = {fileName: Storage.readTable(f"{folderPath}/{fileName}")
+                  for fileName in {file for file, _ in SEASON_STATS.values()}}
+        seasonStats.append(getSeasonRow(tables, seasonFolder))
+
+        for gameDate, stats in getGameRows(folderPath):
+            gamePlayers.append(playerIndex)
+            gameDates.append(gameDate)
+            gameStats.append(stats)
+
+    os.makedirs(Global.FEATURE_STORE_PATH, exist_ok=True)
+    saveArray("season stats", np.array(seasonStats, dtype=np.float32).reshape(-1, len(SEASON_STATS)))
+    saveArray("player team", np.array(playerTeams, dtype=np.int16))
+    saveArray("game player", np.array(gamePlayers, dtype=np.int32))
+    saveArray("game date", np.array(gameDates, dtype=np.int64))
+    saveArray("game stats", np.array(gameStats, dtype=np.float32).reshape(-1, len(GAME_STATS)))
+    with open(f"{Global.FEATURE_STORE_PATH}/meta.json", "w", encoding='utf-8') as metaFile:
+        json.dump({"players": keys, "teams": teamNames,
+                   "season stats": list(SEASON_STATS), "game stats": list(GAME_STATS)}, metaFile)
+
+    unloadFeatureStore()
+    print(f"[X] Feature store built: {len(keys)} players, {len(gamePlayers)} games.")
+    return len(keys)
+
+
+# Loads the feature store (memory-mapped, so nothing is read until used).
+#  Only happens once per run.
+def loadFeatureStore():
+    global store
+    if store is not None:
+        return store
+
+    with open(f"{Global.FEATURE_STORE_PATH}/meta.json", "r", encoding='utf-8') as metaFile:
+        meta = json.load(metaFile)
+    store = {"meta": meta,
+             "seasonCols": {name: i for i, name in enumerate(meta["season stats"])},
+             "gameCols": {name: i for i, name in enumerate(meta["game stats"])}}
+    for name in ["season stats", "player team", "game player", "game date", "game stats"]:
+        store[name] = np.load(f"{Global.FEATURE_STORE_PATH}/{name}.npy", mmap_mode='r')
+    return store
+
+
+def unloadFeatureStore():
+    global store
+    store = None
+
+
+# Returns (X, keys, featureNames) for a bet type:
+#   "points"   - Will Player X make more than Y points?
+#   "threes"   - Will Player X have more than K+ three-pointers?
+#   "rebounds" - Will Player X have more than K+ rebounds?
+#   "team win" - Will Team M beat Team N?
+#  X is a float32 matrix (1 row per key). Keys are [season folder, team,
+#  player] for player bets & [season folder, team, game date] for team bets.
+#  Missing stats are NaN. Optionally only returns rows of one season folder.
+def getFeatureMatrix(betType, seasonFolder=None):
+    data = loadFeatureStore()
+    if betType == "team win":
+        X, keys, names = getTeamFeatures(data)
+    else:
+        X, keys, names = getPlayerFeatures(data, betType)
+
+    if seasonFolder is not None:
+        rows = np.array([key[0] == seasonFolder for key in keys], dtype=bool)
+        X = X[rows]
+        keys = [key for key, keep in zip(keys, rows) if keep]
+    return X, keys, names
+
+
+def getPlayerFeatures(data, betType):
+    stats = np.asarray(data["season stats"])
+    col = data["seasonCols"]
+    games = stats[:, col["games"]]
+    last5, _ = getRecentGameStats(data, 5)
+    last10, std10 = getRecentGameStats(data, 10)
+    gameCol = data["gameCols"]
+
+    features = {"minutes per game": safeDivide(stats[:, col["minutes"]], games),
+                "last 5 minutes": last5[:, gameCol["minutes"]]}
+    if betType == "points":
+        features.update({"points per game": safeDivide(stats[:, col["pts"]], games),
+                         "last 5 points": last5[:, gameCol["pts"]],
+                         "last 10 points": last10[:, gameCol["pts"]],
+                         "last 10 points std": std10[:, gameCol["pts"]],
+                         "fg pct": safeDivide(stats[:, col["fg"]], stats[:, col["fga"]]),
+                         "3p pct": safeDivide(stats[:, col["fg3"]], stats[:, col["fg3a"]]),
+                         "ft pct": safeDivide(stats[:, col["ft"]], stats[:, col["fta"]]),
+                         "usage pct": stats[:, col["usg_pct"]]})
+    elif betType == "threes":
+        features.update({"3p made per game": safeDivide(stats[:, col["fg3"]], games),
+                         "3p att per game": safeDivide(stats[:, col["fg3a"]], games),
+                         "3p att rate": stats[:, col["fg3a_rate"]],
+                         "3p pct": safeDivide(stats[:, col["fg3"]], stats[:, col["fg3a"]]),
+                         "last 5 3p made": last5[:, gameCol["fg3"]],
+                         "last 10 3p made": last10[:, gameCol["fg3"]]})
+    elif betType == "rebounds":
+        features.update({"rebounds per game": safeDivide(stats[:, col["trb"]], games),
+                         "offensive rebound rate": stats[:, col["orb_pct"]],
+                         "defensive rebound rate": stats[:, col["drb_pct"]],
+                         "total rebound rate": stats[:, col["trb_pct"]],
+                         "last 5 rebounds": last5[:, gameCol["trb"]],
+                         "last 10 rebounds": last10[:, gameCol["trb"]]})
+    else:
+        raise ValueError(f"Unknown bet type '{betType}'")
+
+    X = np.column_stack(list(features.values())).astype(np.float32)
+    return X, data["meta"]["players"], list(features)
+
+
+# One row per team game (each team's side of every game in the season
+#  schedules): home/away & rest days from the schedule index, plus the
+#  rolling ratings of the team & its opponent over their last TEAM_WINDOW
+#  games BEFORE the game (see TEAM_RATINGS). A game only counts toward the
+#  ratings once it has a score.
+def getTeamFeatures(data):
+    keys, opponents, context, results, groups, days = [], [], [], [], [], []
+    groupIds = {}
+    for seasonFolder in sorted({key[0] for key in data["meta"]["players"]}):
+        seasonPath = f"{Global.BASE_PATH}/{seasonFolder}"
+        index = Schedule_Index.loadScheduleIndex(seasonPath)
+        for team, gameIds in index["byTeam"].items():
+            groupId = groupIds.setdefault((seasonFolder, team), len(groupIds))
+            for gameId in gameIds:
+                game = index["games"][gameId]
+                teamGame = Schedule_Index.getTeamGame(seasonPath, team, game["date"])
+                keys.append([seasonFolder, team, game["date"].isoformat()])
+                opponents.append(teamGame["opponent"])
+                context.append([float(teamGame["home"]), toDays(teamGame["rest days"]),
+                                float(teamGame["back to back"]), toDays(teamGame["opponent rest days"]),
+                                float(teamGame["game number"])])
+                results.append(getGameResult(game, teamGame["home"]))
+                groups.append(groupId)
+                days.append(game["date"].toordinal() - EPOCH)
+
+    ratings = np.full((len(keys), len(TEAM_RATINGS)), np.nan)
+    if keys:
+        order, means, _ = Rolling_Stats.computeRollingStats(np.array(groups), np.array(days), np.array(results),
+                                                            TEAM_WINDOW, includeCurrent=False)
+        ratings[order] = means
+    rowIndex = {tuple(key): i for i, key in enumerate(keys)}
+    opponentRows = [rowIndex[(key[0], opponent, key[2])] for key, opponent in zip(keys, opponents)]
+
+    names = (TEAM_CONTEXT + [f"last {TEAM_WINDOW} {name}" for name in TEAM_RATINGS] +
+             [f"opponent last {TEAM_WINDOW} {name}" for name in TEAM_RATINGS])
+    X = np.column_stack([np.array(context, dtype=np.float64).reshape(-1, len(TEAM_CONTEXT)),
+                         ratings, ratings[opponentRows]]).astype(np.float32)
+    return X, keys, names
+
+
+# [points, points allowed, margin, win] of one side of a game, or NaN if
+#  the game has no score.
+def getGameResult(game, isHome):
+    points = toNumber(game.get("Home Points" if isHome else "Visitor Points", ""))
+    allowed = toNumber(game.get("Visitor Points" if isHome else "Home Points", ""))
+    if np.isnan(points) or np.isnan(allowed):
+        return [np.nan] * len(TEAM_RATINGS)
+    return [points, allowed, points - allowed, float(points > allowed)]
+
+
+def toDays(restDays):
+    return np.nan if restDays is None else float(restDays)
+
+
+# Mean & standard deviation of every game stat over each player's last N
+#  games (see Rolling_Stats.py). Players without games get NaN.
+def getRecentGameStats(data, window):
+    nPlayers = len(data["meta"]["players"])
+    stats = np.asarray(data["game stats"])
+    means = np.full((nPlayers, stats.shape[1]), np.nan, dtype=np.float32)
+    stds = np.full((nPlayers, stats.shape[1]), np.nan, dtype=np.float32)
+
+    players, lastMeans, lastStds = Rolling_Stats.getLatestRollingStats(
+        np.asarray(data["game player"]), np.asarray(data["game date"]), stats, window)
+    means[players] = lastMeans
+    stds[players] = lastStds
+    return means, stds
+
+
+# Returns the player's stats for the season of the season folder. If the
+#  player played for several teams, the row with the most games (the season
+#  total) is used.
+def getSeasonRow(tables, seasonFolder):
+    values = [np.nan] * len(SEASON_STATS)
+    bestRows = {}
+    for fileName, table in tables.items():
+        if len(table) < 2 or "season" not in table[0]:
+            continue
+        header = table[0]
+        seasonCol = header.index("season")
+        gamesCol = header.index("games") if "games" in header else header.index("total games")
+        rows = [row for row in table[1:] if len(row) == len(header) and row[seasonCol] == seasonFolder]
+        if rows:
+            bestRows[fileName] = (header, max(rows, key=lambda row: toNumber(row[gamesCol])))
+
+    for i, (fileName, columnName) in enumerate(SEASON_STATS.values()):
+        if fileName in bestRows and columnName in bestRows[fileName][0]:
+            header, row = bestRows[fileName]
+            values[i] = toNumber(row[header.index(columnName)])
+    return values
+
+
+# Yields (date, stats) for every game found in the player's GAME_FILES. A
+#  game found in several files is only kept once. Only games of the folder's
+#  season are kept ("player last 5 games.csv" always holds the CURRENT
+#  season's games, which would leak future games into older seasons).
+def getGameRows(folderPath):
+    firstDay, lastDay = getSeasonDays(os.path.dirname(os.path.dirname(folderPath)))
+    seen = set()
+    for fileName in GAME_FILES:
+        table = Storage.readTable(f"{folderPath}/{fileName}")
+        if len(table) < 2:
+            continue
+        header = table[0]
+        columns = [header.index(name) if name in header else None for name in GAME_STATS.values()]
+        for row in table[1:]:
+            try:
+                gameDate = date.fromisoformat(row[header.index("date")]).toordinal() - EPOCH
+            except (ValueError, IndexError):
+                continue
+            if gameDate in seen or not firstDay <= gameDate <= lastDay:
+                continue
+            seen.add(gameDate)
+            yield gameDate, [toNumber(row[c]) if c is not None and c < len(row) else np.nan for c in columns]
+
+
+# Returns the first & last day (days since EPOCH) of a season's games, from
+#  its game schedule (see Schedule_Index.py), so late seasons like 2019-20
+#  (bubble games until Oct 11, 2020) are fully covered. Without a schedule,
+#  every day counts as the season's.
+def getSeasonDays(seasonPath):
+    games = Schedule_Index.loadScheduleIndex(seasonPath)["games"]
+    if not games:
+        return -np.inf, np.inf
+    return games[0]["date"].toordinal() - EPOCH, games[-1]["date"].toordinal() - EPOCH
+
+
+# Yields (season folder, team, player, folder path) for every player folder.
+def getPlayerFolders(seasonFolders=None):
+    for seasonFolder in sorted(os.listdir(Global.BASE_PATH)):
+        seasonPath = f"{Global.BASE_PATH}/{seasonFolder}"
+        if not seasonFolder.endswith(" Season") or not os.path.isdir(seasonPath):
+            continue
+        if seasonFolders is not None and seasonFolder not in seasonFolders:
+            continue
+        for team in sorted(os.listdir(seasonPath)):
+            if not os.path.isdir(f"{seasonPath}/{team}"):
+                continue
+            for player in sorted(os.listdir(f"{seasonPath}/{team}")):
+                if os.path.isdir(f"{seasonPath}/{team}/{player}"):
+                    yield seasonFolder, team, player, f"{seasonPath}/{team}/{player}"
+
+
+# Converts a CSV value to a float. Handles percentages (".345"), minutes
+#  ("34:12"), plus/minus ("+5") & win/loss ("W" -> 1, "L" -> 0). Returns NaN
+#  for anything else.
+def toNumber(value):
+    value = value.strip()
+    if value in ("W", "L"):
+        return 1.0 if value == "W" else 0.0
+    try:
+        if ":" in value:
+            minutes, seconds = value.split(":")
+            return int(minutes) + int(seconds) / 60
+        return float(value)
+    except ValueError:
+        return np.nan
+
+
+def safeDivide(numerator, denominator):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = np.asarray(numerator, dtype=np.float64) / np.asarray(denominator, dtype=np.float64)
+    result[~np.isfinite(result)] = np.nan
+    return result.astype(np.float32)
+
+
+def saveArray(name, array):
+    np.save(f"{Global.FEATURE_STORE_PATH}/{name}.npy", array)
+
+
+if __name__ == "__main__":
+    buildFeatureStore()
+    for bet in ["points", "threes", "rebounds", "team win"]:
+        X, rowKeys, featureNames = getFeatureMatrix(bet)
+        print(f"{bet}: {X.shape[0]} rows x {X.shape[1]} features {featureNames}")
@@ -0,0 +1,147 @@
+# This program is responsible for fetching websites for every other program
+#  in the "Database Updater" folder. Instead of each program calling
+#  requests.get() one at a time, we keep several requests in flight using a
+#  thread pool, over the kept-alive connections of Http_Client.py. Every
+#  request still goes through Request_Ticker, so the shared
+#  requests-per-minute budget is honored no matter how many threads are
+#  running. Pages found in the local Page_Cache skip the network (and the
+#  ticker) entirely.
+#
+#  When only a few tables of a website are needed, pass their ids as
+#  "tableIds": the website is streamed in chunks through a table scanner (see
+#  Table_Extractor.py) & only those tables are turned into a Soup obj.
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from bs4 import BeautifulSoup
+import Global
+import Http_Client
+import Metrics
+import Request_Ticker
+import Page_Cache
+import Table_Extractor
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+# Fetches a single website and returns it as a Soup obj. With tableIds, the
+#  Soup obj only holds those tables.
+def fetchPage(url, tableIds=None):
+    return getSoup(url, tableIds)
+
+
+# Fetches a list of websites concurrently. Yields (url, soup) tuples in the
+#  order the websites arrive, NOT the order they were given. Parsing happens
+#  on the worker threads, so the next request can go out while a page
+#  is being parsed.
+def fetchPages(urls, maxWorkers=Global.MAX_FETCH_WORKERS, tableIds=None):
+    urls = list(urls)
+    if len(urls) == 0:
+        return
+
+    with ThreadPoolExecutor(max_workers=min(maxWorkers, len(urls))) as pool:
+        futures = {pool.submit(getSoup, url, tableIds): url for url in urls}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+# Gets a website & parses it. Called by the worker threads in fetchPages().
+def getSoup(url, tableIds=None):
+    if tableIds is not None:
+        return Table_Extractor.getScannedTables(getTables(url, tableIds))
+    return parsePage(getContent(url))
+
+
+def parsePage(content):
+    with Metrics.timer("parse"):
+        return BeautifulSoup(content, Table_Extractor.getParser())
+
+
+# Returns the raw HTML (bytes) of a website. Fresh pages come from the page
+#  cache. Stale pages are revalidated with a conditional request, which only
+#  downloads the page again if it changed. In offline mode, we never touch
+#  the network.
+def getContent(url):
+    entry, content = getCachedContent(url)
+    if content is not None:
+        return content
+
+    Request_Ticker.addRequest()
+    with Metrics.timer("request"):
+        response = Http_Client.get(getRequestUrl(url), headers=Page_Cache.getValidators(entry))
+    Metrics.count("bytes downloaded", len(response.content))
+    Http_Client.recordWireBytes(response)
+
+    if response.status_code == 304 and entry is not None:  # Not modified
+        Page_Cache.refresh(entry)
+        return entry["content"]
+    response.raise_for_status()  # e.g. 404. Never parse an error page
+
+    if Global.PAGE_CACHE_ENABLED and response.status_code == 200:
+        Page_Cache.store(url, response.content, response.headers)
+    return response.content
+
+
+# Same as getContent(), but the website is fed through a table scanner as it
+#  downloads. Returns the scanner (see Table_Extractor.newTableScanner()).
+#  Without the page cache, the download stops as soon as every table was
+#  found. With it, the rest of the page is still read (but never parsed) so
+#  the full page can be cached.
+def getTables(url, tableIds):
+    scanner = Table_Extractor.newTableScanner(tableIds)
+    entry, content = getCachedContent(url)
+    if content is not None:
+        Table_Extractor.feedScanner(scanner, content)
+        return scanner
+
+    Request_Ticker.addRequest()
+    with Metrics.timer("request"), \
+            Http_Client.get(getRequestUrl(url), headers=Page_Cache.getValidators(entry), stream=True) as response:
+        if response.status_code == 304 and entry is not None:  # Not modified
+            Page_Cache.refresh(entry)
+            Table_Extractor.feedScanner(scanner, entry["content"])
+            return scanner
+        response.raise_for_status()
+
+        keepPage = Global.PAGE_CACHE_ENABLED and response.status_code == 200
+        chunks = []
+        for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+            Metrics.count("bytes downloaded", len(chunk))
+            if keepPage:
+                chunks.append(chunk)
+            if not Table_Extractor.isScanDone(scanner):
+                Table_Extractor.feedScanner(scanner, chunk)
+            elif not keepPage:
+                break
+        Http_Client.recordWireBytes(response)
+
+        if keepPage:
+            Page_Cache.store(url, b"".join(chunks), response.headers)
+    return scanner
+
+
+# Sends Basketball-Reference requests to Global.SITE_MIRROR_URL (if set).
+def getRequestUrl(url):
+    if Global.SITE_MIRROR_URL and url.startswith(Global.SITE_URL):
+        return Global.SITE_MIRROR_URL + url[len(Global.SITE_URL):]
+    return url
+
+
+# Looks the website up in the page cache. Returns (cache entry, content).
+#  Content is None if the page must be (re)downloaded.
+def getCachedContent(url):
+    if not (Global.PAGE_CACHE_ENABLED or Global.OFFLINE_MODE):
+        return None, None
+
+    entry = Page_Cache.lookup(url)
+    if entry is not None and (Global.OFFLINE_MODE or Page_Cache.isFresh(entry)):
+        Page_Cache.recordStat("hits")
+        return entry, entry["content"]
+    Page_Cache.recordStat("misses")
+    if Global.OFFLINE_MODE:
+        raise FileNotFoundError(f"Offline mode: '{url}' is not in the page cache.")
+    return entry, None
+
+
+if __name__ == "__main__":
+    for link, page in fetchPages(["https://www.basketball-reference.com/teams/ATL/2025.html",
+                                  "https://www.basketball-reference.com/teams/BOS/2025.html"]):
+        print(link, page.title.text)
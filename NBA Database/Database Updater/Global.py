@@ -4,3 +4,67 @@
 
 # Path to our local database within our repository
 BASE_PATH = "/Users/speak_easy/Python UNM/NBA-Parlay-Bets/NBA Database"
+
+# Max number of web requests we keep "in flight" at the same time. Requests
+#  still go through Request_Ticker, so this only hides round-trip latency.
+MAX_FETCH_WORKERS = 4
+
+# Local cache of websites we've already downloaded (see Page_Cache.py).
+#  Pages younger than CACHE_TTL are read from disk & cost no requests. Older
+#  pages are revalidated with the site (ETag/Last-Modified). Oldest pages are
+#  evicted once the cache grows past CACHE_MAX_BYTES.
+PAGE_CACHE_ENABLED = True
+CACHE_PATH = BASE_PATH + "/Database Updater/Page Cache"
+CACHE_TTL_HOURS = 12
+CACHE_MAX_BYTES = 500 * 1024 * 1024
+
+# If True, websites are ONLY read from the page cache (no network at all).
+#  Useful to re-run the updaters or test the parsers offline.
+OFFLINE_MODE = False
+
+# Parser used by BeautifulSoup. "lxml" is much faster than Python's built-in
+#  "html.parser", which we fall back to if lxml isn't installed.
+HTML_PARSER = "lxml"
+
+# Where table data (rosters, player stats, schedules) gets written:
+#   "csv"    - the folder tree of CSV files (see "NBA Database/README.md")
+#   "sqlite" - a single SQLite file at SQLITE_PATH (see Storage.py)
+#   "both"   - write to both
+STORAGE_BACKEND = "csv"
+SQLITE_PATH = BASE_PATH + "/NBA Database.sqlite"
+
+# Append-only journal of every file update (see Update_Journal.py). Folder
+#  "log information.csv" files are rewritten from it once per run.
+JOURNAL_PATH = BASE_PATH + "/update journal.csv"
+JOURNAL_FLUSH_EVERY = 500  # Flush after this many unsaved updates
+JOURNAL_COMPACT_RATIO = 2  # Compact once it holds this many rows per file tracked
+
+# Days between refreshes of a player's career tables (totals, 36-min &
+#  advanced) during season updates. Game logs & last 5 games come from box
+#  scores every night (see Box_Scores.py), so player websites are only
+#  fetched this often.
+CAREER_STATS_REFRESH_DAYS = 7
+
+# Folder holding the NumPy feature store used by the bet models (see
+#  Feature_Store.py).
+FEATURE_STORE_PATH = BASE_PATH + "/Feature Store"
+
+# Folder holding the pickled schedule indexes (see Schedule_Index.py).
+SCHEDULE_INDEX_PATH = BASE_PATH + "/Schedule Index"
+
+# Base URL of every website we scrape.
+SITE_URL = "https://www.basketball-reference.com"
+
+# If set, every request to Basketball-Reference is sent to this URL instead
+#  (e.g. "http://127.0.0.1:8000" for the local server in Benchmark_Pipeline.py).
+#  Pages are still cached & logged under their real URL.
+SITE_MIRROR_URL = None
+
+# Seconds to wait for a connection & for the website's data (see
+#  Http_Client.py). A request that times out counts as a failed page.
+HTTP_TIMEOUT = (10, 30)
+
+# Number of processes that parse websites (see Parse_Pipeline.py). Parsing
+#  is CPU-bound, so it runs on other cores while the fetch threads wait on the
+#  network. 1 -> parse on the fetch threads (no process pool).
+PARSE_PROCESSES = 4
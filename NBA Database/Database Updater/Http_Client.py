@@ -0,0 +1,221 @@
+# This program holds the ONE HTTP session every updater downloads through
+#  (see Fetcher.py). Calling requests.get() opens a new TCP + TLS connection
+#  per website. The shared session keeps connections alive between requests
+#  instead, so a season build (~500 websites) pays for the handshake ~once
+#  per fetch thread. The session also sets:
+#
+#    * the same User-Agent & Accept headers on every request
+#    * compressed downloads (gzip/deflate, & brotli if it's installed)
+#    * at most Global.MAX_FETCH_WORKERS connections per host
+#    * Global.HTTP_TIMEOUT (connect, read) seconds, so a dead connection
+#      can't hang a fetch thread forever
+#
+#  Throttling: Sports-Reference answers too many requests with a 429 "Rate
+#  Limited Request" page & jails the IP for an hour if we keep going. So
+#  429/5xx responses (& dropped connections) are never handed to a parser:
+#
+#    * 429     - trips the circuit breaker: Request_Ticker pauses EVERY fetch
+#                thread for the site's Retry-After (at least BREAKER_PAUSE)
+#                & halves the request rate.
+#    * 5xx     - this request backs off (exponential, with jitter) & retries.
+#                BREAKER_THRESHOLD in a row also trip the breaker.
+#    * success - wins back a bit of the request rate.
+#
+#  A request that still fails after MAX_RETRIES raises requests.HTTPError (or
+#  the connection error), so the work unit fails & resumes next run.
+#
+#  Metrics used (see Metrics.py):
+#    http requests, http connections opened - counts (the difference was
+#                                             served by a reused connection)
+#    bytes on the wire                      - counts (compressed, as sent)
+#    http throttled, http retries           - counts
+#    rate limit sleep                       - seconds (incl. backoff)
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+import Global
+import Metrics
+import Request_Ticker
+
+try:  # Optional: lets the site send brotli, which is smaller than gzip
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; NBA-Parlay-Bets Database Updater)",
+           "Accept": "text/html,application/xhtml+xml",
+           "Accept-Encoding": ACCEPT_ENCODING,
+           "Connection": "keep-alive"}
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 4
+BACKOFF_BASE = 2           # Seconds. Attempt n backs off up to BACKOFF_BASE * 2^n...
+BACKOFF_MAX = 120          # ...but never longer than this
+BREAKER_THRESHOLD = 3      # Throttled responses in a row that trip the breaker
+BREAKER_PAUSE = 5 * 60     # Seconds the pipeline pauses when the breaker trips
+
+session = None
+sessionLock = threading.Lock()
+throttledInARow = 0
+rng = random.Random()
+
+
+# Connection pools that count every NEW connection they open.
+class CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        Metrics.count("http connections opened")
+        return super()._new_conn()
+
+
+class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        Metrics.count("http connections opened")
+        return super()._new_conn()
+
+
+# Sends a GET request through the shared session. Returns the response
+#  (same as requests.get()). Throttled responses are retried (see top of
+#  file); the caller has already waited on Request_Ticker for the first try.
+def get(url, headers=None, stream=False):
+    for attempt in range(MAX_RETRIES + 1):
+        if attempt > 0:
+            Metrics.count("http retries")
+            Request_Ticker.addRequest()
+        Metrics.count("http requests")
+        try:
+            response = getSession().get(url, headers=headers, stream=stream, timeout=Global.HTTP_TIMEOUT)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == MAX_RETRIES:
+                raise
+            backOff(attempt, recordThrottle(None, None))
+            continue
+
+        if response.status_code not in RETRY_STATUSES:
+            recordSuccess()
+            return response
+        retryAfter = getRetryAfter(response)
+        response.close()  # Never parse the "Rate Limited Request" page
+        pauseSeconds = recordThrottle(response.status_code, retryAfter)
+        if attempt == MAX_RETRIES:
+            response.raise_for_status()
+        backOff(attempt, pauseSeconds)
+    return None
+
+
+# Counts a throttled response (status None = dropped connection) & trips the
+#  breaker if needed. Returns the seconds the breaker paused every request
+#  for (0 if it didn't trip).
+def recordThrottle(status, retryAfter):
+    global throttledInARow
+    Metrics.count("http throttled")
+    with sessionLock:
+        throttledInARow += 1
+        tripped = status == 429 or throttledInARow >= BREAKER_THRESHOLD
+        if tripped:
+            throttledInARow = 0
+    if not tripped:
+        return 0
+
+    pauseSeconds = max(BREAKER_PAUSE, retryAfter or 0)
+    if Request_Ticker.getPauseSeconds() > 0:  # Already tripped by another fetch thread
+        Request_Ticker.pause(pauseSeconds)
+        return pauseSeconds
+    rateScale = Request_Ticker.slowDown()
+    Request_Ticker.pause(pauseSeconds)
+    print(f"\n>> SITE IS THROTTLING US ({status or 'connection dropped'}) - PAUSING EVERY REQUEST FOR "
+          f"{Metrics.formatSeconds(pauseSeconds)}, THEN {rateScale:.0%} OF THE RATE LIMIT <<")
+    return pauseSeconds
+
+
+def recordSuccess():
+    global throttledInARow
+    with sessionLock:
+        throttledInARow = 0
+    Request_Ticker.speedUp()
+    return None
+
+
+# Waits before the next attempt. If the breaker paused every request, the
+#  next Request_Ticker.addRequest() waits for it; otherwise this request backs
+#  off on its own: a random time up to BACKOFF_BASE * 2^attempt ("full jitter",
+#  so the fetch threads don't all retry at once).
+def backOff(attempt, pauseSeconds):
+    if pauseSeconds:
+        return None
+    delay = rng.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+    time.sleep(delay)
+    Request_Ticker.addSleepTime(delay)
+    return None
+
+
+# Returns the response's Retry-After in seconds (it's either seconds or an
+#  HTTP date), or None.
+def getRetryAfter(response):
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return int(value)
+    try:
+        retryAt = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retryAt.tzinfo is None:
+        retryAt = retryAt.replace(tzinfo=timezone.utc)
+    return max(0.0, (retryAt - datetime.now(timezone.utc)).total_seconds())
+
+
+# Adds the bytes a response took on the wire (before decompression) to the
+#  "bytes on the wire" metric. Call once the body was read (or the download
+#  was stopped early).
+def recordWireBytes(response):
+    Metrics.count("bytes on the wire", response.raw.tell())
+    return None
+
+
+# Returns the shared session (made on first use).
+def getSession():
+    global session
+    with sessionLock:
+        if session is None:
+            session = newSession()
+    return session
+
+
+def newSession():
+    httpSession = requests.Session()
+    httpSession.headers.update(HEADERS)
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=Global.MAX_FETCH_WORKERS, pool_block=True)
+    adapter.poolmanager.pool_classes_by_scheme = {"http": CountingHTTPConnectionPool,
+                                                  "https": CountingHTTPSConnectionPool}
+    httpSession.mount("http://", adapter)
+    httpSession.mount("https://", adapter)
+    return httpSession
+
+
+# Closes every kept-alive connection (e.g. after Global.SITE_MIRROR_URL
+#  changed). The next request starts a new session.
+def closeSession():
+    global session
+    with sessionLock:
+        if session is not None:
+            session.close()
+            session = None
+    return None
+
+
+# Returns {"requests", "connections", "reused"} (reused = requests that didn't
+#  open a new connection).
+def getConnectionStats():
+    requestCount = Metrics.getMetric("http requests")
+    connectionCount = Metrics.getMetric("http connections opened")
+    requestCount = requestCount["count"] if requestCount else 0
+    connectionCount = connectionCount["count"] if connectionCount else 0
+    return {"requests": requestCount, "connections": connectionCount,
+            "reused": max(requestCount - connectionCount, 0)}
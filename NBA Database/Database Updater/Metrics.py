@@ -0,0 +1,184 @@
+# This program measures where the time of a long run (e.g. a season build)
+#  goes. Other programs report to it as they work:
+#
+#    with Metrics.timer("parse"):        - time a stage
+#        ...
+#    Metrics.count("bytes downloaded", len(content))
+#
+#  Every metric keeps its count, total & max (+ a sample of values for
+#  percentiles). Metrics are also added to the current thread's work unit
+#  (see workUnit()), so the slowest teams/players can be found. A progress
+#  view (startProgress/advanceProgress) prints the percent done & ETA, and
+#  printSummary() prints everything at the end of the run.
+#
+#  Metrics used by the updaters:
+#    request, parse, write, log update, rate limit sleep - seconds
+#    bytes downloaded, cache hits, cache misses, cache revalidated - counts
+#    http requests, http connections opened, bytes on the wire,
+#    http throttled, http retries                                 - counts
+#    files changed, files unchanged (see Storage.writeTable())    - counts
+from contextlib import contextmanager
+import random
+import threading
+import time
+from tabulate import tabulate
+
+MAX_SAMPLES = 10000      # Values kept per metric for percentiles
+PROGRESS_INTERVAL = 5    # Seconds between progress lines
+
+lock = threading.Lock()
+metrics = {}             # name -> {"count", "total", "max", "samples"}
+units = {}               # work unit -> {"seconds": wall time, name: total}
+progress = None          # {"label", "total", "done", "start", "lastPrint"}
+current = threading.local()
+rng = random.Random(0)
+
+
+# Adds a value (seconds or an amount) to a metric. Returns nothing.
+def record(name, value=1):
+    unit = getattr(current, "unit", None)
+    with lock:
+        metric = metrics.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0, "samples": []})
+        metric["count"] += 1
+        metric["total"] += value
+        metric["max"] = max(metric["max"], value)
+        if len(metric["samples"]) < MAX_SAMPLES:
+            metric["samples"].append(value)
+        else:  # Reservoir sampling keeps the sample representative
+            i = rng.randrange(metric["count"])
+            if i < MAX_SAMPLES:
+                metric["samples"][i] = value
+        if unit is not None:
+            values = units.setdefault(unit, {"seconds": 0.0})
+            values[name] = values.get(name, 0) + value
+    return None
+
+
+def count(name, amount=1):
+    record(name, amount)
+    return None
+
+
+# Times the code inside the "with" block under a metric name.
+@contextmanager
+def timer(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+# Everything recorded by this thread inside the "with" block is also added
+#  to the work unit (e.g. "team: Atlanta Hawks").
+@contextmanager
+def workUnit(unit):
+    previous = getattr(current, "unit", None)
+    current.unit = unit
+    with lock:
+        units.setdefault(unit, {"seconds": 0.0})
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        with lock:
+            units[unit]["seconds"] += time.perf_counter() - start
+        current.unit = previous
+
+
+# Returns {"count", "total", "mean", "max", "p50", "p95"} of a metric, or
+#  None if nothing was recorded.
+def getMetric(name):
+    with lock:
+        metric = metrics.get(name)
+        if metric is None:
+            return None
+        samples = sorted(metric["samples"])
+        return {"count": metric["count"], "total": metric["total"],
+                "mean": metric["total"] / metric["count"], "max": metric["max"],
+                "p50": samples[len(samples) // 2],
+                "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))]}
+
+
+# Starts a progress view for a number of work items.
+def startProgress(total, label):
+    global progress
+    with lock:
+        progress = {"label": label, "total": total, "done": 0,
+                    "start": time.perf_counter(), "lastPrint": 0.0}
+    return None
+
+
+# Marks 1 work item as done. Prints the progress line at most every
+#  PROGRESS_INTERVAL seconds (and when the last item is done).
+def advanceProgress():
+    with lock:
+        if progress is None:
+            return None
+        progress["done"] += 1
+        now = time.perf_counter()
+        if now - progress["lastPrint"] < PROGRESS_INTERVAL and progress["done"] < progress["total"]:
+            return None
+        progress["lastPrint"] = now
+        line = getProgressLine(progress, now)
+    print(line)
+    return None
+
+
+# "[Players] 120/450 (27%) | 4m 10s elapsed | ETA 11m 28s | 28.8/min"
+def getProgressLine(state, now):
+    elapsed = now - state["start"]
+    done, total = state["done"], state["total"]
+    rate = done / elapsed if elapsed > 0 else 0
+    eta = formatSeconds((total - done) / rate) if rate > 0 else "?"
+    return (f"[{state['label']}] {done}/{total} ({done / total:.0%}) | {formatSeconds(elapsed)} elapsed | "
+            f"ETA {eta} | {rate * 60:.1f}/min")
+
+
+# Prints every metric & the slowest work units. Returns nothing.
+def printSummary(slowestUnits=5):
+    rows = []
+    for name in sorted(metrics):
+        metric = getMetric(name)
+        if name in ("bytes downloaded", "bytes on the wire") or name.startswith(("cache", "http", "files")):
+            rows.append([name, metric["count"], formatAmount(name, metric["total"]), "", "", ""])
+        else:
+            rows.append([name, metric["count"], f"{metric['total']:.1f} s", f"{metric['mean'] * 1000:.1f} ms",
+                         f"{metric['p95'] * 1000:.1f} ms", f"{metric['max'] * 1000:.1f} ms"])
+    print("\nRun summary:")
+    print(tabulate(rows, headers=["Metric", "Count", "Total", "Mean", "p95", "Max"]))
+
+    with lock:
+        slowest = sorted(units.items(), key=lambda item: item[1]["seconds"], reverse=True)[:slowestUnits]
+    if slowest:
+        print("\nSlowest work units:")
+        print(tabulate([[unit, f"{values['seconds']:.1f} s",
+                         f"{values.get('request', 0):.1f} s", f"{values.get('rate limit sleep', 0):.1f} s",
+                         f"{values.get('parse', 0):.1f} s", f"{values.get('write', 0):.1f} s"]
+                        for unit, values in slowest],
+                       headers=["Work Unit", "Wall", "Request", "Rate Limit", "Parse", "Write"]))
+    return None
+
+
+# Forgets every metric, work unit & the progress view.
+def resetMetrics():
+    global progress
+    with lock:
+        metrics.clear()
+        units.clear()
+        progress = None
+    return None
+
+
+def formatAmount(name, total):
+    if name in ("bytes downloaded", "bytes on the wire"):
+        return f"{total / (1024 * 1024):.1f} MB"
+    return f"{total:.0f}"
+
+
+def formatSeconds(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h {minutes}m"
+    return f"{minutes}m {seconds}s" if minutes else f"{seconds}s"
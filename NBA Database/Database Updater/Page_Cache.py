@@ -0,0 +1,153 @@
+# This program keeps a local copy of every website we download so that repeat
+#  updates read from disk instead of the network (and don't use up any of
+#  Request_Ticker's requests). Each page is stored gzip-compressed under the
+#  hash of its URL, next to a small JSON file holding its ETag/Last-Modified
+#  headers & the time it was downloaded:
+#
+#    > Page Cache
+#        * <sha256 of url>.html.gz
+#        * <sha256 of url>.json
+#
+#  A page is "fresh" for Global.CACHE_TTL_HOURS. Stale pages are revalidated
+#  by Fetcher.py with a conditional request. When the cache grows past
+#  Global.CACHE_MAX_BYTES, least recently used pages are evicted.
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+import Global
+import Metrics
+
+lock = threading.Lock()
+stats = {"hits": 0, "misses": 0, "revalidated": 0, "stored": 0, "evicted": 0}
+cacheSize = None  # Total bytes on disk. Computed the first time we need it.
+
+
+# Returns the cached entry of a URL as a dictionary, or None if the URL was
+#  never cached. Entry keys: url, etag, lastModified, fetched, content
+def lookup(url):
+    key = getKey(url)
+    try:
+        with open(f"{Global.CACHE_PATH}/{key}.json", "r", encoding='utf-8') as metaFile:
+            entry = json.load(metaFile)
+        with gzip.open(f"{Global.CACHE_PATH}/{key}.html.gz", "rb") as pageFile:
+            entry["content"] = pageFile.read()
+        os.utime(f"{Global.CACHE_PATH}/{key}.html.gz")  # Marks page as recently used
+    except (json.JSONDecodeError, OSError, EOFError):  # Missing or half-written entry
+        return None
+    return entry
+
+
+# Checks if a URL has a fresh page in the cache without reading the page
+#  itself. Used to plan how many requests a run will need.
+def hasFreshPage(url):
+    try:
+        with open(f"{Global.CACHE_PATH}/{getKey(url)}.json", "r", encoding='utf-8') as metaFile:
+            return isFresh(json.load(metaFile))
+    except (json.JSONDecodeError, OSError):
+        return False
+
+
+# Checks if a cached entry is younger than the cache's TTL.
+def isFresh(entry):
+    return time.time() - entry["fetched"] < Global.CACHE_TTL_HOURS * 3600
+
+
+# Returns the headers needed to ask the website "has this page changed?".
+def getValidators(entry):
+    headers = {}
+    if entry is None:
+        return headers
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("lastModified"):
+        headers["If-Modified-Since"] = entry["lastModified"]
+    return headers
+
+
+# Saves a downloaded page (bytes) & its response headers to the cache.
+def store(url, content, headers):
+    global cacheSize
+    os.makedirs(Global.CACHE_PATH, exist_ok=True)
+    key = getKey(url)
+    pagePath = f"{Global.CACHE_PATH}/{key}.html.gz"
+
+    oldSize = os.path.getsize(pagePath) if os.path.exists(pagePath) else 0
+    with gzip.open(pagePath, "wb", compresslevel=6) as pageFile:
+        pageFile.write(content)
+    writeMeta(key, {"url": url,
+                    "etag": headers.get("ETag"),
+                    "lastModified": headers.get("Last-Modified"),
+                    "fetched": time.time()})
+
+    with lock:
+        stats["stored"] += 1
+        if cacheSize is not None:
+            cacheSize += os.path.getsize(pagePath) - oldSize
+    evict()
+    return None
+
+
+# Marks a stale entry as fresh again. Called when the website answers
+#  "304 Not Modified" to our conditional request.
+def refresh(entry):
+    meta = {k: v for k, v in entry.items() if k != "content"}
+    meta["fetched"] = time.time()
+    writeMeta(getKey(entry["url"]), meta)
+    recordStat("revalidated")
+    return None
+
+
+def writeMeta(key, meta):
+    with open(f"{Global.CACHE_PATH}/{key}.json", "w", encoding='utf-8') as metaFile:
+        json.dump(meta, metaFile)
+
+
+# Deletes the least recently used pages until the cache fits in
+#  Global.CACHE_MAX_BYTES.
+def evict():
+    global cacheSize
+    with lock:
+        if cacheSize is None:
+            cacheSize = sum(os.path.getsize(f"{Global.CACHE_PATH}/{file}")
+                            for file in os.listdir(Global.CACHE_PATH) if file.endswith(".html.gz"))
+        if cacheSize <= Global.CACHE_MAX_BYTES:
+            return None
+
+        pages = [f"{Global.CACHE_PATH}/{file}" for file in os.listdir(Global.CACHE_PATH)
+                 if file.endswith(".html.gz")]
+        pages.sort(key=os.path.getmtime)  # Least recently used first
+        for page in pages:
+            if cacheSize <= Global.CACHE_MAX_BYTES:
+                break
+            cacheSize -= os.path.getsize(page)
+            os.remove(page)
+            os.remove(page.replace(".html.gz", ".json"))
+            stats["evicted"] += 1
+    return None
+
+
+def recordStat(name):
+    with lock:
+        stats[name] += 1
+    Metrics.count(f"cache {name}")
+
+
+# Hashes a URL into the filename used by the cache.
+def getKey(url):
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+
+def printCacheStats():
+    lookups = stats["hits"] + stats["misses"]
+    hitRate = stats["hits"] / lookups * 100 if lookups else 0
+    print(f"Page Cache: {stats['hits']} hits, {stats['misses']} misses ({hitRate:.1f}% hit rate), "
+          f"{stats['revalidated']} revalidated, {stats['stored']} stored, {stats['evicted']} evicted")
+    return None
+
+
+if __name__ == "__main__":
+    evict()
+    printCacheStats()
@@ -0,0 +1,236 @@
+# This program prices parlays: the probability that EVERY leg of a multi-leg
+#  bet hits. A leg is a dictionary:
+#    {"type": "points", "player": "Trae Young", "team": "Atlanta Hawks", "line": 24.5}
+#    {"type": "rebounds" | "threes", ...same keys...}
+#    {"type": "team win", "team": "Atlanta Hawks"}
+#  Player legs are "over" bets (stat > line).
+#
+#  Each leg's own probability comes from our database: the player's recent
+#  games (game log/last 5 games, falling back to season averages) & the
+#  season's game schedule. Legs aren't independent (a fast-paced game helps
+#  every scorer in it), so the parlay is simulated with a Monte Carlo factor
+#  model: every game & every team gets a shared random factor, and each leg
+#  mixes the factors of its game/team with its own noise:
+#    player leg:  z = sqrt(SAME_GAME)*game + sqrt(SAME_TEAM)*team + rest*noise
+#    team win:    z = sqrt(TEAM_WIN)*(team - opponent)/sqrt(2) + rest*result
+#  "result" is shared by both teams of a game with opposite signs, so betting
+#  both teams to win never hits. A leg hits when z lands in the top p of its
+#  distribution. All legs of all parlays are simulated at once & the hits are
+#  bit-packed, so thousands of parlays are priced per second.
+import os
+import time
+from statistics import NormalDist
+import numpy as np
+import Global
+import Feature_Store
+import Schedule_Index
+import Storage
+
+SAME_GAME_CORRELATION = 0.10   # Shared by every player leg in the same game
+SAME_TEAM_CORRELATION = 0.15   # Shared by player legs on the same team
+TEAM_WIN_CORRELATION = 0.30    # How much a team win moves with its players
+SIMULATIONS = 20000
+RECENT_GAMES = 10              # Games used for a player's mean & std dev
+MIN_STD = 1.0                  # Keeps single-game flukes from giving 0% / 100% legs
+PARLAY_CHUNK = 512             # Parlays evaluated per numpy batch
+
+LEG_STATS = {"points": "pts", "rebounds": "trb", "threes": "fg3"}
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint16)
+
+
+# Prices a list of parlays (each a list of legs) for the games on gameDate
+#  (datetime/date or "YYYY-MM-DD"). Returns 1 dictionary per parlay:
+#    {"probability": joint probability (with correlation),
+#     "independent probability": product of the leg probabilities,
+#     "leg probabilities": [...]}
+def priceParlays(parlays, seasonPath, gameDate, simulations=SIMULATIONS, seed=None):
+    gameDate = Schedule_Index.toDate(gameDate)
+    legs, parlayLegs = getUniqueLegs(parlays)
+    games = Schedule_Index.getGamesOnDate(seasonPath, gameDate)
+
+    legProbabilities = np.array([getLegProbability(leg, seasonPath, gameDate, games) for leg in legs])
+    hits = simulateLegs(legs, legProbabilities, games, simulations, np.random.default_rng(seed))
+    jointProbabilities = getJointProbabilities(hits, parlayLegs, simulations)
+
+    results = []
+    for parlay, legIds, probability in zip(parlays, parlayLegs, jointProbabilities):
+        results.append({"probability": float(probability),
+                        "independent probability": float(np.prod(legProbabilities[legIds])),
+                        "leg probabilities": [float(p) for p in legProbabilities[legIds]]})
+    return results
+
+
+# Simulates every leg at once. Returns the hits bit-packed per leg: uint8
+#  [leg + 1, simulations / 8]. The extra last row is "always hits" & pads
+#  parlays with fewer legs.
+def simulateLegs(legs, probabilities, games, simulations, rng):
+    teams = sorted({leg["team"] for leg in legs} | {game["opponent"] for game in games.values()})
+    teamIds = {team: i for i, team in enumerate(teams)}
+    gameIds = {}
+    for team, game in games.items():
+        gameIds[team] = gameIds.get(game["opponent"], len(set(gameIds.values())))
+
+    legGame = np.array([gameIds.get(leg["team"], -1) for leg in legs])
+    legTeam = np.array([teamIds[leg["team"]] for leg in legs])
+    legOpponent = np.array([teamIds[games[leg["team"]]["opponent"]] if leg["team"] in games else -1
+                            for leg in legs])
+    isTeamWin = np.array([leg["type"] == "team win" for leg in legs])
+    hasGame = legGame >= 0
+    side = np.array([1.0 if games.get(leg["team"], {}).get("home", True) else -1.0 for leg in legs],
+                    dtype=np.float32)
+
+    gameFactors = rng.standard_normal((simulations, max(len(set(gameIds.values())), 1)), dtype=np.float32)
+    teamFactors = rng.standard_normal((simulations, max(len(teams), 1)), dtype=np.float32)
+    z = rng.standard_normal((simulations, len(legs)), dtype=np.float32)
+    results = rng.standard_normal((simulations, gameFactors.shape[1]), dtype=np.float32)
+    winLegs = np.flatnonzero(isTeamWin & hasGame)
+    z[:, winLegs] = side[winLegs] * results[:, legGame[winLegs]]
+
+    # Player legs: game + team + own noise (no game factor if the team isn't playing)
+    gameWeight = np.where(hasGame & ~isTeamWin, np.sqrt(SAME_GAME_CORRELATION), 0.0)
+    teamWeight = np.where(~isTeamWin, np.sqrt(SAME_TEAM_CORRELATION), 0.0)
+    # Team win legs: own team factor minus the opponent's
+    winWeight = np.where(isTeamWin & hasGame, np.sqrt(TEAM_WIN_CORRELATION), 0.0)
+    noiseWeight = np.sqrt(1 - gameWeight ** 2 - teamWeight ** 2 - winWeight ** 2)
+
+    z *= noiseWeight.astype(np.float32)
+    z += gameWeight.astype(np.float32) * gameFactors[:, np.maximum(legGame, 0)]
+    z += teamWeight.astype(np.float32) * teamFactors[:, legTeam]
+    z += winWeight.astype(np.float32) * (teamFactors[:, legTeam] - teamFactors[:, np.maximum(legOpponent, 0)]) \
+        / np.float32(np.sqrt(2))
+
+    thresholds = np.array([NormalDist().inv_cdf(1 - min(max(p, 1e-6), 1 - 1e-6)) for p in probabilities],
+                          dtype=np.float32)
+    hits = z > thresholds
+    hits = np.hstack([hits, np.ones((simulations, 1), dtype=bool)])
+    return np.packbits(hits.T, axis=1)
+
+
+# Joint probability of every parlay: AND the packed hits of its legs & count
+#  the bits. Parlays are handled in chunks to bound memory.
+def getJointProbabilities(packedHits, parlayLegs, simulations):
+    padLeg = packedHits.shape[0] - 1
+    maxLegs = max((len(legIds) for legIds in parlayLegs), default=1)
+    legMatrix = np.full((len(parlayLegs), maxLegs), padLeg, dtype=np.int64)
+    for i, legIds in enumerate(parlayLegs):
+        legMatrix[i, :len(legIds)] = legIds
+
+    probabilities = np.empty(len(parlayLegs))
+    for start in range(0, len(parlayLegs), PARLAY_CHUNK):
+        chunk = legMatrix[start:start + PARLAY_CHUNK]
+        allHit = np.bitwise_and.reduce(packedHits[chunk], axis=1)  # [parlay, simulations / 8]
+        probabilities[start:start + PARLAY_CHUNK] = POPCOUNT[allHit].sum(axis=1) / simulations
+    return probabilities
+
+
+# Probability that a single leg hits.
+def getLegProbability(leg, seasonPath, gameDate, games):
+    if leg["type"] == "team win":
+        return getTeamWinProbability(leg["team"], seasonPath, gameDate, games)
+
+    mean, std = getPlayerStatDistribution(f"{seasonPath}/{leg['team']}/{leg['player']}",
+                                          LEG_STATS[leg["type"]], gameDate)
+    if mean is None:
+        return 0.5  # Nothing known about the player
+    return 1 - NormalDist(mean, max(std, MIN_STD)).cdf(leg["line"])
+
+
+# Mean & std dev of a stat over the player's last RECENT_GAMES games before
+#  gameDate. Falls back to a season average (with a Poisson-like std dev)
+#  if we have no game rows: the previous season's if gameDate falls within
+#  the season (its totals include later games). Returns (None, None) if
+#  nothing is known.
+def getPlayerStatDistribution(folderPath, stat, gameDate):
+    statCol = list(Feature_Store.GAME_STATS).index(stat)
+    cutoff = gameDate.toordinal() - Feature_Store.EPOCH
+    games = sorted((day, stats[statCol]) for day, stats in Feature_Store.getGameRows(folderPath)
+                   if day < cutoff and not np.isnan(stats[statCol]))
+    values = np.array([value for _, value in games[-RECENT_GAMES:]])
+    if len(values) > 0:
+        return float(values.mean()), float(values.std())
+
+    seasonPath = os.path.dirname(os.path.dirname(folderPath))
+    season = os.path.basename(seasonPath)
+    if cutoff <= Feature_Store.getSeasonDays(seasonPath)[1]:
+        seasonStartYr = int(season.split("-")[0])
+        season = f"{seasonStartYr - 1}-{seasonStartYr} Season"
+    tables = {fileName: Storage.readTable(f"{folderPath}/{fileName}")
+              for fileName in {file for file, _ in Feature_Store.SEASON_STATS.values()}}
+    row = dict(zip(Feature_Store.SEASON_STATS, Feature_Store.getSeasonRow(tables, season)))
+    if np.isnan(row[stat]) or not row["games"]:
+        return None, None
+    mean = row[stat] / row["games"]
+    return mean, float(np.sqrt(mean))
+
+
+# Team win probability from each team's record before gameDate (log5
+#  method), using the games in the team's players' game logs. 50% if
+#  unknown.
+def getTeamWinProbability(team, seasonPath, gameDate, games):
+    if team not in games:
+        return 0.5
+    teamPct = getWinPct(f"{seasonPath}/{team}", gameDate)
+    opponentPct = getWinPct(f"{seasonPath}/{games[team]['opponent']}", gameDate)
+    denominator = teamPct + opponentPct - 2 * teamPct * opponentPct
+    if denominator == 0:
+        return 0.5
+    return (teamPct - teamPct * opponentPct) / denominator
+
+
+# Win percentage of a team before gameDate, read from its players' game
+#  rows (1 result per date). Regressed toward .500 with 2 fake games each way
+#  so early-season records aren't 0% or 100%.
+def getWinPct(teamPath, gameDate):
+    winCol = list(Feature_Store.GAME_STATS).index("win")
+    cutoff = gameDate.toordinal() - Feature_Store.EPOCH
+    results = {}
+    if os.path.isdir(teamPath):
+        for player in os.listdir(teamPath):
+            if os.path.isdir(f"{teamPath}/{player}"):
+                for day, stats in Feature_Store.getGameRows(f"{teamPath}/{player}"):
+                    if day < cutoff and not np.isnan(stats[winCol]):
+                        results[day] = stats[winCol]
+    return (sum(results.values()) + 2) / (len(results) + 4)
+
+
+# Deduplicates legs shared by several parlays. Returns (legs, parlayLegs)
+#  where parlayLegs[i] are the indexes (in legs) of parlay i's legs.
+def getUniqueLegs(parlays):
+    legIds = {}
+    legs = []
+    parlayLegs = []
+    for parlay in parlays:
+        ids = []
+        for leg in parlay:
+            key = (leg["type"], leg.get("player"), leg["team"], leg.get("line"))
+            if key not in legIds:
+                legIds[key] = len(legs)
+                legs.append(leg)
+            ids.append(legIds[key])
+        parlayLegs.append(ids)
+    return legs, parlayLegs
+
+
+if __name__ == "__main__":
+    # Prices random 2-4 leg parlays for the first game day in the schedule
+    seasonFolder = Global.BASE_PATH + "/2024-2025 Season"
+    firstDay = Schedule_Index.loadScheduleIndex(seasonFolder)["games"][0]["date"]
+    playingTeams = list(Schedule_Index.getGamesOnDate(seasonFolder, firstDay))
+
+    rng = np.random.default_rng(0)
+    candidates = [{"type": "team win", "team": team} for team in playingTeams]
+    for team in playingTeams:
+        for player in sorted(os.listdir(f"{seasonFolder}/{team}"))[:8]:
+            if os.path.isdir(f"{seasonFolder}/{team}/{player}"):
+                for betType, line in [("points", 9.5), ("rebounds", 4.5), ("threes", 1.5)]:
+                    candidates.append({"type": betType, "player": player, "team": team, "line": line})
+    parlaySet = [[candidates[i] for i in rng.choice(len(candidates), size=rng.integers(2, 5), replace=False)]
+                 for _ in range(5000)]
+
+    startTime = time.perf_counter()
+    priced = priceParlays(parlaySet, seasonFolder, firstDay, seed=0)
+    elapsed = time.perf_counter() - startTime
+    print(f"Priced {len(priced)} parlays in {elapsed:.2f} sec ({len(priced) / elapsed:.0f} parlays/sec)")
+    for parlayLegs, result in list(zip(parlaySet, priced))[:3]:
+        print([leg.get("player", leg["team"]) + " " + leg["type"] for leg in parlayLegs],
+              f"{result['probability']:.3f} (independent {result['independent probability']:.3f})")
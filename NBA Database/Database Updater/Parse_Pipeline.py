@@ -0,0 +1,173 @@
+# This program splits an update into 3 stages so the network & the CPU work
+#  at the same time:
+#
+#    fetch  (threads)   - download the raw HTML (only our tables for player
+#                         websites). Goes through Request_Ticker/Page_Cache.
+#    parse  (processes) - build the Soup obj & read the rows out of it. This
+#                         is CPU-bound Python, so it runs in a process pool
+#                         (Global.PARSE_PROCESSES) on the other cores.
+#    write  (1 thread)  - the caller's thread writes every parsed page, so
+#                         Storage & the journal only see one writer.
+#
+#  While pages parse, the fetch threads keep the next requests going. When
+#  pages come from the page cache (e.g. a backfill), fetching is nearly free
+#  & every core parses.
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+import atexit
+import os
+import threading
+import time
+import Global
+import Fetcher
+import Metrics
+import Player
+import Team
+
+MAX_PAGES_IN_FLIGHT = 4  # Per parse process. Limits pages held in memory
+parsePool = None
+parsePoolLock = threading.Lock()
+
+
+# Runs jobs through the fetch -> parse -> write stages. A job is a tuple
+#  (key, url, tableIds, parseFunction, parseArgs):
+#    parseFunction(html, *parseArgs) runs in a parse process & must be a
+#    top-level function (it's sent to the process by name).
+#  writeFunction(key, rows) is called on THIS thread for every parsed page.
+#  Returns the list of keys that failed (to fetch, parse or write).
+def runPipeline(jobs, writeFunction, fetchWorkers=Global.MAX_FETCH_WORKERS):
+    failed = []
+    for key, rows in iterPipeline(jobs, failed, fetchWorkers):
+        try:
+            writeFunction(key, rows)
+        except Exception as error:  # 1 bad write doesn't stop the run
+            print(f">> {key} failed to write: {error} <<")
+            failed.append(key)
+    return failed
+
+
+# Same as runPipeline(), but yields (key, rows) for every parsed page as it
+#  arrives. Keys that fail to fetch or parse are appended to "failed".
+def iterPipeline(jobs, failed, fetchWorkers=Global.MAX_FETCH_WORKERS):
+    jobs = iter(jobs)
+    pending = {}  # future -> (stage, key, job)
+    maxInFlight = max(Global.PARSE_PROCESSES, 1) * MAX_PAGES_IN_FLIGHT + fetchWorkers
+
+    with ThreadPoolExecutor(max_workers=fetchWorkers) as fetchPool:
+        def submitFetches():
+            while len(pending) < maxInFlight:
+                job = next(jobs, None)
+                if job is None:
+                    return
+                pending[fetchPool.submit(fetchHtml, job[1], job[2])] = ("fetch", job[0], job)
+
+        submitFetches()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, key, job = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as error:  # 1 bad page doesn't stop the run
+                    print(f">> {key} failed to {stage}: {error} <<")
+                    failed.append(key)
+                    continue
+
+                if stage == "fetch":
+                    pending[getParsePool().submit(parseInWorker, job[3], result, job[4])] = ("parse", key, job)
+                else:
+                    rows, parseTime = result
+                    Metrics.record("parse", parseTime)
+                    yield key, rows
+            submitFetches()
+
+
+# Fetch stage. Returns the raw HTML of the website, or only the HTML of
+#  the given tables.
+def fetchHtml(url, tableIds=None):
+    if tableIds is None:
+        return Fetcher.getContent(url)
+    return "".join(Fetcher.getTables(url, tableIds)["tables"].values())
+
+
+# Parse stage (runs in a parse process). Returns (rows, seconds), since the
+#  process's own Metrics are lost when it returns.
+def parseInWorker(parseFunction, html, parseArgs):
+    start = time.perf_counter()
+    rows = parseFunction(html, *parseArgs)
+    return rows, time.perf_counter() - start
+
+
+def parsePlayerPage(html):
+    return Player.parsePlayerWebsite(Fetcher.parsePage(html))
+
+
+def parseGameLogPage(html):
+    return Player.updateGameLog(Fetcher.parsePage(html))
+
+
+def parseRosterPage(html, team):
+    return Team.parseRoster(Fetcher.parsePage(html), team)
+
+
+# Same as Player.updatePlayerFolders(), through the pipeline. onWritten(folderPath)
+#  is called once a folder is fully written (e.g. to checkpoint it). Returns
+#  the folders that failed.
+def updatePlayerFolders(folderPaths, onWritten=None):
+    jobs = [(folderPath, Player.getPlayerUrl(f"{folderPath}/log information.csv"),
+             list(Player.PLAYER_TABLES), parsePlayerPage, ()) for folderPath in folderPaths]
+    Metrics.startProgress(len(jobs), "Players")
+
+    def writePlayerFolder(folderPath, tables):
+        for fileName, data in tables.items():
+            Player.writeData(filepath=f"{folderPath}/{fileName}", data=data)
+        print(f"    [X] {os.path.basename(folderPath)}")
+        Metrics.advanceProgress()
+        if onWritten is not None:
+            onWritten(folderPath)
+
+    return runPipeline(jobs, writePlayerFolder)
+
+
+# Same as Player.updateGameLogs(), through the pipeline. onWritten(folderPath)
+#  is called once a folder's game log is written. Returns the folders that
+#  failed.
+def updateGameLogs(folderPaths, onWritten=None):
+    jobs = [(folderPath, Player.getGameLogUrl(f"{folderPath}/log information.csv"),
+             list(Player.GAME_LOG_TABLES), parseGameLogPage, ()) for folderPath in folderPaths]
+    Metrics.startProgress(len(jobs), "Game logs")
+
+    def writeGameLog(folderPath, data):
+        Player.writeData(filepath=f"{folderPath}/player game log.csv", data=data)
+        print(f"    [X] {os.path.basename(folderPath)} game log")
+        Metrics.advanceProgress()
+        if onWritten is not None:
+            onWritten(folderPath)
+
+    return runPipeline(jobs, writeGameLog)
+
+
+# Downloads & parses many rosters through the pipeline. Yields (team,
+#  roster) tuples as they're parsed. Teams that failed (to fetch or parse)
+#  are appended to "failed".
+def parseRosters(teams, seasonEndYr, failed):
+    jobs = [(team, Team.getRosterWebsite(team, seasonEndYr), None, parseRosterPage, (team,)) for team in teams]
+    yield from iterPipeline(jobs, failed)
+
+
+# Returns the shared process pool (started on first use, stopped at exit).
+def getParsePool():
+    global parsePool
+    with parsePoolLock:
+        if parsePool is None:
+            parsePool = ProcessPoolExecutor(max_workers=max(Global.PARSE_PROCESSES, 1))
+            atexit.register(parsePool.shutdown)
+    return parsePool
+
+
+if __name__ == "__main__":
+    teamPath = Global.BASE_PATH + "/2024-2025 Season/Atlanta Hawks"
+    startTime = time.perf_counter()
+    updatePlayerFolders([f"{teamPath}/{player}" for player in os.listdir(teamPath)
+                         if os.path.isdir(f"{teamPath}/{player}")])
+    print(f"Done in {time.perf_counter() - startTime:.1f} sec")
+    Metrics.printSummary()
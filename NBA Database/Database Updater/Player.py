@@ -5,12 +5,18 @@
 #   3. Player Totals
 #   4. Player 36-Min Stats
 #   5. Player Advanced Stats
-import csv
+#   6. Player Last 5 Games
+#   7. Player Game Log
 import os.path
-import requests
+from datetime import datetime
 from bs4 import BeautifulSoup
 import Update_Database
-import Request_Ticker
+import Fetcher
+import Global
+import Metrics
+import Parse_Pipeline
+import Table_Extractor
+import Storage
 import Team
 from tabulate import tabulate
 
@@ -18,7 +24,7 @@ from tabulate import tabulate
 # Creates a player directory with EMPTY default files. Also populates the
 #  "player characteristics.csv" file without calling updateCharacteristics().
 def initializePlayerFolders(path, characteristicsData):
-    os.makedirs(path)
+    os.makedirs(path, exist_ok=True)  # exist_ok -> resumed season builds
 
     defaultPlayerFiles = ["log information.csv",
                           "player characteristics.csv",
@@ -27,19 +33,18 @@ def initializePlayerFolders(path, characteristicsData):
                           "player 36-Min stats.csv",
                           "player advanced stats.csv"]
 
-    # Create log file to keep track of all other file data
-    with open(f"{path}/{defaultPlayerFiles[0]}", "w", encoding='utf-8'):
+    # Create log file to keep track of all other file data (kept if it
+    #  exists, since unchanged files aren't logged again)
+    with open(f"{path}/{defaultPlayerFiles[0]}", "a", encoding='utf-8'):
         pass
 
     for file in defaultPlayerFiles[1:]:
         if file == defaultPlayerFiles[1]:
-            with open(f"{path}/{file}", "w", encoding='utf-8', newline='') as csvFile:
-                csvWriter = csv.writer(csvFile)
-                csvWriter.writerows(characteristicsData)
+            changed = Storage.writeTable(f"{path}/{file}", characteristicsData)
         else:
-            with open(f"{path}/{file}", "w", encoding='utf-8', newline=''):
-                pass
-        Update_Database.updateLogFile(fileUpdated=file, folderPath=path)
+            changed = Storage.writeTable(f"{path}/{file}", [])
+        if changed:
+            Update_Database.updateLogFile(fileUpdated=file, folderPath=path)
 
     return None
 
@@ -48,27 +53,66 @@ def initializePlayerFolders(path, characteristicsData):
 #  to be within a player folder. It assigns the workload to the correct
 #  function based on keywords in the filename. This function is called from
 #  "Update_Database.py".
+#  Files we can't update (e.g. season projections, no longer supported by
+#  Basketball-Reference) are left as they are.
 def updateFile(fileName, path):
     logPath = path.replace(fileName, "log information.csv")
+    name = fileName.lower()
+    websiteParsers = {"totals": updateTotals, "36-min stats": update36MinStats,
+                      "advanced": updateAdvancedStats, "last 5 games": updateLast5Games}
+    websiteParser = next((parser for keyword, parser in websiteParsers.items() if name.find(keyword) != -1), None)
 
-    soup = getPlayerWebsite(logPath)
-    data = []
-
-    if fileName.find("characteristics") != -1:
+    if name.find("characteristics") != -1:
         data = updateCharacteristics(logPath=logPath)
-    elif fileName.find("season projection") != -1:
-        # Season projections no longer supported by Basketball-Reference
-        pass
-    elif fileName.find("totals") != -1:
-        data = updateTotals(soup=soup)
-    elif fileName.find("36-min stats") != -1:
-        data = update36MinStats(soup=soup)
-    elif fileName.find("advanced") != -1:
-        data = updateAdvancedStats(soup=soup)
+    elif name.find("game log") != -1:  # Separate website per season
+        data = updateGameLog(Fetcher.fetchPage(getGameLogUrl(logPath), tableIds=GAME_LOG_TABLES.keys()))
+    elif websiteParser is not None:
+        data = websiteParser(soup=getPlayerWebsite(logPath))
+    else:
+        print(f">> Can't update '{fileName}' <<")
+        return None
+
+    writeData(filepath=path, data=data)  # Also updates the log file
+
+
+# Updates every stat file in a player folder from a SINGLE download & parse
+#  of the player's website (totals, 36-min, advanced & last 5 games all live
+#  on the same page). A Soup obj can be passed in if the website was already
+#  fetched.
+def updatePlayerFolder(folderPath, soup=None):
+    if soup is None:
+        soup = getPlayerWebsite(f"{folderPath}/log information.csv")
+
+    for fileName, data in parsePlayerWebsite(soup).items():
+        writeData(filepath=f"{folderPath}/{fileName}", data=data)
+    return None
 
-    writeData(filepath=path, data=data)
 
-    Update_Database.updateLogFile(fileUpdated=fileName, folderPath=path)
+# Same as updatePlayerFolder(), but for many players at once. Player
+#  websites are fetched concurrently & each folder is written as soon as its
+#  website arrives. With Global.PARSE_PROCESSES > 1, websites are parsed in
+#  a process pool (see Parse_Pipeline.py).
+def updatePlayerFolders(folderPaths):
+    if Global.PARSE_PROCESSES > 1:
+        Parse_Pipeline.updatePlayerFolders(folderPaths)
+        return None
+
+    logfilePaths = [f"{folderPath}/log information.csv" for folderPath in folderPaths]
+    Metrics.startProgress(len(logfilePaths), "Players")
+    for logfilePath, soup in getPlayerWebsites(logfilePaths):
+        updatePlayerFolder(os.path.dirname(logfilePath), soup=soup)
+        print(f"    [X] {os.path.basename(os.path.dirname(logfilePath))}")
+        Metrics.advanceProgress()
+    return None
+
+
+# Reads every table we keep from a player's website. Returns a dictionary
+#  of {filename: data}.
+def parsePlayerWebsite(soup):
+    return {"player totals.csv": updateTotals(soup),
+            "player 36-Min stats.csv": update36MinStats(soup),
+            "player advanced stats.csv": updateAdvancedStats(soup),
+            "player last 5 games.csv": updateLast5Games(soup)}
 
 
 def updateCharacteristics(logPath):
@@ -129,269 +173,205 @@ def updateCharacteristics(logPath):
 #     return data
 
 
-def updateLast5Games():
-    data = [["date", "team", "opponent",
-             "win/loss", "score", "minutes played",
-             "field goals", "field goal att", "field goal pct",
-             "3-Pts", "3-Pts Att", "3-Pts Pct",
-             "free throws", "free throw att","free throw pct",
-             "offensive rebounds", "defensive rebounds", "total rebounds",
-             "assists", "steals", "blocks",
-             "turnovers", "personal fouls",
-             "pts", "game score", "plus/minus"]]
-    try:
-        totalsTable = soup.find("table", id="last5").find('tbody')
-        # print(totalsTable.prettify())
-        for season in totalsTable.find_all('tr'):
-            date = season.find('th', {"data-stat": "date"}).text
-            team = season.find('td', {"data-stat": "team_name_abbr"}).text
-            opp = season.find('td', {"data-stat": "opp_name_abbr"}).text
-            result = season.find('td', {"data-stat": "game_result"}).text.split(" ")
-            winLoss = result[0]
-            score = result[1]
-            minPlayed = season.find('td', {"data-stat": "mp"}).text
-            fieldGoal = season.find('td', {"data-stat": "fg"}).text
-            fieldGoalAtt = season.find('td', {"data-stat": "fga"}).text
-            fieldGoalPct = season.find('td', {"data-stat": "fg_pct"}).text
-            pt3 = season.find('td', {"data-stat": "fg3"}).text
-            pt3_Att = season.find('td', {"data-stat": "fg3a"}).text
-            pt3_Pct = season.find('td', {"data-stat": "fg3_pct"}).text
-            ft = season.find('td', {"data-stat": "ft"}).text
-            ft_Att = season.find('td', {"data-stat": "fta"}).text
-            ft_Pct = season.find('td', {"data-stat": "ft_pct"}).text
-            orb = season.find('td', {"data-stat": "orb"}).text
-            drb = season.find('td', {"data-stat": "drb"}).text
-            trb = season.find('td', {"data-stat": "trb"}).text
-            ast = season.find('td', {"data-stat": "ast"}).text
-            stl = season.find('td', {"data-stat": "stl"}).text
-            blk = season.find('td', {"data-stat": "blk"}).text
-            tov = season.find('td', {"data-stat": "tov"}).text
-            pf = season.find('td', {"data-stat": "pf"}).text
-            pts = season.find('td', {"data-stat": "pts"}).text
-            gameScore = season.find('td', {"data-stat": "game_score"}).text
-            plusMinus = season.find('td', {"data-stat": "plus_minus"}).text
-            data.append([date, team, opp, winLoss, score, minPlayed,
-                         fieldGoal, fieldGoalAtt, fieldGoalPct, pt3,
-                         pt3_Att, pt3_Pct, ft, ft_Att, ft_Pct, orb,
-                         drb, trb, ast, stl, blk, tov, pf, pts, gameScore,
-                         plusMinus])
-    except AttributeError:
-        return []
-    return data
+# Splits a game result like "W 112-104" into "W" (index 0) or "112-104" (index 1)
+def getResult(index):
+    return lambda gameResult: gameResult.split(" ")[index]
+
+
+# Column schemas of every table we read from a player's website. Each entry
+#  is (CSV header, data-stat, transform). See Table_Extractor.py.
+LAST_5_GAMES_SCHEMA = [
+    ("date", "date", None), ("team", "team_name_abbr", None), ("opponent", "opp_name_abbr", None),
+    ("win/loss", "game_result", getResult(0)), ("score", "game_result", getResult(1)),
+    ("minutes played", "mp", None),
+    ("field goals", "fg", None), ("field goal att", "fga", None), ("field goal pct", "fg_pct", None),
+    ("3-Pts", "fg3", None), ("3-Pts Att", "fg3a", None), ("3-Pts Pct", "fg3_pct", None),
+    ("free throws", "ft", None), ("free throw att", "fta", None), ("free throw pct", "ft_pct", None),
+    ("offensive rebounds", "orb", None), ("defensive rebounds", "drb", None), ("total rebounds", "trb", None),
+    ("assists", "ast", None), ("steals", "stl", None), ("blocks", "blk", None),
+    ("turnovers", "tov", None), ("personal fouls", "pf", None),
+    ("pts", "pts", None), ("game score", "game_score", None), ("plus/minus", "plus_minus", None)]
+
+TOTALS_SCHEMA = [
+    ("season", "year_id", Table_Extractor.toSeasonName), ("age", "age", None), ("team", "team_name_abbr", None),
+    ("position", "pos", None), ("games", "games", None), ("games started", "games_started", None),
+    ("minutes played", "mp", None), ("field goals", "fg", None), ("field goal att", "fga", None),
+    ("field goal pct", "fg_pct", None), ("3-Pts", "fg3", None), ("3-Pts Att", "fg3a", None),
+    ("3-Pts Pct", "fg3_pct", None), ("2-Pts", "fg2", None), ("2-Pts Att", "fg2a", None),
+    ("2-Pts Pct", "fg2_pct", None), ("EFG pct", "efg_pct", None), ("free throws", "ft", None),
+    ("free throw att", "fta", None), ("free throw pct", "ft_pct", None), ("offensive rebounds", "orb", None),
+    ("defensive rebounds", "drb", None), ("total rebounds", "trb", None), ("assists", "ast", None),
+    ("steals", "stl", None), ("blocks", "blk", None), ("turnovers", "tov", None),
+    ("personal fouls", "pf", None), ("total pts", "pts", None)]
+
+PER_36_MIN_SCHEMA = [
+    ("season", "year_id", Table_Extractor.toSeasonName), ("age", "age", None), ("team", "team_name_abbr", None),
+    ("position", "pos", None), ("games", "games", None), ("games started", "games_started", None),
+    ("minutes played", "mp", None), ("field goals", "fg_per_minute_36", None),
+    ("field goal att", "fga_per_minute_36", None), ("field goal pct", "fg_pct", None),
+    ("3-Pts", "fg3_per_minute_36", None), ("3-Pts Att", "fg3a_per_minute_36", None), ("3-Pts Pct", "fg3_pct", None),
+    ("2-Pts", "fg2_per_minute_36", None), ("2-Pts Att", "fg2a_per_minute_36", None), ("2-Pts Pct", "fg2_pct", None),
+    ("EFG Pct", "efg_pct", None), ("free throws", "ft_per_minute_36", None),
+    ("free throw att", "fta_per_minute_36", None), ("free throw pct", "ft_pct", None),
+    ("offensive rebounds", "orb_per_minute_36", None), ("defensive rebounds", "drb_per_minute_36", None),
+    ("total rebounds", "trb_per_minute_36", None), ("assists", "ast_per_minute_36", None),
+    ("steals", "stl_per_minute_36", None), ("blocks", "blk_per_minute_36", None),
+    ("turnovers", "tov_per_minute_36", None), ("personal fouls", "pf_per_minute_36", None),
+    ("total pts", "pts_per_minute_36", None)]
+
+ADVANCED_SCHEMA = [
+    ("season", "year_id", Table_Extractor.toSeasonName), ("age", "age", None), ("team", "team_name_abbr", None),
+    ("league", "comp_name_abbr", None), ("position", "pos", None), ("total games", "games", None),
+    ("games started", "games_started", None), ("minutes played", "mp", None),
+    ("player efficiency rating", "per", None), ("true shooting pct", "ts_pct", None),
+    ("3-Pts att rate", "fg3a_per_fga_pct", None), ("free throw att rate", "fta_per_fga_pct", None),
+    ("offensive rebound rate", "orb_pct", None), ("defensive rebound rate", "drb_pct", None),
+    ("total rebound rate", "trb_pct", None), ("assist pct", "ast_pct", None), ("steal pct", "stl_pct", None),
+    ("block pct", "blk_pct", None), ("turnover pct", "tov_pct", None), ("player usage pct", "usg_pct", None),
+    ("offensive win shares", "ows", None), ("defensive win shares", "dws", None), ("win shares", "ws", None),
+    ("win shares (per 48 min)", "ws_per_48", None), ("offensive box plus minus", "obpm", None),
+    ("defensive box plus minus", "dbpm", None), ("box plus minus", "bpm", None),
+    ("value over replacement player", "vorp", None)]
+
+# Full season game log (separate website per season, see getGameLogUrl()).
+#  Same columns as the last 5 games, plus whether the game was home or away.
+GAME_LOG_SCHEMA = LAST_5_GAMES_SCHEMA[:3] + [
+    ("location", "game_location", lambda location: "away" if location.strip() == "@" else "home")] + \
+    LAST_5_GAMES_SCHEMA[3:]
+# Same columns, read from the website layout before the 2025 site redesign
+#  (different table id & data-stat names for date, team & opponent). Its
+#  game_result holds the margin ("W (+5)"), so "score" is "(+5)" for those.
+OLD_GAME_LOG_SCHEMA = [(header, {"date": "date_game", "team_name_abbr": "team_id",
+                                 "opp_name_abbr": "opp_id"}.get(stat, stat), transform)
+                       for header, stat, transform in GAME_LOG_SCHEMA]
+GAME_LOG_TABLES = {"player_game_log_reg": GAME_LOG_SCHEMA, "pgl_basic": OLD_GAME_LOG_SCHEMA}  # Table id -> schema
+
+# Table id on the player's website -> (schema, filename)
+PLAYER_TABLES = {"totals_stats": (TOTALS_SCHEMA, "player totals.csv"),
+                 "per_minute_stats": (PER_36_MIN_SCHEMA, "player 36-Min stats.csv"),
+                 "advanced": (ADVANCED_SCHEMA, "player advanced stats.csv"),
+                 "last5": (LAST_5_GAMES_SCHEMA, "player last 5 games.csv")}
+
+
+def updateLast5Games(soup):
+    return Table_Extractor.extractTable(soup, "last5", LAST_5_GAMES_SCHEMA) or []
 
 
 def updateTotals(soup):
-    data = [["season", "age", "team",
-             "position", "games", "games started",
-             "minutes played", "field goals", "field goal att",
-             "field goal pct", "3-Pts", "3-Pts Att",
-             "3-Pts Pct", "2-Pts", "2-Pts Att",
-             "2-Pts Pct", "EFG pct", "free throws",
-             "free throw att", "free throw pct", "offensive rebounds",
-             "defensive rebounds", "total rebounds", "assists",
-             "steals", "blocks", "turnovers",
-             "personal fouls", "total pts"]]
-    totalsTable = soup.find("table", id="totals_stats").find('tbody')
-    print(totalsTable.prettify())
-    for season in totalsTable.find_all('tr'):
-        try:
-            seasonYrs = season.find('th', {"data-stat": "year_id"}).text.replace("-", "-20") + " Season"
-            age = season.find('td', {"data-stat": "age"}).text
-            team = season.find('td', {"data-stat": "team_name_abbr"}).text
-            pos = season.find('td', {"data-stat": "pos"}).text
-            games = season.find('td', {"data-stat": "games"}).text
-            gamesStarted = season.find('td', {"data-stat": "games_started"}).text
-            minPlayed = season.find('td', {"data-stat": "mp"}).text
-            fieldGoals = season.find('td', {"data-stat": "fg"}).text
-            fieldGoal_Att = season.find('td', {"data-stat": "fga"}).text
-            fieldGoal_Pct = season.find('td', {"data-stat": "fg_pct"}).text
-            pt3 = season.find('td', {"data-stat": "fg3"}).text
-            pt3_Att = season.find('td', {"data-stat": "fg3a"}).text
-            pt3_Pct = season.find('td', {"data-stat": "fg3_pct"}).text
-            pt2 = season.find('td', {"data-stat": "fg2"}).text
-            pt2_Att = season.find('td', {"data-stat": "fg2a"}).text
-            pt2_Pct = season.find('td', {"data-stat": "fg2_pct"}).text
-            efg_Pct = season.find('td', {"data-stat": "efg_pct"}).text
-            ft = season.find('td', {"data-stat": "ft"}).text
-            ft_Att = season.find('td', {"data-stat": "fta"}).text
-            ft_Pct = season.find('td', {"data-stat": "ft_pct"}).text
-            off_rb = season.find('td', {"data-stat": "orb"}).text
-            def_rb = season.find('td', {"data-stat": "drb"}).text
-            total_rb = season.find('td', {"data-stat": "trb"}).text
-            ast = season.find('td', {"data-stat": "ast"}).text
-            steals = season.find('td', {"data-stat": "stl"}).text
-            blocks = season.find('td', {"data-stat": "blk"}).text
-            turnovers = season.find('td', {"data-stat": "tov"}).text
-            perFouls = season.find('td', {"data-stat": "pf"}).text
-            totalPts = season.find('td', {"data-stat": "pts"}).text
-
-            data.append([seasonYrs, age, team, pos, games, gamesStarted,
-                         minPlayed, fieldGoals, fieldGoal_Att, fieldGoal_Pct,
-                         pt3, pt3_Att, pt3_Pct, pt2, pt2_Att, pt2_Pct, efg_Pct,
-                         ft, ft_Att, ft_Pct, off_rb, def_rb, total_rb, ast,
-                         steals, blocks, turnovers, perFouls, totalPts])
-        except AttributeError:
-            continue
-    return data
+    return getStatTable(soup, "totals_stats")
 
 
 def update36MinStats(soup):
-    table36MinStats = soup.find('table', id='per_minute_stats')
-
-    data = [["season", "age", "team",
-             "position", "games", "games started",
-             "minutes played", "field goals", "field goal att",
-             "field goal pct", "3-Pts", "3-Pts Att",
-             "3-Pts Pct", "2-Pts", "2-Pts Att",
-             "2-Pts Pct", "free throws", "free throw att", "EFG Pct",
-             "free throw pct", "offensive rebounds", "defensive rebounds",
-             "total rebounds", "assists", "steals",
-             "blocks", "turnovers", "personal fouls",
-             "total pts"]]
-    for season in table36MinStats.find_all("tr"):
-        try:
-            seasonYrs = season.find('th', {"data-stat": "year_id"}).text.replace("-", "-20") + " Season"
-            age = season.find('td', {"data-stat": "age"}).text
-            team = season.find('td', {"data-stat": "team_name_abbr"}).text
-            pos = season.find('td', {"data-stat": "pos"}).text
-            games = season.find('td', {"data-stat": "games"}).text
-            gamesStarted = season.find('td', {"data-stat": "games_started"}).text
-            minPlayed = season.find('td', {"data-stat": "mp"}).text
-            fieldGoals = season.find('td', {"data-stat": "fg_per_minute_36"}).text
-            fieldGoal_Att = season.find('td', {"data-stat": "fga_per_minute_36"}).text
-            fieldGoal_Pct = season.find('td', {"data-stat": "fg_pct"}).text
-            pt3 = season.find('td', {"data-stat": "fg3_per_minute_36"}).text
-            pt3_Att = season.find('td', {"data-stat": "fg3a_per_minute_36"}).text
-            pt3_Pct = season.find('td', {"data-stat": "fg3_pct"}).text
-            pt2 = season.find('td', {"data-stat": "fg2_per_minute_36"}).text
-            pt2_Att = season.find('td', {"data-stat": "fg2a_per_minute_36"}).text
-            pt2_Pct = season.find('td', {"data-stat": "fg2_pct"}).text
-            efg_pct = season.find('td', {"data-stat": "efg_pct"}).text
-            ft = season.find('td', {"data-stat": "ft_per_minute_36"}).text
-            ft_Att = season.find('td', {"data-stat": "fta_per_minute_36"}).text
-            ft_Pct = season.find('td', {"data-stat": "ft_pct"}).text
-            off_rb = season.find('td', {"data-stat": "orb_per_minute_36"}).text
-            def_rb = season.find('td', {"data-stat": "drb_per_minute_36"}).text
-            total_rb = season.find('td', {"data-stat": "trb_per_minute_36"}).text
-            ast = season.find('td', {"data-stat": "ast_per_minute_36"}).text
-            steals = season.find('td', {"data-stat": "stl_per_minute_36"}).text
-            blocks = season.find('td', {"data-stat": "blk_per_minute_36"}).text
-            turnovers = season.find('td', {"data-stat": "tov_per_minute_36"}).text
-            perFouls = season.find('td', {"data-stat": "pf_per_minute_36"}).text
-            totalPts = season.find('td', {"data-stat": "pts_per_minute_36"}).text
-
-            data.append([seasonYrs, age, team, pos, games, gamesStarted,
-                         minPlayed, fieldGoals, fieldGoal_Att, fieldGoal_Pct,
-                         pt3, pt3_Att, pt3_Pct, pt2, pt2_Att, pt2_Pct, efg_pct,
-                         ft, ft_Att, ft_Pct, off_rb, def_rb, total_rb, ast,
-                         steals, blocks, turnovers, perFouls, totalPts])
-        except AttributeError:
-            continue
-    return data
+    return getStatTable(soup, "per_minute_stats")
 
 
 def updateAdvancedStats(soup):
-    advancedTable = soup.find('table', id='advanced').find('tbody')
-
-    data = [["season", "age", "team",
-             "league", "position", "total games",
-             "games started", "minutes played", "player efficiency rating",
-             "true shooting pct", "3-Pts att rate", "free throw att rate",
-             "offensive rebound rate", "defensive rebound rate", "total rebound rate",
-             "assist pct", "steal pct", "block pct",
-             "turnover pct", "player usage pct", "offensive win shares",
-             "defensive win shares", "win shares", "win shares (per 48 min)",
-             "offensive box plus minus", "defensive box plus minus", "box plus minus",
-             "value over replacement player"]]
-    for season in advancedTable.find_all('tr'):
-        try:  # Ignores missing years
-            seasonYrs = season.find('th', {"data-stat": "year_id"}).text.replace("-", "-20") + " Season"
-            age = season.find('td', {"data-stat": "age"}).text
-            team = season.find('td', {"data-stat": "team_name_abbr"}).text
-            league = season.find('td', {"data-stat": "comp_name_abbr"}).text
-            pos = season.find('td', {"data-stat": "pos"}).text
-            totalGames = season.find('td', {"data-stat": "games"}).text
-            gamesStarted = season.find('td', {"data-stat": "games_started"}).text
-            minPlayed = season.find('td', {"data-stat": "mp"}).text
-            playerEffRating = season.find('td', {"data-stat": "per"}).text
-            trueShootingPct = season.find('td', {"data-stat": "ts_pct"}).text
-            pt3_att_rate = season.find('td', {"data-stat": "fg3a_per_fga_pct"}).text
-            freeThrow_att_rate = season.find('td', {"data-stat": "fta_per_fga_pct"}).text
-            off_rebound_pct = season.find('td', {"data-stat": "orb_pct"}).text
-            def_rebound_pct = season.find('td', {"data-stat": "drb_pct"}).text
-            total_rebound_pct = season.find('td', {"data-stat": "trb_pct"}).text
-            ast_pct = season.find('td', {"data-stat": "ast_pct"}).text
-            steal_pct = season.find('td', {"data-stat": "stl_pct"}).text
-            block_pct = season.find('td', {"data-stat": "blk_pct"}).text
-            turnover_pct = season.find('td', {"data-stat": "tov_pct"}).text
-            player_usage_pct = season.find('td', {"data-stat": "usg_pct"}).text
-            off_win_shares = season.find('td', {"data-stat": "ows"}).text
-            def_win_shares = season.find('td', {"data-stat": "dws"}).text
-            win_shares = season.find('td', {"data-stat": "ws"}).text
-            win_shares_per_48Min = season.find('td', {"data-stat": "ws_per_48"}).text
-            off_box_plusMinus = season.find('td', {"data-stat": "obpm"}).text
-            def_box_plusMinus = season.find('td', {"data-stat": "dbpm"}).text
-            box_plusMinus = season.find('td', {"data-stat": "bpm"}).text
-            vorp = season.find('td', {"data-stat": "vorp"}).text
-
-            data.append([seasonYrs, age, team, league, pos, totalGames,
-                         gamesStarted, minPlayed, playerEffRating,
-                         trueShootingPct, pt3_att_rate, freeThrow_att_rate,
-                         off_rebound_pct, def_rebound_pct, total_rebound_pct,
-                         ast_pct, steal_pct, block_pct, turnover_pct,
-                         player_usage_pct, off_win_shares, def_win_shares,
-                         win_shares, win_shares_per_48Min, off_box_plusMinus,
-                         def_box_plusMinus, box_plusMinus, vorp])
-        except AttributeError:
-            continue
+    return getStatTable(soup, "advanced")
+
 
+# Reads one of PLAYER_TABLES. If the table is missing, only the header
+#  row is returned.
+def getStatTable(soup, tableId):
+    schema = PLAYER_TABLES[tableId][0]
+    data = Table_Extractor.extractTable(soup, tableId, schema)
+    if data is None:
+        return [[header for header, _, _ in schema]]
     return data
 
 
-# Writes data to a CSV file. Returns nothing.
+# Reads a season game log website (1 row per game played). Returns [] if
+#  the game log table isn't on the website.
+def updateGameLog(soup):
+    for tableId, schema in GAME_LOG_TABLES.items():
+        data = Table_Extractor.extractTable(soup, tableId, schema)
+        if data is not None:
+            return data
+    return []
+
+
+# Downloads the season game log of many players (concurrently) & writes
+#  each to "player game log.csv". The season comes from the folder path.
+def updateGameLogs(folderPaths):
+    links = {getGameLogUrl(f"{folderPath}/log information.csv"): folderPath for folderPath in folderPaths}
+    for link, soup in Fetcher.fetchPages(links):
+        writeData(filepath=f"{links[link]}/player game log.csv", data=updateGameLog(soup))
+        print(f"    [X] {os.path.basename(links[link])} game log")
+    return None
+
+
+# ".../players/y/youngtr01.html" -> ".../players/y/youngtr01/gamelog/2025"
+#  for a player folder within the "2024-2025 Season" folder.
+def getGameLogUrl(logfilePath):
+    return getPlayerUrl(logfilePath).replace(".html", f"/gamelog/{getSeasonEndYr(os.path.dirname(logfilePath))}")
+
+
+# ".../2024-2025 Season/Atlanta Hawks/Trae Young" -> 2025
+def getSeasonEndYr(folderPath):
+    season = os.path.basename(os.path.dirname(os.path.dirname(folderPath)))
+    return int(season.replace(" Season", "").split("-")[1])
+
+
+# Checks if a player folder is in the current season (the one being played,
+#  or the one that just ended until the next one starts in October). Only
+#  those folders match the "last 5 games" of the player's website.
+def isCurrentSeason(folderPath, today=None):
+    today = today or datetime.now()
+    return getSeasonEndYr(folderPath) == (today.year + 1 if today.month >= 10 else today.year)
+
+
+# Writes data to the database (CSV file and/or SQLite, see Storage.py).
+#  Returns nothing.
 def writeData(filepath, data):
-    with open(filepath, "w", encoding='utf-8', newline='') as csvFile:
-        csvWriter = csv.writer(csvFile)
-        csvWriter.writerows(data)
+    if not Storage.writeTable(filepath, data):  # Same data -> no write, no log update
+        Update_Database.updateLogCheck(fileChecked=os.path.basename(filepath),
+                                       folderPath=os.path.dirname(filepath))
+        return None
 
     Update_Database.updateLogFile(fileUpdated=os.path.basename(filepath),
                                   folderPath=os.path.dirname(filepath))
     return None
 
 
+# Returns the player's website as a Soup obj. Only the tables in
+#  PLAYER_TABLES are kept (the website is streamed, see Fetcher.getTables()).
 def getPlayerWebsite(logfilePath):
-    data = []
-    logfilePath = logfilePath.replace('log information.csv', 'player characteristics.csv')
-    with open(logfilePath, "r") as csvFile:
-        csvReader = csv.reader(csvFile)  # Skip Headers
-        for line in csvReader:
-            data.append(line)
-    url = data[1][8]
+    return Fetcher.fetchPage(getPlayerUrl(logfilePath), tableIds=PLAYER_TABLES.keys())
+
 
-    Request_Ticker.addRequest()
-    website = requests.get(url).content
-    return BeautifulSoup(website, "html.parser")
+# Same as getPlayerWebsite(), but for many players at once. Websites are
+#  fetched concurrently. Yields (logfilePath, soup) tuples as they arrive.
+def getPlayerWebsites(logfilePaths):
+    links = {getPlayerUrl(logfilePath): logfilePath for logfilePath in logfilePaths}
+    for link, soup in Fetcher.fetchPages(links, tableIds=PLAYER_TABLES.keys()):
+        yield links[link], soup
+
+
+# Reads the player's Basketball-Reference URL from "player characteristics.csv"
+#  (through Storage, so it works with every storage backend).
+def getPlayerUrl(logfilePath):
+    return Storage.readTable(logfilePath.replace('log information.csv', 'player characteristics.csv'))[1][8]
 
 
 # This function converts our Soup obj to a String. Replaces the commented
 #  out HTML "<!-- -->" with "". Then, converts the string back to a Soup
 #  obj so we can extract the necessary data. Necessary since BeautifulSoup
-#  can't read commented out HTML. Function not currently in use. But useful
-#  when site is undergoing updates.
+#  can't read commented out HTML. Function not currently in use (the table
+#  scanner in Table_Extractor.py reads commented tables). But useful when
+#  site is undergoing updates.
 def extractCommentedHTML(soup):
     myStr = str(soup)
     myStr = myStr.replace("<!--", "")
     myStr = myStr.replace("-->", "")
 
-    return BeautifulSoup(myStr, 'html.parser')
+    return BeautifulSoup(myStr, Table_Extractor.getParser())
 
 
 if __name__ == "__main__":
     teamPath = "/Users/speak_easy/Python UNM/NBA-Parlay-Bets/NBA Database/2024-2025 Season/Atlanta Hawks"
     roster = [d for d in os.listdir(teamPath) if os.path.isdir(os.path.join(teamPath, d))]
-    for player in roster:
-        print(f"[X] Updating {player} Folder")
-        logfilePath = f"{teamPath}/{player}/log information.csv"
+    logfilePaths = [f"{teamPath}/{player}/log information.csv" for player in roster]
+    for logfilePath, soup in getPlayerWebsites(logfilePaths):
+        print(f"[X] Updating {os.path.basename(os.path.dirname(logfilePath))} Folder")
 
         # Updating this first to update player website (req. for soup)
         # data = updateCharacteristics(logfilePath)
@@ -400,9 +380,7 @@ if __name__ == "__main__":
         #           data=data)
         # print(f"\t[X] updateCharacteristics()")
 
-        soup = getPlayerWebsite(logfilePath)
-
-        # data = updateLast5Games()
+        # data = updateLast5Games(soup)
         # writeData(filepath=logfilePath.replace('log information.csv',
         #                                        'player last 5 games.csv'),
         #           data=data)
@@ -1,52 +1,205 @@
 # This program keeps track of how frequently we webscrape data from a website.
 #  It automatically runs alongside any script that we run within the
-#  "NBA Database" folder. If we send X number of requests per minute, this
-#  program will place a system-wide sleep timer to prevent servers from
-#  rate-limiting//IP banning us.
+#  "NBA Database" folder. Requests are paced with a token bucket (a small
+#  burst, then 1 request every MAX_INTERVAL / REQUEST_LIMIT seconds) and a
+#  sliding window guarantees we never send more than REQUEST_LIMIT requests
+#  in any MAX_INTERVAL. Callers only sleep the exact time until their slot
+#  frees up, which keeps servers from rate-limiting//IP banning us.
+#
+#  Safe to call from many threads (addRequest) and from asyncio code
+#  (addRequestAsync). Every caller reserves its own future slot while holding
+#  the lock, then sleeps without holding it.
+#
+#  The rate adapts to the site (see Http_Client.py): every throttled response
+#  halves it (slowDown), every successful one wins a little of it back
+#  (speedUp), and pause() holds EVERY caller until a time (e.g. the site's
+#  Retry-After), which pauses the whole pipeline at once.
 from collections import deque
+import asyncio
+import threading
 import time
-from datetime import datetime, timedelta
+from datetime import timedelta
+import Metrics
 
 REQUEST_LIMIT = 20                    # Max num of requests per interval
-MAX_INTERVAL = timedelta(seconds=60)  # Max seconds a request should stay in our deque
-TIMEOUT = 60                          # Timeout when deque has maxed out
-dq = deque()
+MAX_INTERVAL = timedelta(seconds=60)  # Length of the sliding window
+BURST_LIMIT = 4                       # Requests allowed back-to-back before pacing kicks in
+MIN_RATE_SCALE = 0.25                 # slowDown() never goes below 1/4 of REQUEST_LIMIT
+RECOVERY_STEP = 0.02                  # Rate won back per successful request (50 -> full rate)
+dq = deque()                          # Reserved request times (newest on the left)
+lock = threading.Lock()
 
+tokens = BURST_LIMIT     # Token bucket. Goes negative when slots are reserved in the future
+lastRefill = None        # Last time the bucket was refilled
+totalRequests = 0        # Stats used by getRequestRate() & printSummary()
+totalSleep = 0.0
+firstRequest = None
+rateScale = 1.0          # Fraction of REQUEST_LIMIT currently allowed
+pausedUntil = 0.0        # No slot is handed out before this time (monotonic)
 
-# Adds +1 to dequeue. If oldest dequeue item is longer than 60 sec -> pop out.
-#  If size of dequeue is larger than REQUEST_LIMIT -> put program to
-#  sleep -> clear dequeue. Returns nothing.
+
+# Reserves the next free request slot & returns how many seconds the caller
+#  has to wait until it may send its request. Does NOT sleep.
+def reserveRequest():
+    global tokens, lastRefill, totalRequests, firstRequest
+    interval = MAX_INTERVAL.total_seconds()
+
+    with lock:
+        requestLimit = max(1, int(REQUEST_LIMIT * rateScale))
+        rate = requestLimit / interval  # tokens per second
+        currentTime = time.monotonic()
+        if lastRefill is None:
+            lastRefill = currentTime
+            firstRequest = currentTime
+
+        # Refill the bucket & take a token (may go negative = wait for it)
+        tokens = min(BURST_LIMIT, tokens + (currentTime - lastRefill) * rate)
+        lastRefill = currentTime
+        tokens -= 1
+        slot = max(currentTime + (-tokens / rate if tokens < 0 else 0), pausedUntil)
+
+        while dq and currentTime - dq[-1] > interval:  # pop expired requests
+            dq.pop()
+
+        # Sliding window: the requestLimit-th newest request must have left
+        #  the window before our slot.
+        windowFull = len(dq) >= requestLimit and dq[requestLimit - 1] + interval > slot
+        if windowFull:
+            slot = dq[requestLimit - 1] + interval
+
+        dq.appendleft(slot)
+        totalRequests += 1
+
+    delay = slot - currentTime
+    if windowFull:
+        notifyUser(delay)
+    return delay
+
+
+# Waits until we're allowed to make another request. If a pause started
+#  while we slept (see pause()), our slot is void & a new one is reserved.
+#  Returns nothing.
 def addRequest():
-    currentTime = datetime.now()
-    dq.appendleft(currentTime)
+    while True:
+        delay = reserveRequest()
+        if delay > 0:
+            time.sleep(delay)
+            addSleepTime(delay)
+        if getPauseSeconds() == 0:
+            return None
 
-    while currentTime - dq[-1] > MAX_INTERVAL:  # pop expired requests
-        dq.pop()
 
-    if len(dq) >= REQUEST_LIMIT:  # Sleep if too many recent requests made
-        notifyUser()
-        dq.clear()
-        print("DQ Requests Cleared.\n")
-        time.sleep(TIMEOUT)
+# Same as addRequest(), but for asyncio code. Doesn't block the event loop.
+async def addRequestAsync():
+    while True:
+        delay = reserveRequest()
+        if delay > 0:
+            await asyncio.sleep(delay)
+            addSleepTime(delay)
+        if getPauseSeconds() == 0:
+            return None
+
+
+def addSleepTime(seconds):
+    global totalSleep
+    with lock:
+        totalSleep += seconds
+    Metrics.record("rate limit sleep", seconds)
 
+
+# Halves the request rate (down to MIN_RATE_SCALE). Called when the site
+#  throttles us. Returns the new fraction of REQUEST_LIMIT.
+def slowDown():
+    global rateScale
+    with lock:
+        rateScale = max(MIN_RATE_SCALE, rateScale / 2)
+        return rateScale
+
+
+# Wins back RECOVERY_STEP of the request rate. Called after every successful
+#  request.
+def speedUp():
+    global rateScale
+    with lock:
+        rateScale = min(1.0, rateScale + RECOVERY_STEP)
+    return None
+
+
+# Holds every request until "seconds" from now. Requests after the pause are
+#  paced (no burst). Returns nothing.
+def pause(seconds):
+    global pausedUntil, tokens
+    with lock:
+        pausedUntil = max(pausedUntil, time.monotonic() + seconds)
+        tokens = min(tokens, 0)
+    return None
+
+
+# Seconds left in the current pause (0 if not paused).
+def getPauseSeconds():
+    with lock:
+        return max(0.0, pausedUntil - time.monotonic())
+
+
+# Returns the achieved number of requests per minute since the first request.
+def getRequestRate():
+    with lock:
+        if firstRequest is None:
+            return 0.0
+        elapsed = max(time.monotonic(), dq[0] if dq else 0) - firstRequest
+        if elapsed <= 0:
+            return 0.0
+        return totalRequests / (elapsed / 60)
+
+
+# Returns how many seconds a number of requests takes at the rate limit
+#  (the first BURST_LIMIT go out right away).
+def getProjectedSeconds(requests):
+    return max(0, requests - BURST_LIMIT) * MAX_INTERVAL.total_seconds() / REQUEST_LIMIT
+
+
+# Prints how many requests were made, how long we slept, and the achieved
+#  requests/minute. Useful to measure the throughput of a season rebuild.
+def printSummary():
+    print(f"\nRequests made: {totalRequests}")
+    print(f"Time spent waiting on rate limit: {totalSleep:.1f} sec")
+    print(f"Achieved rate: {getRequestRate():.2f} requests/min "
+          f"(limit {REQUEST_LIMIT} per {MAX_INTERVAL.total_seconds():.0f} sec, currently at {rateScale:.0%})")
+    return None
+
+
+# Resets the ticker to a fresh state (empty window, full bucket, full rate,
+#  no pause, no stats).
+def resetTicker():
+    global tokens, lastRefill, totalRequests, totalSleep, firstRequest, rateScale, pausedUntil
+    with lock:
+        rateScale = 1.0
+        pausedUntil = 0.0
+        dq.clear()
+        tokens = BURST_LIMIT
+        lastRefill = None
+        totalRequests = 0
+        totalSleep = 0.0
+        firstRequest = None
     return None
 
 
-# Prints our DQ in a formatted way. Function usually called before
-#  clearing & sleeping the DQ when it is maxed out from addRequest().
+# Prints our DQ in a formatted way. Function usually called when the
+#  sliding window is maxed out from reserveRequest().
 def printDQ():
     print(f"Screenshot DQ Request Stack:")
+    currentTime = time.monotonic()
     i = 1
-    for item in dq:
-        print(f"{i}. {item}")
+    for item in list(dq):
+        print(f"{i}. {currentTime - item:+.1f} sec ago")
         i += 1
     return None
 
 
-# Notifies user that Deque has maxed out, and we're putting the program
-#  to sleep.
-def notifyUser():
-    print(f"\n>> MAX NUMBER OF REQUESTS MADE - TIMEOUT {TIMEOUT} SECONDS <<")
+# Notifies user that the window has maxed out, and we're putting the caller
+#  to sleep until the oldest request expires.
+def notifyUser(delay):
+    print(f"\n>> MAX NUMBER OF REQUESTS MADE - WAITING {delay:.1f} SECONDS <<")
     printDQ()
     return None
 
@@ -58,8 +211,9 @@ def fakeRequests(api_calls):
     for i in range(api_calls):
         print(f"  > fake call #{i+1}")
         addRequest()
+    printSummary()
     return None
 
 
 if __name__ == "__main__":
-    print()
+    fakeRequests(25)
@@ -0,0 +1,151 @@
+# This program computes "last N games" stats (mean, standard deviation &
+#  per-36-minute rates) for every player at once. Game logs are given as
+#  flat NumPy arrays (1 row per player game):
+#    players - int   [game row]  (player index)
+#    dates   - int   [game row]  (any sortable day number)
+#    stats   - float [game row, stat]
+#  Everything is computed from cumulative sums, so there is no Python loop
+#  over rows: the sum of the last N games of a row is cum[i] - cum[i-N],
+#  clipped so a window never reaches into the previous player's games. NaN
+#  (missing) values are left out of the window.
+#
+#  For nightly updates, a rolling state keeps a small window per player so a
+#  new game can be added without recomputing the season (see addGame()).
+from collections import deque
+import time
+import numpy as np
+
+
+# Returns (order, means, stds) for a window of N games ending at each row.
+#  "order" sorts the rows by (player, date); means & stds are [row, stat] in
+#  that sorted order. Set includeCurrent=False to get the stats of the N
+#  games BEFORE each row (what a model knows before the game starts).
+def computeRollingStats(players, dates, stats, window, includeCurrent=True):
+    order = np.lexsort((dates, players))
+    players = np.asarray(players)[order]
+    values = np.asarray(stats, dtype=np.float64)[order]
+    if values.ndim == 1:
+        values = values[:, None]
+
+    valid = ~np.isnan(values)
+    values = np.where(valid, values, 0.0)
+    cum = prependZeros(np.cumsum(values, axis=0))
+    cumSq = prependZeros(np.cumsum(values * values, axis=0))
+    cumCount = prependZeros(np.cumsum(valid, axis=0))
+
+    # Window of row i covers rows [start, end)
+    rows = np.arange(len(players))
+    groupStart = getGroupStarts(players)
+    end = rows + 1 if includeCurrent else rows
+    start = np.maximum(groupStart, end - window)
+
+    total = cum[end] - cum[start]
+    count = cumCount[end] - cumCount[start]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = total / count
+        variance = (cumSq[end] - cumSq[start]) / count - means * means
+    stds = np.sqrt(np.maximum(variance, 0.0))
+    means[count == 0] = np.nan
+    stds[count == 0] = np.nan
+    return order, means, stds
+
+
+# Returns the sum of each stat over the window per 36 minutes played.
+#  "minutesCol" is the column of the minutes played in stats.
+def computePer36Rates(players, dates, stats, window, minutesCol, includeCurrent=True):
+    stats = np.asarray(stats, dtype=np.float64)
+    order, means, _ = computeRollingStats(players, dates, stats, window, includeCurrent)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rates = means / means[:, [minutesCol]] * 36
+    rates[~np.isfinite(rates)] = np.nan
+    return order, rates
+
+
+# Returns (playerIds, means, stds) of every player's LAST N games (i.e. as
+#  of their most recent game).
+def getLatestRollingStats(players, dates, stats, window):
+    order, means, stds = computeRollingStats(players, dates, stats, window)
+    sortedPlayers = np.asarray(players)[order]
+    if len(sortedPlayers) == 0:
+        return sortedPlayers, means, stds
+    last = np.flatnonzero(np.append(sortedPlayers[1:] != sortedPlayers[:-1], True))
+    return sortedPlayers[last], means[last], stds[last]
+
+
+# Index of the first row of each row's player (rows sorted by player).
+def getGroupStarts(sortedPlayers):
+    isStart = np.ones(len(sortedPlayers), dtype=bool)
+    isStart[1:] = sortedPlayers[1:] != sortedPlayers[:-1]
+    return np.maximum.accumulate(np.where(isStart, np.arange(len(sortedPlayers)), 0))
+
+
+def prependZeros(cumulative):
+    return np.vstack([np.zeros((1, cumulative.shape[1])), cumulative])
+
+
+# Creates an empty rolling state: {"window": N, "players": {player: window}}
+#  where each player's window keeps the last N games & their running sums.
+def newRollingState(window):
+    return {"window": window, "players": {}}
+
+
+# Builds a rolling state from flat game log arrays (only the last N games of
+#  each player are kept).
+def loadRollingState(players, dates, stats, window):
+    state = newRollingState(window)
+    order = np.lexsort((dates, players))
+    stats = np.asarray(stats, dtype=np.float64)
+    for row in order:
+        addGame(state, int(players[row]), stats[row])
+    return state
+
+
+# Adds one game to a player's window. Only the game leaving the window is
+#  subtracted, so this is O(number of stats) no matter the season length.
+def addGame(state, player, values):
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    values = np.where(valid, values, 0.0)
+
+    games = state["players"].get(player)
+    if games is None:
+        games = {"games": deque(), "sum": np.zeros(len(values)),
+                 "sumSq": np.zeros(len(values)), "count": np.zeros(len(values))}
+        state["players"][player] = games
+
+    if len(games["games"]) == state["window"]:  # Oldest game leaves the window
+        oldValues, oldValid = games["games"].popleft()
+        games["sum"] -= oldValues
+        games["sumSq"] -= oldValues * oldValues
+        games["count"] -= oldValid
+    games["games"].append((values, valid))
+    games["sum"] += values
+    games["sumSq"] += values * values
+    games["count"] += valid
+    return None
+
+
+# Returns (means, stds) of a player's last N games from a rolling state, or
+#  None if the player has no games.
+def getRollingFeatures(state, player):
+    games = state["players"].get(player)
+    if games is None:
+        return None
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = games["sum"] / games["count"]
+        stds = np.sqrt(np.maximum(games["sumSq"] / games["count"] - means * means, 0.0))
+    return means, stds
+
+
+if __name__ == "__main__":
+    # A full league season: ~540 players x 82 games x 12 stats
+    rng = np.random.default_rng(0)
+    gamePlayers = np.repeat(np.arange(540), 82)
+    gameDates = np.tile(np.arange(82), 540)
+    gameStats = rng.normal(10, 3, size=(len(gamePlayers), 12))
+
+    startTime = time.perf_counter()
+    for N in (5, 10):
+        computeRollingStats(gamePlayers, gameDates, gameStats, N)
+        computePer36Rates(gamePlayers, gameDates, gameStats, N, minutesCol=0)
+    print(f"{len(gamePlayers)} games, last 5 & 10: {(time.perf_counter() - startTime) * 1000:.1f} ms")
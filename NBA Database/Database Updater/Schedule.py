@@ -1,51 +1,145 @@
 # This program is called by "Update_Database.py" to update the schedule.
-import csv
-import requests
-from bs4 import BeautifulSoup
+#  The season schedule website only shows 1 month of games. The other months
+#  are on their own websites, linked from it:
+#
+#    https://www.basketball-reference.com/leagues/NBA_2025_games.html
+#    https://www.basketball-reference.com/leagues/NBA_2025_games-november.html
+#    ...
+#
+#  Every month is fetched (concurrently, through the rate limiter) & the rows
+#  are merged in month order. Finished games have their final score & "OT",
+#  "2OT", ... if they went to overtime. When a schedule already exists, only
+#  the months that still have unplayed games are fetched again. The last
+#  month & the months from April on are always fetched, since play-in &
+#  playoff games are added to them after the regular season is scored.
 import os
-import Request_Ticker
+import re
+from datetime import datetime
+import Global
+import Fetcher
+import Metrics
+import Schedule_Index
+import Storage
+
+SCHEDULE_HEADER = ["Game", "Home Team", "Visitor Team", "Date", "Time", "Arena",
+                   "Home Points", "Visitor Points", "Overtime"]
+MONTH_LINK = re.compile(r"/leagues/NBA_\d{4}_games-([a-z]+)(?:-(\d{4}))?\.html$")
+POSTSEASON_MONTH = 4  # April of the season's end year: regular season ends, play-in & playoffs start
 
 
 # Gets the game schedule for a given season. Assumes "season schedule"
 #  website exists (i.e. not user does not want schedule +20 years in the future)
+#  Months of the existing schedule (if any) without unplayed games are kept
+#  as they are.
 def getSchedule(seasonEndYr):
-    website = f'https://www.basketball-reference.com/leagues/NBA_{seasonEndYr}_games.html'
+    website = f'{Global.SITE_URL}/leagues/NBA_{seasonEndYr}_games.html'
+    existingMonths = groupByMonth(Storage.readTable(getSchedulePath(seasonEndYr)))
+
+    soup = Fetcher.fetchPage(website)
+    with Metrics.timer("parse"):
+        firstMonth = parseSchedule(soup)
+        monthWebsites = getMonthWebsites(soup, seasonEndYr)
+    months = groupByMonth(firstMonth)
+
+    lastMonth = max(monthWebsites, default=None)
+    stale = [url for month, url in monthWebsites.items()
+             if month not in months and (month == lastMonth or month >= (seasonEndYr, POSTSEASON_MONTH) or
+                                         not isMonthFinished(existingMonths.get(month)))]
+    for _, monthSoup in Fetcher.fetchPages(stale, tableIds=["schedule"]):
+        with Metrics.timer("parse"):
+            months.update(groupByMonth(parseSchedule(monthSoup)))
+    print(f"[X] Schedule: {len(stale) + 1} of {len(monthWebsites) or 1} months fetched")
+
+    schedule = [SCHEDULE_HEADER]
+    for month in sorted(set(monthWebsites) | set(months)):
+        schedule += months.get(month) or existingMonths.get(month, [])
+    return schedule
 
-    Request_Ticker.addRequest()
-    websiteContent = requests.get(website).content
-    soup = BeautifulSoup(websiteContent, "html.parser")
 
+# Reads the schedule table out of the season schedule website (Soup obj).
+#  Rows without teams (e.g. the "Playoffs" divider) are skipped.
+def parseSchedule(soup):
     table = soup.find('tbody').find_all('tr')
 
-    schedule = [["Game", "Home Team", "Visitor Team", "Date", "Time", "Arena"]]
+    schedule = [SCHEDULE_HEADER]
     for event in table:
-        date = event.find('a').text.strip()
-        time = event.find('td', {'data-stat': 'game_start_time'}).text.strip()
-        visitorTeam = event.find('td', {'data-stat': 'visitor_team_name'}).find('a').text.strip()
-        homeTeam = event.find('td', {'data-stat': 'home_team_name'}).find('a').text.strip()
-        arena = event.find('td', {'data-stat': 'arena_name'}).text.strip()
+        visitorCell = event.find('td', {'data-stat': 'visitor_team_name'})
+        homeCell = event.find('td', {'data-stat': 'home_team_name'})
+        if visitorCell is None or homeCell is None:
+            continue
+        date = event.find(['th', 'td'], {'data-stat': 'date_game'}).text.strip()
+        time = getCellText(event, 'game_start_time')
+        visitorTeam = visitorCell.text.strip()
+        homeTeam = homeCell.text.strip()
+        arena = getCellText(event, 'arena_name')
+        homePoints = getCellText(event, 'home_pts')
+        visitorPoints = getCellText(event, 'visitor_pts')
+        overtime = getCellText(event, 'overtimes')
 
-        schedule.append([f'{visitorTeam} @ {homeTeam}', homeTeam, visitorTeam, date, time, arena])
+        schedule.append([f'{visitorTeam} @ {homeTeam}', homeTeam, visitorTeam, date, time, arena,
+                         homePoints, visitorPoints, overtime])
 
     return schedule
 
 
+def getCellText(event, stat):
+    cell = event.find('td', {'data-stat': stat})
+    return cell.text.strip() if cell is not None else ""
+
+
+# Returns {(year, month): month website} from the month links of the season
+#  schedule website (e.g. ".../NBA_2025_games-november.html" -> (2024, 11)).
+def getMonthWebsites(soup, seasonEndYr):
+    websites = {}
+    for link in soup.find_all('a', href=MONTH_LINK):
+        monthName, year = MONTH_LINK.search(link['href']).groups()
+        try:
+            month = datetime.strptime(monthName, "%B").month
+        except ValueError:
+            continue
+        if year is None:  # Season starts in the fall
+            year = seasonEndYr - 1 if month >= 8 else seasonEndYr
+        websites[(int(year), month)] = Global.SITE_URL + MONTH_LINK.search(link['href']).group(0)
+    return websites
+
+
+# Splits schedule rows (header first) by month: {(year, month): [rows]}.
+#  Rows of an older schedule (without scores) are padded to SCHEDULE_HEADER.
+def groupByMonth(schedule):
+    months = {}
+    for row in schedule[1:]:
+        try:
+            gameDate = Schedule_Index.parseGameDate(row[3])
+        except (ValueError, IndexError):
+            continue
+        row = row + [""] * (len(SCHEDULE_HEADER) - len(row))
+        months.setdefault((gameDate.year, gameDate.month), []).append(row)
+    return months
+
+
+# A month is finished when every game in it has a score.
+def isMonthFinished(rows):
+    return bool(rows) and all(row[6] and row[7] for row in rows)
+
+
+def getSchedulePath(seasonEndYr):
+    seasonStartYr = seasonEndYr - 1
+    return f"{Global.BASE_PATH}/{seasonStartYr}-{seasonEndYr} Season/{seasonStartYr}-{seasonEndYr} Game Schedule.csv"
+
+
 # Given a CSV schedule, it updates (or makes) the game schedule. Usually
-#  called after getSchedule().
+#  called after getSchedule(). The file is only rewritten if a row changed
+#  (so the schedule index stays valid). Returns True if it was rewritten.
 def updateSchedule(schedule, seasonEndYr):
     seasonStartYr = seasonEndYr - 1
-    filepath = f"{seasonStartYr}-{seasonEndYr} Season/{seasonStartYr}-{seasonEndYr} Game Schedule.csv"
-
-    try:
-        with open(filepath, "w", newline='', encoding='utf-8') as csvFile:
-            csvWriter = csv.writer(csvFile)
-            csvWriter.writerows(schedule)
-
-    except FileNotFoundError:  # If dir DNE -> Make dir and try again :)
-        os.mkdir(f"{seasonStartYr}-{seasonEndYr} Season")
-        with open(filepath, "w", newline='', encoding='utf-8') as csvFile:
-            csvWriter = csv.writer(csvFile)
-            csvWriter.writerows(schedule)
+    seasonPath = f"{Global.BASE_PATH}/{seasonStartYr}-{seasonEndYr} Season"
+    os.makedirs(seasonPath, exist_ok=True)  # If dir DNE -> Make dir :)
+
+    if not Storage.writeTable(getSchedulePath(seasonEndYr), schedule):
+        print("[X] Schedule unchanged")
+        return False
+    Schedule_Index.invalidateScheduleIndex(seasonPath)
+    return True
 
 
 if __name__ == "__main__":
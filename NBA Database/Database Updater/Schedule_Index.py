@@ -0,0 +1,212 @@
+# This program indexes a season's "<season> Game Schedule.csv" so features
+#  like home/away, rest days & back-to-backs are O(1) lookups instead of a
+#  rescan of ~1,230 rows (with date parsing) per query. The index is:
+#
+#    games     - [game]              every game, dates parsed, in schedule order
+#    byTeam    - {team: [game ids]}  sorted by date
+#    byDate    - {date: [game ids]}
+#    byMatchup - {(team, team): [game ids]}  (teams sorted alphabetically)
+#    teamGames - {(team, date): team game}   precomputed per team & game:
+#                  {"game", "date", "opponent", "home", "game number",
+#                   "rest days", "back to back", "opponent rest days",
+#                   "previous meetings"}
+#
+#  Teams are team folder names: old names in the schedule (e.g. "Charlotte
+#  Bobcats") are mapped through Team_Registry. "rest days" is the number of
+#  full days off before the game (0 = back to back, None = first game of the
+#  season). An index is built once per season,
+#  kept in memory & pickled to Global.SCHEDULE_INDEX_PATH. Both are rebuilt
+#  whenever the schedule CSV changes (by modification time).
+import os
+import pickle
+import threading
+from datetime import datetime, date
+import Global
+import Storage
+import Team_Registry
+
+INDEX_VERSION = 2  # Pickles of an older version are rebuilt
+indexes = {}  # seasonPath -> (schedule mtime, index)
+lock = threading.Lock()
+
+
+# Returns the schedule index of a season folder (see top of file).
+def loadScheduleIndex(seasonPath):
+    schedulePath = getSchedulePath(seasonPath)
+    mtime = getScheduleMtime(schedulePath)
+    with lock:
+        cached = indexes.get(seasonPath)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        index = readPickle(seasonPath, mtime)
+        if index is None:
+            index = buildScheduleIndex(Storage.readTable(schedulePath))
+            writePickle(seasonPath, mtime, index)
+        indexes[seasonPath] = (mtime, index)
+    return index
+
+
+# Forgets the in-memory index of a season (or of every season).
+def invalidateScheduleIndex(seasonPath=None):
+    with lock:
+        if seasonPath is None:
+            indexes.clear()
+        else:
+            indexes.pop(seasonPath, None)
+    return None
+
+
+# Builds the index from a schedule table (header first).
+def buildScheduleIndex(schedule):
+    index = {"games": [], "byTeam": {}, "byDate": {}, "byMatchup": {}, "teamGames": {}}
+    if not schedule:
+        return index
+
+    header = schedule[0]
+    for row in schedule[1:]:
+        try:
+            gameDate = parseGameDate(row[header.index("Date")])
+        except (ValueError, IndexError):
+            continue
+        game = dict(zip(header, row))
+        game["date"] = gameDate
+        game["home"] = getTeamFolder(row[header.index("Home Team")])
+        game["visitor"] = getTeamFolder(row[header.index("Visitor Team")])
+        index["games"].append(game)
+
+    index["games"].sort(key=lambda game: game["date"])
+    for gameId, game in enumerate(index["games"]):
+        game["id"] = gameId
+        index["byDate"].setdefault(game["date"], []).append(gameId)
+        index["byMatchup"].setdefault(getMatchupKey(game["home"], game["visitor"]), []).append(gameId)
+        for team in (game["home"], game["visitor"]):
+            index["byTeam"].setdefault(team, []).append(gameId)
+
+    # Per team: rest days since the previous game & meetings so far
+    for team, gameIds in index["byTeam"].items():
+        previousDate = None
+        for gameNumber, gameId in enumerate(gameIds, start=1):
+            game = index["games"][gameId]
+            isHome = game["home"] == team
+            opponent = game["visitor"] if isHome else game["home"]
+            restDays = None if previousDate is None else (game["date"] - previousDate).days - 1
+            meetings = [other for other in index["byMatchup"][getMatchupKey(team, opponent)]
+                        if index["games"][other]["date"] < game["date"]]
+            index["teamGames"][(team, game["date"])] = {
+                "game": gameId, "date": game["date"], "opponent": opponent, "home": isHome,
+                "game number": gameNumber, "rest days": restDays, "back to back": restDays == 0,
+                "previous meetings": meetings}
+            previousDate = game["date"]
+
+    for (team, gameDate), teamGame in index["teamGames"].items():
+        opponentGame = index["teamGames"][(teamGame["opponent"], gameDate)]
+        teamGame["opponent rest days"] = opponentGame["rest days"]
+    return index
+
+
+# Returns the team's game on a date (see "teamGames" at the top of file), or
+#  None if the team doesn't play that day.
+def getTeamGame(seasonPath, team, gameDate):
+    return loadScheduleIndex(seasonPath)["teamGames"].get((team, toDate(gameDate)))
+
+
+# Returns {team: team game} for every team playing on a date.
+def getGamesOnDate(seasonPath, gameDate):
+    index = loadScheduleIndex(seasonPath)
+    gameDate = toDate(gameDate)
+    games = {}
+    for gameId in index["byDate"].get(gameDate, []):
+        game = index["games"][gameId]
+        for team in (game["home"], game["visitor"]):
+            games[team] = index["teamGames"][(team, gameDate)]
+    return games
+
+
+# Returns {team: [game dates]} (sorted).
+def getTeamGameDates(seasonPath):
+    index = loadScheduleIndex(seasonPath)
+    return {team: [index["games"][gameId]["date"] for gameId in gameIds]
+            for team, gameIds in index["byTeam"].items()}
+
+
+# Returns every game between 2 teams (optionally only before a date).
+def getHeadToHead(seasonPath, team, opponent, before=None):
+    index = loadScheduleIndex(seasonPath)
+    games = [index["games"][gameId] for gameId in index["byMatchup"].get(getMatchupKey(team, opponent), [])]
+    if before is not None:
+        games = [game for game in games if game["date"] < toDate(before)]
+    return games
+
+
+def getTeamFolder(scheduleName):
+    return Team_Registry.getTeamFolder(scheduleName) or scheduleName
+
+
+def getMatchupKey(team, opponent):
+    return tuple(sorted((team, opponent)))
+
+
+def getSchedulePath(seasonPath):
+    seasonName = os.path.basename(seasonPath).replace(" Season", "")
+    return f"{seasonPath}/{seasonName} Game Schedule.csv"
+
+
+# Modification time of the schedule CSV. With the SQLite backend there's no
+#  file, so the index is only rebuilt after invalidateScheduleIndex().
+def getScheduleMtime(schedulePath):
+    if Global.STORAGE_BACKEND == "sqlite":
+        return None
+    try:
+        return os.path.getmtime(schedulePath)
+    except FileNotFoundError:
+        return None
+
+
+def getPicklePath(seasonPath):
+    return f"{Global.SCHEDULE_INDEX_PATH}/{os.path.basename(seasonPath)}.pkl"
+
+
+# Returns the pickled index of a season if it was built from the same
+#  schedule (same mtime) by the same INDEX_VERSION, else None.
+def readPickle(seasonPath, mtime):
+    if mtime is None:
+        return None
+    try:
+        with open(getPicklePath(seasonPath), "rb") as pickleFile:
+            savedKey, index = pickle.load(pickleFile)
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+        return None
+    return index if savedKey == (INDEX_VERSION, mtime) else None
+
+
+def writePickle(seasonPath, mtime, index):
+    if mtime is None:
+        return None
+    os.makedirs(Global.SCHEDULE_INDEX_PATH, exist_ok=True)
+    with open(getPicklePath(seasonPath), "wb") as pickleFile:
+        pickle.dump(((INDEX_VERSION, mtime), index), pickleFile)
+    return None
+
+
+# Schedule dates look like "Tue, Oct 24, 2023".
+def parseGameDate(text):
+    return datetime.strptime(text, "%a, %b %d, %Y").date()
+
+
+def toDate(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value)
+
+
+if __name__ == "__main__":
+    import time
+    seasonFolder = Global.BASE_PATH + "/2024-2025 Season"
+    startTime = time.perf_counter()
+    scheduleIndex = loadScheduleIndex(seasonFolder)
+    print(f"Indexed {len(scheduleIndex['games'])} games in {(time.perf_counter() - startTime) * 1000:.1f} ms")
+    backToBacks = sum(teamGame["back to back"] for teamGame in scheduleIndex["teamGames"].values())
+    print(f"{backToBacks} back-to-back team games")
@@ -0,0 +1,290 @@
+# This program decides WHERE table data gets saved. Every program writes its
+#  tables through writeTable() using the same path it would use for a CSV
+#  file (e.g. ".../2024-2025 Season/Atlanta Hawks/Trae Young/player totals.csv").
+#  Based on Global.STORAGE_BACKEND, the data goes to the CSV folder tree, to a
+#  single SQLite file, or both.
+#
+#  The SQLite database is normalized as such:
+#    season     (id, name)                          - "2024-2025 Season"
+#    team       (id, season_id, name)               - "Atlanta Hawks"
+#    player     (id, team_id, name)                 - "Trae Young"
+#    data_table (id, season_id, team_id, player_id,
+#                file_name, header)                 - one per CSV file
+#    data_row   (table_id, row_index, stat_season,
+#                team_abbr, data)                   - one per CSV row
+#  team_id/player_id are 0 for season/team level files. header & data are
+#  JSON lists. stat_season & team_abbr are copied out of the row (if the table
+#  has "season"/"team" columns) so model features can be read with a single
+#  indexed query. exportCSV() rebuilds the CSV folder tree from the database.
+#
+#  A table identical to the one already stored (same rows) is NOT rewritten,
+#  so writers can tell which files really changed (e.g. the past seasons of
+#  a player's career tables never do).
+import csv
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import threading
+import Global
+import Metrics
+
+lock = threading.Lock()
+connection = None
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS season (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS team (
+    id INTEGER PRIMARY KEY,
+    season_id INTEGER NOT NULL REFERENCES season(id),
+    name TEXT NOT NULL,
+    UNIQUE (season_id, name));
+CREATE TABLE IF NOT EXISTS player (
+    id INTEGER PRIMARY KEY,
+    team_id INTEGER NOT NULL REFERENCES team(id),
+    name TEXT NOT NULL,
+    UNIQUE (team_id, name));
+CREATE TABLE IF NOT EXISTS data_table (
+    id INTEGER PRIMARY KEY,
+    season_id INTEGER NOT NULL REFERENCES season(id),
+    team_id INTEGER NOT NULL DEFAULT 0,
+    player_id INTEGER NOT NULL DEFAULT 0,
+    file_name TEXT NOT NULL,
+    header TEXT NOT NULL,
+    UNIQUE (season_id, team_id, player_id, file_name));
+CREATE TABLE IF NOT EXISTS data_row (
+    table_id INTEGER NOT NULL REFERENCES data_table(id) ON DELETE CASCADE,
+    row_index INTEGER NOT NULL,
+    stat_season TEXT,
+    team_abbr TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (table_id, row_index));
+CREATE INDEX IF NOT EXISTS idx_data_table_file ON data_table (file_name, season_id);
+CREATE INDEX IF NOT EXISTS idx_data_row_season ON data_row (stat_season);
+CREATE INDEX IF NOT EXISTS idx_team_name ON team (name);
+"""
+
+
+# Writes a table (list of rows, header first) to every enabled backend.
+#  Returns True if the table changed, False if the stored table was already
+#  identical (nothing written).
+def writeTable(filepath, data):
+    changed = False
+    with Metrics.timer("write"):
+        if Global.STORAGE_BACKEND in ("csv", "both"):
+            changed = writeCSV(filepath, data) or changed
+        if Global.STORAGE_BACKEND in ("sqlite", "both"):
+            changed = writeSQLite(filepath, data) or changed
+    Metrics.count("files changed" if changed else "files unchanged")
+    return changed
+
+
+# Reads a table back (list of rows, header first). Reads from SQLite only if
+#  it's the sole backend. Returns [] if the table DNE.
+def readTable(filepath):
+    if Global.STORAGE_BACKEND == "sqlite":
+        return readSQLite(filepath)
+    try:
+        with open(filepath, "r", encoding='utf-8', newline='') as csvFile:
+            return list(csv.reader(csvFile))
+    except FileNotFoundError:
+        return []
+
+
+# Writes to a temporary file first & swaps it in, so a crash mid-write never
+#  leaves a half-written CSV behind. Returns False (& writes nothing) if the
+#  file already holds the same rows.
+def writeCSV(filepath, data):
+    csvText = io.StringIO(newline='')
+    csv.writer(csvText).writerows(data)
+    content = csvText.getvalue().encode('utf-8')
+    if getHash(content) == getFileHash(filepath):
+        return False
+
+    with open(f"{filepath}.tmp", "wb") as csvFile:
+        csvFile.write(content)
+    os.replace(f"{filepath}.tmp", filepath)
+    return True
+
+
+def getHash(content):
+    return hashlib.sha1(content).digest()
+
+
+# Hash of a file's content, or None if the file DNE.
+def getFileHash(filepath):
+    try:
+        with open(filepath, "rb") as storedFile:
+            return getHash(storedFile.read())
+    except FileNotFoundError:
+        return None
+
+
+# Replaces the table's rows in the SQLite database. Returns False (& writes
+#  nothing) if the database already holds the same rows.
+def writeSQLite(filepath, data):
+    if getStoredSQLite(filepath) == data:
+        return False
+
+    season, team, player, fileName = parseFilePath(filepath)
+    header = data[0] if data else []
+    seasonCol = header.index("season") if "season" in header else None
+    teamCol = header.index("team") if "team" in header else None
+
+    with lock:
+        db = getConnection()
+        with db:  # One transaction per table
+            tableId = getTableId(db, season, team, player, fileName, header)
+            db.execute("DELETE FROM data_row WHERE table_id = ?", (tableId,))
+            db.executemany(
+                "INSERT INTO data_row (table_id, row_index, stat_season, team_abbr, data) VALUES (?, ?, ?, ?, ?)",
+                [(tableId, i,
+                  row[seasonCol] if seasonCol is not None and seasonCol < len(row) else None,
+                  row[teamCol] if teamCol is not None and teamCol < len(row) else None,
+                  json.dumps(row)) for i, row in enumerate(data[1:])])
+    return True
+
+
+def readSQLite(filepath):
+    return getStoredSQLite(filepath) or []
+
+
+# Returns the table's rows (header first), or None if the table DNE.
+def getStoredSQLite(filepath):
+    season, team, player, fileName = parseFilePath(filepath)
+    with lock:
+        db = getConnection()
+        table = db.execute("""
+            SELECT t.id, t.header FROM data_table t
+            JOIN season s ON s.id = t.season_id
+            LEFT JOIN team tm ON tm.id = t.team_id
+            LEFT JOIN player p ON p.id = t.player_id
+            WHERE s.name = ? AND COALESCE(tm.name, '') = ? AND COALESCE(p.name, '') = ? AND t.file_name = ?""",
+                           (season, team or '', player or '', fileName)).fetchone()
+        if table is None:
+            return None
+        rows = db.execute("SELECT data FROM data_row WHERE table_id = ? ORDER BY row_index",
+                          (table[0],)).fetchall()
+    header = json.loads(table[1])
+    return ([header] if header else []) + [json.loads(row[0]) for row in rows]
+
+
+# Returns every row of a player file (e.g. "player totals.csv") across the
+#  database in ONE query. Optionally filter by the database season folder
+#  & by the "season" column of the rows. Returns (header, rows) where each
+#  row is [season, team, player, *csvRow].
+def queryPlayerRows(fileName, seasonFolder=None, statSeason=None):
+    query = """
+        SELECT s.name, tm.name, p.name, t.header, r.data FROM data_row r
+        JOIN data_table t ON t.id = r.table_id
+        JOIN season s ON s.id = t.season_id
+        JOIN team tm ON tm.id = t.team_id
+        JOIN player p ON p.id = t.player_id
+        WHERE t.file_name = ?"""
+    params = [fileName]
+    if seasonFolder is not None:
+        query += " AND s.name = ?"
+        params.append(seasonFolder)
+    if statSeason is not None:
+        query += " AND r.stat_season = ?"
+        params.append(statSeason)
+    query += " ORDER BY s.name, tm.name, p.name, r.row_index"
+
+    with lock:
+        results = getConnection().execute(query, params).fetchall()
+    if not results:
+        return [], []
+    header = ["Season Folder", "Team", "Player"] + json.loads(results[0][3])
+    return header, [[s, tm, p] + json.loads(data) for s, tm, p, _, data in results]
+
+
+# Rebuilds the CSV folder tree from the SQLite database. Useful to share the
+#  database in the original format. Returns the number of files written.
+def exportCSV(destination=Global.BASE_PATH, seasonFolder=None):
+    with lock:
+        db = getConnection()
+        query = """
+            SELECT t.id, s.name, tm.name, p.name, t.file_name, t.header FROM data_table t
+            JOIN season s ON s.id = t.season_id
+            LEFT JOIN team tm ON tm.id = t.team_id
+            LEFT JOIN player p ON p.id = t.player_id"""
+        params = []
+        if seasonFolder is not None:
+            query += " WHERE s.name = ?"
+            params.append(seasonFolder)
+        tables = db.execute(query, params).fetchall()
+
+        filesWritten = 0
+        for tableId, season, team, player, fileName, header in tables:
+            folder = "/".join(name for name in [destination, season, team, player] if name)
+            os.makedirs(folder, exist_ok=True)
+            rows = db.execute("SELECT data FROM data_row WHERE table_id = ? ORDER BY row_index",
+                              (tableId,)).fetchall()
+            data = [json.loads(header)] if json.loads(header) else []
+            writeCSV(f"{folder}/{fileName}", data + [json.loads(row[0]) for row in rows])
+            filesWritten += 1
+    return filesWritten
+
+
+# Opens (or creates) the SQLite database. Shared by every thread, so it's
+#  only used while holding the lock.
+def getConnection():
+    global connection
+    if connection is None:
+        connection = sqlite3.connect(Global.SQLITE_PATH, check_same_thread=False)
+        connection.execute("PRAGMA foreign_keys = ON")
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.executescript(SCHEMA)
+    return connection
+
+
+# Returns the data_table id of a file, creating the season/team/player
+#  rows along the way if needed.
+def getTableId(db, season, team, player, fileName, header):
+    db.execute("INSERT OR IGNORE INTO season (name) VALUES (?)", (season,))
+    seasonId = db.execute("SELECT id FROM season WHERE name = ?", (season,)).fetchone()[0]
+    teamId = playerId = 0
+    if team:
+        db.execute("INSERT OR IGNORE INTO team (season_id, name) VALUES (?, ?)", (seasonId, team))
+        teamId = db.execute("SELECT id FROM team WHERE season_id = ? AND name = ?",
+                            (seasonId, team)).fetchone()[0]
+    if player:
+        db.execute("INSERT OR IGNORE INTO player (team_id, name) VALUES (?, ?)", (teamId, player))
+        playerId = db.execute("SELECT id FROM player WHERE team_id = ? AND name = ?",
+                              (teamId, player)).fetchone()[0]
+
+    db.execute("""
+        INSERT INTO data_table (season_id, team_id, player_id, file_name, header) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (season_id, team_id, player_id, file_name) DO UPDATE SET header = excluded.header""",
+               (seasonId, teamId, playerId, fileName, json.dumps(header)))
+    return db.execute("""SELECT id FROM data_table
+                         WHERE season_id = ? AND team_id = ? AND player_id = ? AND file_name = ?""",
+                      (seasonId, teamId, playerId, fileName)).fetchone()[0]
+
+
+# Splits a database file path into (season, team, player, filename). Team &
+#  player are None for files that live higher up in the folder tree.
+def parseFilePath(filepath):
+    path = os.path.normpath(filepath).replace("\\", "/")
+    base = os.path.normpath(Global.BASE_PATH).replace("\\", "/") + "/"
+    if path.startswith(base):
+        path = path[len(base):]
+    parts = path.split("/")
+
+    # Folders after the season folder are [team, [player]]
+    seasonIndex = 0
+    for i, part in enumerate(parts[:-1]):
+        if part.endswith(" Season"):
+            seasonIndex = i
+    folders = parts[seasonIndex:-1]
+    season = folders[0] if folders else ""
+    team = folders[1] if len(folders) > 1 else None
+    player = folders[2] if len(folders) > 2 else None
+    return season, team, player, parts[-1]
+
+
+if __name__ == "__main__":
+    print(f"Exported {exportCSV(destination=Global.BASE_PATH + '/Export')} files.")
@@ -0,0 +1,127 @@
+# This program reads stat tables out of Basketball-Reference websites. Instead
+#  of calling row.find('td', {"data-stat": ...}) once per column (which scans
+#  the whole row every time), each <tr> is walked ONCE and turned into a
+#  {data-stat: text} dictionary. The columns we keep are described by a
+#  schema, a list of (CSV header, data-stat, transform) tuples, so one engine
+#  serves every table:
+#
+#    SCHEMA = [("season", "year_id", toSeasonName),
+#              ("age", "age", None), ...]
+#
+#  A transform is an optional function applied to the cell's text.
+#
+#  For big websites, a table scanner can pull our tables out of the raw HTML
+#  as it downloads (see newTableScanner()), so the rest of the page never
+#  becomes a Soup obj.
+import codecs
+import importlib.util
+import re
+from bs4 import BeautifulSoup, SoupStrainer
+import Global
+import Metrics
+
+TABLE_START = re.compile(r'<table\b[^>]*?\bid="([^"]+)"')
+TABLE_END = "</table>"
+MAX_TAG_LENGTH = 2048  # Unfinished text kept between chunks while searching for a <table>
+
+
+# Returns the table as a CSV-ready list (header row first). Rows missing any
+#  of the schema's columns (e.g. "Did Not Play" seasons, repeated headers) are
+#  skipped. Returns None if the table isn't on the website.
+def extractTable(soup, tableId, schema):
+    with Metrics.timer("parse"):
+        return readTable(soup, tableId, schema)
+
+
+def readTable(soup, tableId, schema):
+    table = soup.find("table", id=tableId)
+    if table is None:
+        return None
+
+    body = table.find("tbody") or table
+    data = [[header for header, _, _ in schema]]
+    for row in body.find_all("tr"):
+        cells = {}
+        for cell in row.find_all(["th", "td"], recursive=False):
+            stat = cell.get("data-stat")
+            if stat is not None:
+                cells[stat] = cell.text
+
+        try:
+            data.append([transform(cells[stat]) if transform else cells[stat]
+                         for _, stat, transform in schema])
+        except (KeyError, IndexError, ValueError):  # Row is missing data -> skip
+            continue
+    return data
+
+
+# Parses raw HTML, but only builds the <table> elements we ask for. Much
+#  cheaper than building the whole website when we only need a few tables.
+def parseTables(html, tableIds):
+    strainer = SoupStrainer("table", id=lambda tableId: tableId in tableIds)
+    return BeautifulSoup(html, getParser(), parse_only=strainer)
+
+
+# Creates a table scanner: a small state that is fed the website's raw bytes
+#  chunk by chunk (feedScanner) & keeps the HTML of the wanted tables only.
+#  Basketball-Reference hides some tables in HTML comments ("<!-- <table ...
+#  -->"). The scanner reads raw text, so those are found too (no need for
+#  Player.extractCommentedHTML()).
+def newTableScanner(tableIds):
+    return {"pending": set(tableIds), "tables": {}, "buffer": "", "current": None,
+            "decoder": codecs.getincrementaldecoder("utf-8")(errors="replace")}
+
+
+# Feeds the next chunk (bytes) of the website to a table scanner. Returns
+#  True once every wanted table was found, so the caller can stop reading.
+def feedScanner(scanner, chunk):
+    scanner["buffer"] += scanner["decoder"].decode(chunk)
+    while scanner["pending"]:
+        buffer = scanner["buffer"]
+        if scanner["current"] is None:
+            match = TABLE_START.search(buffer)
+            if match is None:
+                # Keep a possibly unfinished "<table ..." for the next chunk
+                tagStart = buffer.rfind("<", max(0, len(buffer) - MAX_TAG_LENGTH))
+                scanner["buffer"] = buffer[tagStart:] if tagStart != -1 else ""
+                break
+            scanner["buffer"] = buffer[match.start():]
+            scanner["current"] = match.group(1) if match.group(1) in scanner["pending"] else ""
+            if scanner["current"] == "":  # Not a table we want -> skip its tag
+                scanner["buffer"] = scanner["buffer"][len(match.group(0)):]
+                scanner["current"] = None
+            continue
+
+        end = buffer.find(TABLE_END)
+        if end == -1:
+            break
+        end += len(TABLE_END)
+        scanner["tables"][scanner["current"]] = buffer[:end]
+        scanner["pending"].discard(scanner["current"])
+        scanner["buffer"] = buffer[end:]
+        scanner["current"] = None
+    return isScanDone(scanner)
+
+
+def isScanDone(scanner):
+    return not scanner["pending"]
+
+
+# Turns the tables found by a scanner into ONE small Soup obj, which works
+#  with extractTable() like the full website would.
+def getScannedTables(scanner):
+    with Metrics.timer("parse"):
+        return BeautifulSoup("".join(scanner["tables"].values()), getParser())
+
+
+# Returns Global.HTML_PARSER if it's installed, otherwise "html.parser".
+def getParser():
+    if Global.HTML_PARSER == "lxml" and importlib.util.find_spec("lxml") is None:
+        return "html.parser"
+    return Global.HTML_PARSER
+
+
+# "2023-24" -> "2023-2024 Season" (also handles "1999-00" & "1998-99")
+def toSeasonName(yearId):
+    startYr = int(yearId[:4])
+    return f"{startYr}-{startYr + 1} Season"
@@ -4,30 +4,36 @@
 #    2. the roster (including check if player was cut)
 #    3. team log information
 #  Program cannot make changes to player folders or files within player folders
-import csv
-import requests
 import os
-from bs4 import BeautifulSoup
+import threading
 import Global
 import Update_Database
-import Request_Ticker
+import Fetcher
+import Metrics
+import Parse_Pipeline
+import Storage
+import Team_Registry
+
+rosterSnapshots = {}             # (team, seasonEndYr) -> roster, see getUpdatedRoster()
+snapshotLocks = {}
+snapshotLocksLock = threading.Lock()
 
 
 def initializeTeamFolder(path):
-    os.makedirs(path)
+    os.makedirs(path, exist_ok=True)  # exist_ok -> resumed season builds
 
     defaultTeamFiles = ["log information.csv",
                         "team statistics.csv",
                         "roster overview.csv"]
 
-    # Create log file to keep track of all other file data
-    with open(f"{path}/{defaultTeamFiles[0]}", "w", encoding='utf-8'):
+    # Create log file to keep track of all other file data (kept if it
+    #  exists, since unchanged files aren't logged again)
+    with open(f"{path}/{defaultTeamFiles[0]}", "a", encoding='utf-8'):
         pass
 
     for file in defaultTeamFiles[1:]:
-        with open(f"{path}/{file}", "w"):
-            pass
-        Update_Database.updateLogFile(file, path)
+        if Storage.writeTable(f"{path}/{file}", []):
+            Update_Database.updateLogFile(file, path)
     return None
 
 
@@ -40,18 +46,106 @@ def initializeTeamFolder(path):
 #   6. Nationality
 #   7. Experience (Yrs)
 #   8. Player Website
-def getUpdatedRoster(team, seasonEndYr):
-    websiteLink = getTeamWebsite(team).replace("YEAR", str(seasonEndYr))
-    Request_Ticker.addRequest()
-    websiteHTML = requests.get(websiteLink)
-    soup = BeautifulSoup(websiteHTML.content, "html.parser")
+# Rosters are kept as a snapshot per (team, season) for the rest of the run,
+#  so asking for the same roster again (e.g. once per player) doesn't
+#  re-download the team website. Use refresh=True or invalidateRoster() to
+#  force a new download.
+def getUpdatedRoster(team, seasonEndYr, refresh=False):
+    key = (team, int(seasonEndYr))
+    with getSnapshotLock(key):  # Other threads asking for this roster wait for us
+        if refresh or key not in rosterSnapshots:
+            soup = Fetcher.fetchPage(getRosterWebsite(team, seasonEndYr))
+            with Metrics.timer("parse"):
+                rosterSnapshots[key] = parseRoster(soup, team)
+        return [list(row) for row in rosterSnapshots[key]]
+
+
+# Same as getUpdatedRoster(), but for many teams at once. Rosters that
+#  aren't in the snapshot yet are fetched concurrently. Yields (team, roster)
+#  tuples as they arrive. Teams whose roster failed are appended to "failed"
+#  (if given) & reported once every roster is done.
+def getUpdatedRosters(teams, seasonEndYr, refresh=False, failed=None):
+    failed = [] if failed is None else failed
+    links = {}
+    for team in teams:
+        if not refresh and (team, int(seasonEndYr)) in rosterSnapshots:
+            yield team, getUpdatedRoster(team, seasonEndYr)
+        else:
+            links[getRosterWebsite(team, seasonEndYr)] = team
+
+    if Global.PARSE_PROCESSES > 1:  # Parsed in a process pool (see Parse_Pipeline.py)
+        for team, roster in Parse_Pipeline.parseRosters(links.values(), seasonEndYr, failed):
+            yield team, storeRoster((team, int(seasonEndYr)), roster)
+        if failed:
+            print(f">> {len(failed)} rosters failed: {', '.join(failed)} <<")
+        return
+
+    for link, soup in Fetcher.fetchPages(links):
+        team = links[link]
+        with Metrics.timer("parse"):
+            roster = parseRoster(soup, team)
+        yield team, storeRoster((team, int(seasonEndYr)), roster)
+
+
+# Saves a roster snapshot (under its lock, so getUpdatedRoster() on another
+#  thread never sees half of an update). Returns a copy of the roster.
+def storeRoster(key, roster):
+    with getSnapshotLock(key):
+        rosterSnapshots[key] = roster
+        return [list(row) for row in roster]
+
+
+# Forgets roster snapshots so the next getUpdatedRoster() downloads them
+#  again. No arguments -> forget everything. Only a team or only a season
+#  -> forget every snapshot matching it.
+def invalidateRoster(team=None, seasonEndYr=None):
+    for key in list(rosterSnapshots):
+        if (team is None or key[0] == team) and (seasonEndYr is None or key[1] == int(seasonEndYr)):
+            with getSnapshotLock(key):
+                rosterSnapshots.pop(key, None)
+    return None
+
+
+def getSnapshotLock(key):
+    with snapshotLocksLock:
+        return snapshotLocks.setdefault(key, threading.Lock())
+
+
+# Compares the team's current roster (ONE fetch) against the player folders
+#  in our database. Returns a dictionary:
+#    {"signed": [players on the roster without a folder],
+#     "cut": [player folders no longer on the roster],
+#     "roster": current roster (header first)}
+#  refresh=True drops the run's roster snapshot first, so the roster is
+#  downloaded again.
+def getRosterChanges(team, seasonEndYr, teamPath=None, refresh=False):
+    if teamPath is None:
+        teamPath = f"{Global.BASE_PATH}/{int(seasonEndYr) - 1}-{seasonEndYr} Season/{team}"
+    if refresh:
+        invalidateRoster(team, seasonEndYr)
+    roster = getUpdatedRoster(team, seasonEndYr)
+    rosterNames = [player[0] for player in roster[1:]]
+    folderNames = [name for name in os.listdir(teamPath) if os.path.isdir(f"{teamPath}/{name}")] \
+        if os.path.isdir(teamPath) else []
+
+    return {"signed": [name for name in rosterNames if name not in folderNames],
+            "cut": [name for name in folderNames if name not in rosterNames],
+            "roster": roster}
+
+
+# Returns the team's roster URL for a given season.
+def getRosterWebsite(team, seasonEndYr):
+    return Team_Registry.getTeamWebsite(team, seasonEndYr)
+
 
+# Reads the roster table out of a team website (Soup obj).
+def parseRoster(soup, team):
     table = soup.find('div', id="div_roster")
 
     roster = [["Player", "Team", "Position", "Height", "Weight", "DOB", "Nationality", "Experience (Yrs)", "Website"]]
     for row in table.find_all('tr')[1:]:  # Skips table header
         player = row.find('a').text
-        playerWebsite = "https://www.basketball-reference.com" + row.find('a')['href']
+        playerWebsite = Global.SITE_URL + row.find('a')['href']
         position = row.find('td', {'data-stat': 'pos'}).text
         height = row.find('td', {'data-stat': 'height'}).text
         weight = row.find('td', {'data-stat': 'weight'}).text
@@ -69,7 +163,7 @@ def getUpdatedRoster(team, seasonEndYr):
 # Checks if a player was cut from their team.
 #  Return cut status & current roster.
 def playerCut(player, team, seasonEnd):
-    roster = getUpdatedRoster(team=team, seasonEndYr=seasonEnd)
+    roster = getUpdatedRoster(team=team, seasonEndYr=seasonEnd)  # Snapshot, no extra request
     cut = True
     for playerData in roster:
         if player == playerData[0]:
@@ -80,14 +174,10 @@ def playerCut(player, team, seasonEnd):
     return False, roster         # TODO: TEMP
 
 
-# Opens our database "teams list.csv" to get the team's website link.
-#  Returns a URL string.
+# Returns the team's website link (with "YEAR" in place of the season).
+#  Teams are looked up in memory (see Team_Registry.py).
 def getTeamWebsite(team):
-    with open(Global.BASE_PATH + "/Database Updater/Misc Files/teams list.csv", "r", encoding='utf-8') as csvFile:
-        csvReader = csv.reader(csvFile)
-        for line in csvReader:
-            if line[0] == team:
-                return line[1]
+    return Team_Registry.getTeamWebsite(team)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,111 @@
+# This program loads "Misc Files/teams list.csv" ONCE and keeps it in memory,
+#  so every other program can look up a team by its name, its
+#  Basketball-Reference abbreviation (e.g. "ATL") or any of its aliases (old
+#  abbreviations/names of the franchise, e.g. "NJN" -> Brooklyn Nets) without
+#  re-reading the file. Each team is a dictionary:
+#    {"name": "Atlanta Hawks", "abbreviation": "ATL",
+#     "website": "https://www.basketball-reference.com/teams/ATL/YEAR.html",
+#     "aliases": ["STL", "MLH", "TRI"],
+#     "past abbreviations": [("STL", 1956, 1968), ("MLH", 1952, 1955), ...]}
+#
+#  Old abbreviations are listed in "teams list.csv" with the seasons (end
+#  years) they were used, e.g. "CHA:2005-2014" (Charlotte Bobcats). The site
+#  uses them in the URLs of those seasons (".../teams/CHA/2014.html",
+#  ".../boxscores/201401010CHA.html"), so getAbbreviation() & getTeamWebsite()
+#  take the season.
+import csv
+import threading
+import Global
+
+# Abbreviations used in player tables for a season split between teams
+MULTI_TEAM_ABBREVIATIONS = {"TOT", "2TM", "3TM", "4TM", "5TM"}
+
+lock = threading.Lock()
+teams = None     # Teams in "teams list.csv" order
+lookup = None    # name/abbreviation/alias -> team
+
+
+# Returns the team matching a name, abbreviation or alias. Returns None if
+#  the team is unknown (or is a multi-team abbreviation like "TOT").
+def getTeam(nameOrAbbr):
+    loadRegistry()
+    nameOrAbbr = nameOrAbbr.strip()
+    if nameOrAbbr in MULTI_TEAM_ABBREVIATIONS:  # Season total of a traded player, not a team
+        return None
+    return lookup.get(nameOrAbbr)
+
+
+# Returns every team name (= team folder name) in "teams list.csv" order.
+def getTeamNames():
+    loadRegistry()
+    return [team["name"] for team in teams]
+
+
+# Maps a "team_name_abbr" value found in player tables back to the
+#  canonical team folder name. Returns None if it can't be mapped.
+def getTeamFolder(abbreviation):
+    team = getTeam(abbreviation)
+    return team["name"] if team is not None else None
+
+
+# Returns the team's website. If a season is given, "YEAR" is filled in &
+#  the abbreviation of that season is used.
+def getTeamWebsite(team, seasonEndYr=None):
+    team = getTeam(team)
+    website = team["website"]
+    if seasonEndYr is not None:
+        website = website.replace(f"/teams/{team['abbreviation']}/",
+                                  f"/teams/{getAbbreviation(team['name'], seasonEndYr)}/")
+        website = website.replace("YEAR", str(seasonEndYr))
+    return website
+
+
+# Returns the team's abbreviation, or the one it used in a given season
+#  (e.g. "CHA" for the Charlotte Hornets in 2014).
+def getAbbreviation(team, seasonEndYr=None):
+    team = getTeam(team)
+    if seasonEndYr is not None:
+        for abbreviation, firstEndYr, lastEndYr in team["past abbreviations"]:
+            if firstEndYr <= int(seasonEndYr) <= lastEndYr:
+                return abbreviation
+    return team["abbreviation"]
+
+
+# Reads "teams list.csv". Only happens once per run.
+def loadRegistry():
+    global teams, lookup
+    if lookup is not None:
+        return None
+    with lock:
+        if lookup is not None:  # Another thread loaded it while we waited
+            return None
+        newTeams = []
+        newLookup = {}
+        with open(Global.BASE_PATH + "/Database Updater/Misc Files/teams list.csv", encoding='utf-8') as csvFile:
+            csvReader = csv.reader(csvFile)
+            next(csvReader, None)  # Skip Headers
+            for line in csvReader:
+                aliases = [alias.split(":") for alias in line[2].split(";") if alias] if len(line) > 2 else []
+                team = {"name": line[0],
+                        "abbreviation": line[1].split("/teams/")[1].split("/")[0],
+                        "website": line[1],
+                        "aliases": list(dict.fromkeys(alias[0] for alias in aliases)),
+                        "past abbreviations": [(alias[0], *getSeasonRange(alias[1]))
+                                               for alias in aliases if len(alias) == 2]}
+                newTeams.append(team)
+                for key in [team["name"], team["abbreviation"]] + team["aliases"]:
+                    newLookup[key] = team
+        teams = newTeams
+        lookup = newLookup
+    return None
+
+
+# "2005-2014" -> (2005, 2014), "1977" -> (1977, 1977)
+def getSeasonRange(text):
+    years = text.split("-")
+    return int(years[0]), int(years[-1])
+
+
+if __name__ == "__main__":
+    for abbr in ["ATL", "NJN", "SEA", "TOT"]:
+        print(abbr, "->", getTeamFolder(abbr))
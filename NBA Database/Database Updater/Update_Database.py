@@ -5,15 +5,19 @@
 #       updated.
 #  A valid file/folder path should contain all the necessary information
 #  to update the necessary files.
-import csv
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tabulate import tabulate
-import requests
-from bs4 import BeautifulSoup
-from datetime import datetime
 import shutil  # For deleting non-empty directories
 import Schedule
+import Box_Scores
 import Team
 import Player
+import Update_Planner
+import Update_Journal
+import Build_Checkpoint
+import Team_Registry
+import Metrics
+import Parse_Pipeline
 import os
 import Global
 
@@ -73,7 +77,7 @@ def parsePath(pathStr):
 #  to the proper functions within this program. Assumes default folder
 #  files exist.
 def update(path):
-    if path.lower().find("log") != -1:
+    if os.path.basename(path).lower() == "log information.csv":
         print("Can't manually update a log file.")
         return None
 
@@ -90,10 +94,24 @@ def update(path):
     # 2. Assign Responsibilities
     match databaseLocation:
         case "season":
-            print()
+            # Scores (only months with unplayed games), game logs & last 5
+            #  games from box scores (1 request per new game), then the career
+            #  tables of players not refreshed in CAREER_STATS_REFRESH_DAYS
+            Schedule.updateSchedule(Schedule.getSchedule(int(seasonEnd)), int(seasonEnd))
+            Box_Scores.ingestBoxScores(path)
+            Update_Planner.runIncrementalUpdate(path)
 
         case "team":
-            print()
+            # Reports signings/cuts (1 request), then updates every player
+            #  folder in the team (1 request per player)
+            changes = Team.getRosterChanges(team, seasonEnd, teamPath=path)
+            for player in changes["signed"]:
+                print(f">> {player} signed with {team} (no player folder yet) <<")
+            for player in changes["cut"]:
+                print(f">> {player} no longer on {team} roster <<")
+
+            print(f"[X] Updating {team} player folders:")
+            Player.updatePlayerFolders(getFolderPaths(path))
 
         case "player":
             # 1. Check to see if player wasn't cut/transferred to a diff. team
@@ -124,103 +142,154 @@ def update(path):
                     Player.updateFile(fileName, path)
 
                 else:
-                    for file in os.listdir(path):
-                        if file.find("log information") != -1:
-                            Player.updateFile(file, path)
+                    Player.updateFile("player characteristics.csv",
+                                      f"{path}/player characteristics.csv")
+                    Player.updatePlayerFolder(path)
 
+    Update_Journal.flush()
+    Metrics.printSummary()
     return None
 
 
 # Creates a new "20XX-20XX Season" folder with all it's default files &
-#  directories. ASSUMES a season folder name DNE yet.
+#  directories. The build is split into work units (schedule, each team,
+#  & optionally each player's stats) that run in a worker pool. Finished
+#  units are saved in a checkpoint (see Build_Checkpoint.py), so calling this
+#  again on a half-built season resumes where it stopped.
 #  Returns Nothing.
-def createSeasonFolder(seasonStartYr, seasonEndYr):
+def createSeasonFolder(seasonStartYr, seasonEndYr, playerStats=False):
     if seasonEndYr - seasonStartYr != 1:
         print(">> Season date invalid <<  Aborted season creation ")
         return None
 
-    # Make Season Folder
+    # Make Season Folder (or resume an unfinished one)
     newSeasonPath = Global.BASE_PATH + f"/{seasonStartYr}-{seasonEndYr} Season"
-    os.mkdir(newSeasonPath)
+    os.makedirs(newSeasonPath, exist_ok=True)
+    finished = Build_Checkpoint.loadCheckpoint(newSeasonPath)
+    if finished:
+        print(f">> Resuming season build ({len(finished)} work units already finished) <<")
 
     # Game Schedule
-    gameSchedule = Schedule.getSchedule(seasonEndYr)
-    Schedule.updateSchedule(gameSchedule, seasonEndYr)
-
-    # Make Teams Folders & populate each with player folders
-    for team in getTeams():
-        printTeamName(team)
-        Team.initializeTeamFolder(f"{newSeasonPath}/{team}")
-        print("[X] Created 3 Team Default Files.")
-
-        rosterData = Team.getUpdatedRoster(team, seasonEndYr)
-        headers = rosterData[0]
-        roster = rosterData[1:]
-        print(f"[X] Creating {len(roster)} player sub-folders:")
-        for player in roster:
-            playerName = player[0]
-            Player.initializePlayerFolders(f"{newSeasonPath}/{team}/{playerName}", [headers, player])
-            print(f"    [X] {playerName}")
+    if "schedule" not in finished:
+        gameSchedule = Schedule.getSchedule(seasonEndYr)
+        Schedule.updateSchedule(gameSchedule, seasonEndYr)
+        Build_Checkpoint.markFinished(newSeasonPath, "schedule", finished)
+
+    # Make Teams Folders & populate each with player folders. Each team is
+    #  its own work unit, handled by the worker pool.
+    teams = [team for team in getTeams() if Build_Checkpoint.getTeamUnit(team) not in finished]
+    failed = runWorkUnits(teams, lambda team: buildTeamFolder(newSeasonPath, team, seasonEndYr),
+                          lambda team: Build_Checkpoint.getTeamUnit(team), newSeasonPath, finished)
+
+    # Player stats (1 request per player). Only once every team is built.
+    if playerStats and not failed:
+        playerPaths = [playerPath for teamPath in getFolderPaths(newSeasonPath)
+                       for playerPath in getFolderPaths(teamPath)
+                       if getPlayerUnit(playerPath) not in finished]
+        if Global.PARSE_PROCESSES > 1:  # Parsed in a process pool (see Parse_Pipeline.py)
+            failed = Parse_Pipeline.updatePlayerFolders(
+                playerPaths, onWritten=lambda playerPath: Build_Checkpoint.markFinished(
+                    newSeasonPath, getPlayerUnit(playerPath), finished))
+            failed = [getPlayerUnit(playerPath) for playerPath in failed]
+        else:
+            failed = runWorkUnits(playerPaths, Player.updatePlayerFolder, getPlayerUnit,
+                                  newSeasonPath, finished)
+
+    Update_Journal.flush()
+    Metrics.printSummary()
+    if failed:
+        print(f"\n>> {len(failed)} work units failed. Run again to resume the build. <<")
+        for unit in failed:
+            print(f"    [ ] {unit}")
     return None
 
 
+# Runs work units in a worker pool. Requests made by the workers still go
+#  through Request_Ticker. Every finished unit is checkpointed right away.
+#  Returns the list of units that failed.
+def runWorkUnits(items, work, getUnit, seasonPath, finished):
+    failed = []
+    Metrics.startProgress(len(items), "Work units")
+    with ThreadPoolExecutor(max_workers=Global.MAX_FETCH_WORKERS) as pool:
+        futures = {pool.submit(runWorkUnit, work, item, getUnit(item)): item for item in items}
+        for future in as_completed(futures):
+            unit = getUnit(futures[future])
+            Metrics.advanceProgress()
+            try:
+                future.result()
+            except Exception as error:  # Unit stays unfinished -> retried on resume
+                print(f">> {unit} failed: {error} <<")
+                failed.append(unit)
+                continue
+            Build_Checkpoint.markFinished(seasonPath, unit, finished)
+    return failed
+
+
+# Runs 1 work unit. Its requests, parse & write times are recorded under the
+#  unit's name (see Metrics.py).
+def runWorkUnit(work, item, unit):
+    with Metrics.workUnit(unit):
+        return work(item)
+
+
+# Work unit: creates a team folder & its player sub-folders. Safe to re-run
+#  on a partially created team.
+def buildTeamFolder(seasonPath, team, seasonEndYr):
+    rosterData = Team.getUpdatedRoster(team, seasonEndYr)
+    Team.initializeTeamFolder(f"{seasonPath}/{team}")
+
+    headers = rosterData[0]
+    roster = rosterData[1:]
+    for player in roster:
+        Player.initializePlayerFolders(f"{seasonPath}/{team}/{player[0]}", [headers, player])
+
+    printTeamName(team)
+    print(f"[X] Created 3 Team Default Files & {len(roster)} player sub-folders:")
+    print("\n".join(f"    [X] {player[0]}" for player in roster))
+    return None
+
+
+def getPlayerUnit(playerPath):
+    return Build_Checkpoint.getPlayerUnit(os.path.basename(os.path.dirname(playerPath)),
+                                          os.path.basename(playerPath))
+
+
 # Gets the pre-set list of teams
 def getTeams():
-    teams = []
-    with open(Global.BASE_PATH + "/Database Updater/Misc Files/teams list.csv", encoding='utf-8') as csvFile:
-        csvReader = csv.reader(csvFile)
-        for line in csvReader:
-            teams.append(line[0])
-    teams.pop(0)  # Pop the CSV header
-    return teams
+    return Team_Registry.getTeamNames()
 
 
 # Updates the log file. Log file contains admin data that keeps track
 #  of File Name, Date, and Time of last update. Log files exist in
-#  Team folders & Player folders.
+#  Team folders & Player folders. Updates are batched by Update_Journal &
+#  the log file is only rewritten when the journal is flushed.
 def updateLogFile(fileUpdated, folderPath):
-    logData = [["File", "Date Last Updated", "Time Last Updated"]]
-    updated = False
-    with open(f"{folderPath}/log information.csv", "r",
-              encoding="utf-8") as csvFile:
-        csvReader = csv.reader(csvFile)
-        try:
-            csvFile.readline()  # Skip Headers (if lines exist)
-        except:
-            pass
-        for line in csvReader:
-            if line[0] == fileUpdated:
-                updated = True
-                date, time = getDateTime()
-                logData.append([fileUpdated, date, time])
-            else:
-                logData.append(line)
+    Update_Journal.recordUpdate(fileUpdated, folderPath)
+    return None
+
 
-    if not updated:  # If file DNE when opened, it'll never update. So Update.
-        date, time = getDateTime()
-        logData.append([fileUpdated, date, time])
+# Returns the date & time (datetime obj) a file in a folder was last updated.
+#  Returns None if the file was never logged.
+def getLastUpdated(folderPath, fileName):
+    return Update_Journal.getLastUpdated(folderPath, fileName)
 
-    with open(f"{folderPath}/log information.csv", "w", encoding="utf-8",
-              newline='') as csvFile:
-        csvWriter = csv.writer(csvFile)
-        csvWriter.writerows(logData)
 
+# Records that a file's data was downloaded again but didn't change, so
+#  nothing was written or logged (see Update_Journal.recordCheck()).
+def updateLogCheck(fileChecked, folderPath):
+    Update_Journal.recordCheck(fileChecked, folderPath)
     return None
 
 
-# Gets the local date and time. Function called by updateLogFile().
-def getDateTime():
-    now = datetime.now()
-    date = now.strftime("%Y-%m-%d")
-    time = now.strftime("%H:%M:%S")
-    return date, time
+def getLastChecked(folderPath, fileName):
+    return Update_Journal.getLastChecked(folderPath, fileName)
 
 
 # Returns the list of folders found in a path
 def getFolderPaths(path):
     folders = []
     for file in os.listdir(path):
-        if file.find(".") == -1:
+        if os.path.isdir(f"{path}/{file}"):  # Names like "P.J. Tucker" contain "."
             folders.append(path + f"/{file}")
     return folders
 
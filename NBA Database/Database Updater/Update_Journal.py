@@ -0,0 +1,213 @@
+# This program keeps track of when every file in the database was last
+#  updated. Updates are kept in memory & appended to ONE database-wide journal
+#  (Global.JOURNAL_PATH) in batches:
+#
+#    Folder,File,Date Last Updated,Time Last Updated
+#    2024-2025 Season/Atlanta Hawks/Trae Young,player totals.csv,2024-11-07,11:18:53
+#
+#  When the journal is flushed, each folder touched during the run gets its
+#  "log information.csv" rewritten ONCE, so the log files stay readable
+#  without a read-modify-write for every single file update.
+#
+#  Files whose new data was identical aren't rewritten (see Storage.py) &
+#  aren't logged. Instead, the file gets 1 "(checked) <file>" journal row per
+#  run, so the updaters still know its data was current at that time. Checks
+#  never touch "log information.csv".
+#
+#  Since every run adds rows, the journal is compacted (only the latest row of
+#  every file is kept) once it holds Global.JOURNAL_COMPACT_RATIO rows per
+#  file it tracks.
+import atexit
+import csv
+import os
+import threading
+from datetime import datetime
+import Global
+import Metrics
+
+JOURNAL_HEADER = ["Folder", "File", "Date Last Updated", "Time Last Updated"]
+LOG_HEADER = ["File", "Date Last Updated", "Time Last Updated"]
+CHECK_PREFIX = "(checked) "  # Journal "file" of check rows: "(checked) player totals.csv"
+
+lock = threading.RLock()
+index = None             # {folder: {file: (date, time)}}, loaded once from the journal
+pending = []             # Journal rows not yet written to disk
+touchedFolders = set()   # Folders whose log file must be rewritten on flush
+seededFolders = set()    # Folders whose log file was already read into the index
+checks = {}              # {folder: {file: (date, time)}} last time a file's data was found unchanged
+checkedFiles = set()     # (folder, file) checked during this run
+journalRows = 0          # Rows in the journal on disk
+
+
+# Records that a file in a folder was just updated. Nothing is written to
+#  disk until flush() (called automatically every Global.JOURNAL_FLUSH_EVERY
+#  updates & when the program exits).
+def recordUpdate(fileUpdated, folderPath):
+    date, time = getDateTime()
+    folder = getFolderKey(folderPath)
+    with lock:
+        loadIndex()
+        seedFolder(folderPath, folder)
+        index.setdefault(folder, {})[fileUpdated] = (date, time)
+        pending.append([folder, fileUpdated, date, time])
+        touchedFolders.add(folder)
+        if len(pending) >= Global.JOURNAL_FLUSH_EVERY:
+            flush()
+    return None
+
+
+# Records that a file's data was downloaded again & found unchanged. Only
+#  the first check of a file per run is journaled.
+def recordCheck(fileChecked, folderPath):
+    folder = getFolderKey(folderPath)
+    with lock:
+        if (folder, fileChecked) in checkedFiles:
+            return None
+        checkedFiles.add((folder, fileChecked))
+        loadIndex()
+        date, time = getDateTime()
+        checks.setdefault(folder, {})[fileChecked] = (date, time)
+        pending.append([folder, CHECK_PREFIX + fileChecked, date, time])
+        if len(pending) >= Global.JOURNAL_FLUSH_EVERY:
+            flush()
+    return None
+
+
+# Returns the date & time (datetime obj) a file in a folder was last checked
+#  (see recordCheck()), or None.
+def getLastChecked(folderPath, fileName):
+    folder = getFolderKey(folderPath)
+    with lock:
+        loadIndex()
+        entry = checks.get(folder, {}).get(fileName)
+    if entry is None:
+        return None
+    return datetime.strptime(f"{entry[0]} {entry[1]}", "%Y-%m-%d %H:%M:%S")
+
+
+# Returns the date & time (datetime obj) a file in a folder was last updated.
+#  Returns None if the file was never updated.
+def getLastUpdated(folderPath, fileName):
+    folder = getFolderKey(folderPath)
+    with lock:
+        loadIndex()
+        seedFolder(folderPath, folder)
+        entry = index.get(folder, {}).get(fileName)
+    if entry is None:
+        return None
+    return datetime.strptime(f"{entry[0]} {entry[1]}", "%Y-%m-%d %H:%M:%S")
+
+
+# Appends pending updates to the journal & rewrites the log file of every
+#  folder touched since the last flush. Compacts the journal if needed.
+def flush():
+    global journalRows
+    with lock, Metrics.timer("log update"):
+        if not pending:
+            return None
+
+        newJournal = not os.path.exists(Global.JOURNAL_PATH)
+        with open(Global.JOURNAL_PATH, "a", encoding="utf-8", newline='') as csvFile:
+            csvWriter = csv.writer(csvFile)
+            if newJournal:
+                csvWriter.writerow(JOURNAL_HEADER)
+            csvWriter.writerows(pending)
+        journalRows += len(pending)
+        pending.clear()
+
+        for folder in touchedFolders:
+            folderPath = getFolderPath(folder)
+            if not os.path.isdir(folderPath):  # Folder was removed during the run
+                continue
+            logData = [LOG_HEADER] + [[file, date, time] for file, (date, time) in index[folder].items()]
+            with open(f"{folderPath}/log information.csv", "w", encoding="utf-8", newline='') as csvFile:
+                csv.writer(csvFile).writerows(logData)
+        touchedFolders.clear()
+
+        if journalRows > Global.JOURNAL_COMPACT_RATIO * getTrackedFiles():
+            compactJournal()
+    return None
+
+
+# Rewrites the journal keeping only the latest update (& check) of every
+#  file. The new journal is swapped in once fully written.
+def compactJournal():
+    global journalRows
+    with lock:
+        flush()
+        loadIndex()
+        with open(f"{Global.JOURNAL_PATH}.tmp", "w", encoding="utf-8", newline='') as csvFile:
+            csvWriter = csv.writer(csvFile)
+            csvWriter.writerow(JOURNAL_HEADER)
+            for folder, files in index.items():
+                csvWriter.writerows([folder, file, date, time] for file, (date, time) in files.items())
+            for folder, files in checks.items():
+                csvWriter.writerows([folder, CHECK_PREFIX + file, date, time] for file, (date, time) in files.items())
+        os.replace(f"{Global.JOURNAL_PATH}.tmp", Global.JOURNAL_PATH)
+        journalRows = getTrackedFiles()
+    return None
+
+
+# Number of rows a compacted journal holds (1 per file update & check).
+def getTrackedFiles():
+    return sum(len(files) for files in index.values()) + sum(len(files) for files in checks.values())
+
+
+# Reads the journal into memory. Only happens once per run.
+def loadIndex():
+    global index, journalRows
+    if index is not None:
+        return None
+    index = {}
+    try:
+        with open(Global.JOURNAL_PATH, "r", encoding="utf-8") as csvFile:
+            csvReader = csv.reader(csvFile)
+            next(csvReader, None)  # Skip Headers
+            for folder, file, date, time in csvReader:
+                journalRows += 1
+                if file.startswith(CHECK_PREFIX):
+                    checks.setdefault(folder, {})[file[len(CHECK_PREFIX):]] = (date, time)
+                else:
+                    index.setdefault(folder, {})[file] = (date, time)
+    except FileNotFoundError:
+        pass
+    return None
+
+
+# Folders that were logged before the journal existed only have their
+#  "log information.csv". Reads it once so those updates aren't lost. Entries
+#  already in the journal are newer & win.
+def seedFolder(folderPath, folder):
+    if folder in seededFolders:
+        return None
+    seededFolders.add(folder)
+    try:
+        with open(f"{folderPath}/log information.csv", "r", encoding="utf-8") as csvFile:
+            csvReader = csv.reader(csvFile)
+            next(csvReader, None)  # Skip Headers
+            files = index.setdefault(folder, {})
+            for line in csvReader:
+                if len(line) == 3 and line[0] not in files:
+                    files[line[0]] = (line[1], line[2])
+    except FileNotFoundError:
+        pass
+    return None
+
+
+# Folders are stored relative to the database, so the journal still works
+#  if the database is moved.
+def getFolderKey(folderPath):
+    return os.path.relpath(folderPath, Global.BASE_PATH).replace("\\", "/")
+
+
+def getFolderPath(folder):
+    return os.path.normpath(os.path.join(Global.BASE_PATH, folder))
+
+
+# Gets the local date and time.
+def getDateTime():
+    now = datetime.now()
+    return now.strftime("%Y-%m-%d"), now.strftime("%H:%M:%S")
+
+
+atexit.register(flush)
@@ -0,0 +1,80 @@
+# This program decides WHICH player folders actually need an update. Instead
+#  of re-downloading every player in a season (~500 requests), it compares
+#  each player's "log information.csv" timestamps against the season's game
+#  schedule. Game logs & last 5 games are filled from box scores every night
+#  (see Box_Scores.py), so a player's website is only needed for the career
+#  tables (totals, 36-min & advanced). Those are refreshed when they're at
+#  least Global.CAREER_STATS_REFRESH_DAYS old AND the player's team played a
+#  game on or after the day they were last updated. Most nights this plans 0
+#  requests.
+import os
+from datetime import datetime, timedelta
+import Global
+import Player
+import Schedule_Index
+import Update_Database
+
+# Returns the list of player folders (paths) in a season folder whose career
+#  tables are due for a refresh. "today" can be passed in to plan as if it
+#  were another day.
+def planIncrementalUpdate(seasonPath, today=None):
+    today = (today or datetime.now()).date()
+    gameDates = Schedule_Index.getTeamGameDates(seasonPath)
+
+    stale = []
+    skipped = 0
+    for teamPath in Update_Database.getFolderPaths(seasonPath):
+        team = os.path.basename(teamPath)
+        for playerPath in Update_Database.getFolderPaths(teamPath):
+            lastUpdated = getStatsLastUpdated(playerPath)
+            if lastUpdated is None or (isRefreshDue(lastUpdated.date(), today) and
+                                       teamPlayedSince(gameDates.get(team, []), lastUpdated.date(), today)):
+                stale.append(playerPath)
+            else:
+                skipped += 1
+
+    print(f"[X] {len(stale)} player folders need an update, {skipped} are up to date.")
+    return stale
+
+
+# Updates only the stale player folders of a season (see planIncrementalUpdate).
+def runIncrementalUpdate(seasonPath, today=None):
+    Player.updatePlayerFolders(planIncrementalUpdate(seasonPath, today))
+    return None
+
+
+def isRefreshDue(lastUpdated, today):
+    return today - lastUpdated >= timedelta(days=Global.CAREER_STATS_REFRESH_DAYS)
+
+
+# Checks if any game date falls between the last update (inclusive, since
+#  the game may have been played after the update that day) & today
+#  (exclusive, since today's games aren't finished yet).
+def teamPlayedSince(dates, lastUpdated, today):
+    return any(lastUpdated <= date < today for date in dates)
+
+
+# Returns the OLDEST update time of the player's career files, or None if
+#  any of them was never updated. A later check of a file (downloaded again
+#  but unchanged, so not rewritten) counts as an update of that file.
+def getStatsLastUpdated(playerPath):
+    times = [getFileLastUpdated(playerPath, fileName) for fileName in getCareerFiles()]
+    if None in times:
+        return None
+    return min(times)
+
+
+# Files of Player.PLAYER_TABLES that only the player's website has (last 5
+#  games come from box scores).
+def getCareerFiles():
+    return [fileName for tableId, (_, fileName) in Player.PLAYER_TABLES.items() if tableId != "last5"]
+
+
+def getFileLastUpdated(playerPath, fileName):
+    times = [time for time in (Update_Database.getLastUpdated(playerPath, fileName),
+                               Update_Database.getLastChecked(playerPath, fileName)) if time is not None]
+    return max(times) if times else None
+
+
+if __name__ == "__main__":
+    runIncrementalUpdate(Global.BASE_PATH + "/2024-2025 Season")